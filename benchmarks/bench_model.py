@@ -0,0 +1,23 @@
+"""SimpleModel on a parsed client, and end to end from the client's documents to the decision."""
+
+import pytest
+
+from data_parsing.client_data_loader import ClientDataLoader
+from model.rule_based_model import SimpleModel
+
+
+@pytest.fixture(scope="module")
+def model():
+    return SimpleModel()
+
+
+@pytest.mark.benchmark(group="model")
+def test_simple_model_predict(benchmark, model, client_data):
+    benchmark(model.predict, client_data)
+
+
+@pytest.mark.benchmark(group="model")
+def test_end_to_end(benchmark, model, client_folder, passport_parser):
+    # Parse in threads of this process, like a worker of swisshacks-batch
+    with ClientDataLoader(passport_parser, process_workers=0) as loader:
+        benchmark(lambda: model.predict(loader.load_directory(client_folder)))
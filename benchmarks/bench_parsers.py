@@ -0,0 +1,41 @@
+"""Document parsers on a representative client, one benchmark per parser and passport backend."""
+
+import pytest
+
+from data_parsing.client_account_parser import ClientAccountParser
+from data_parsing.client_description_parser import ClientDescriptionParser
+from data_parsing.client_passport_parser import ClientPassportParser, PassportBackendType
+from data_parsing.client_profile_parser import ClientProfileParser
+
+
+@pytest.mark.benchmark(group="parsers")
+def test_account_parser(benchmark, documents):
+    account = benchmark(ClientAccountParser.parse, documents["account"])
+    assert account.passport_number
+
+
+@pytest.mark.benchmark(group="parsers")
+def test_profile_parser(benchmark, documents):
+    profile = benchmark(ClientProfileParser.parse, documents["profile"])
+    assert profile.passport_id
+
+
+@pytest.mark.benchmark(group="parsers")
+def test_description_parser(benchmark, documents):
+    description = benchmark(ClientDescriptionParser.parse, documents["description"])
+    assert description.client_summary
+
+
+@pytest.mark.benchmark(group="parsers")
+def test_passport_parser_openai(benchmark, documents, passport_parser):
+    # The API answers from a recording, this measures encoding and post-processing
+    passport = benchmark(passport_parser.parse, documents["passport"])
+    assert passport.number
+
+
+@pytest.mark.benchmark(group="parsers")
+def test_passport_parser_easyocr(benchmark, documents):
+    pytest.importorskip("easyocr")
+    parser = ClientPassportParser(PassportBackendType.EASY_OCR)
+    # OCR takes seconds per image, a few rounds are enough
+    benchmark.pedantic(parser.parse, args=(documents["passport"],), rounds=5, warmup_rounds=1)
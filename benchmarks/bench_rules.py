@@ -0,0 +1,11 @@
+"""Every rule of SimpleModel on its own, on a client that passes all of them."""
+
+import pytest
+
+from model.rule_based_model import RULES
+
+
+@pytest.mark.benchmark(group="rules")
+@pytest.mark.parametrize("flag", [flag for flag, _ in RULES], ids=lambda flag: flag.__name__)
+def test_rule(benchmark, flag, client_data):
+    benchmark(flag, client_data)
@@ -0,0 +1,70 @@
+"""Storage round trips against a local backend, with payloads the size of a game result."""
+
+import base64
+import json
+
+import pytest
+
+import storage
+from payload_codecs import get_codec
+
+
+def _codecs():
+    codecs = ["identity", "gzip"]
+    try:
+        get_codec("zstd")
+    except ImportError:
+        pass
+    else:
+        codecs.append("zstd")
+    return codecs
+
+
+@pytest.fixture(scope="module")
+def payload(documents) -> dict:
+    """Game payload the way the game server sends it: base64 documents plus the description."""
+    return {
+        "client_id": "benchmark",
+        "client_data": {
+            document: base64.b64encode(content).decode("ascii") for document, content in documents.items()
+        },
+        "description": documents["description"].decode("utf-8"),
+    }
+
+
+@pytest.mark.benchmark(group="storage")
+@pytest.mark.parametrize("codec", _codecs())
+def test_dict_round_trip(benchmark, local_storage, payload, codec):
+    def round_trip():
+        storage.store_dict(payload, "bench/payload.json", codec=codec)
+        return storage.read_dict("bench/payload.json")
+
+    assert benchmark(round_trip) == payload
+
+
+@pytest.mark.benchmark(group="storage")
+def test_object_round_trip(benchmark, local_storage, documents):
+    def round_trip():
+        storage.store_object(documents["profile"], "bench/profile.docx")
+        return storage.read_object("bench/profile.docx")
+
+    assert benchmark(round_trip) == documents["profile"]
+
+
+@pytest.mark.benchmark(group="storage")
+def test_iter_object(benchmark, local_storage):
+    data = bytes(range(256)) * (16 << 10)
+    storage.store_object(data, "bench/blob.bin")
+
+    def read_chunks():
+        return sum(len(chunk) for chunk in storage.iter_object("bench/blob.bin", chunk_size=1 << 18))
+
+    assert benchmark(read_chunks) == len(data)
+
+
+@pytest.mark.benchmark(group="storage")
+def test_list_objects(benchmark, local_storage):
+    for i in range(200):
+        storage.store_object(json.dumps({"id": i}), f"bench/list/{i}/passport.json")
+
+    assert len(benchmark(storage.list_objects, "bench/list/")) == 200
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Compare the payload codecs of store_dict on game payloads: compression
+ratio and compress/decompress throughput of gzip, zstd and zstd with a
+dictionary trained on part of the payloads.
+
+Payloads are read from stored game results under a storage prefix, or
+rebuilt from a local train folder the way the game server encodes them
+(base64 documents plus the description text).
+
+Usage:
+    python benchmarks/codec_benchmark.py --prefix test/ [--limit 200]
+    python benchmarks/codec_benchmark.py --folder train/ [--save-dictionary zstd.dict]
+"""
+
+import argparse
+import base64
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent.absolute()
+sys.path[:0] = [str(ROOT / "swisshacks"), str(ROOT)]
+
+import storage  # noqa: E402
+from data_parsing.client_data_loader import DOCUMENT_FILES  # noqa: E402
+from payload_codecs import GzipCodec, RawCodec, ZstdCodec, train_zstd_dictionary  # noqa: E402
+
+
+def load_stored_payloads(prefix: str, limit: int) -> list:
+    """Read stored game results and return them as serialized JSON."""
+    payloads = []
+    for key in storage.list_objects(prefix)[:limit]:
+        data = storage.read_dict(key)
+        if data is not None:
+            payloads.append(json.dumps(data).encode("utf-8"))
+    return payloads
+
+
+def load_folder_payloads(folder: str, limit: int) -> list:
+    """Encode the clients of a train folder like the game server sends them."""
+    payloads = []
+    for label in "01":
+        label_dir = os.path.join(folder, label, "0")
+        if not os.path.isdir(label_dir):
+            continue
+        for client_id in sorted(os.listdir(label_dir)):
+            client = {}
+            for field, file_name in DOCUMENT_FILES.items():
+                path = os.path.join(label_dir, client_id, file_name)
+                if not os.path.exists(path):
+                    continue
+                with open(path, "rb") as f:
+                    content = f.read()
+                if field == "description":
+                    client[field] = content.decode("utf-8")
+                else:
+                    client[field] = base64.b64encode(content).decode("ascii")
+            payloads.append(json.dumps(client).encode("utf-8"))
+    # Mix both labels before truncating
+    return payloads[::2][: limit // 2 + limit % 2] + payloads[1::2][: limit // 2]
+
+
+def measure(codec, payloads: list, repeat: int) -> dict:
+    """Return the ratio and the compress/decompress throughput in MB/s of a codec."""
+    raw_bytes = sum(len(p) for p in payloads)
+    compressed = [codec.compress(p) for p in payloads]
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for payload in payloads:
+            codec.compress(payload)
+    compress_seconds = (time.perf_counter() - started) / repeat
+
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for payload in compressed:
+            codec.decompress(payload)
+    decompress_seconds = (time.perf_counter() - started) / repeat
+
+    stored_bytes = sum(len(c) for c in compressed)
+    return {
+        "ratio": raw_bytes / stored_bytes,
+        "stored_mb": stored_bytes / 1e6,
+        "compress_mb_s": raw_bytes / 1e6 / max(compress_seconds, 1e-9),
+        "decompress_mb_s": raw_bytes / 1e6 / max(decompress_seconds, 1e-9),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the payload codecs on game payloads")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--prefix", help="Storage prefix of stored game results")
+    source.add_argument("--folder", help="Local train folder to build payloads from")
+    parser.add_argument("--limit", type=int, default=200, help="Maximum number of payloads")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed passes per codec")
+    parser.add_argument("--dict-size", type=int, default=112640, help="Size of the trained zstd dictionary")
+    parser.add_argument("--save-dictionary", default=None, help="Write the trained dictionary to this path")
+    args = parser.parse_args()
+
+    from env import load_env
+
+    load_env()
+    if args.prefix is not None:
+        payloads = load_stored_payloads(args.prefix, args.limit)
+    else:
+        payloads = load_folder_payloads(args.folder, args.limit)
+    if len(payloads) < 4:
+        sys.exit(f"Found only {len(payloads)} payloads, need at least 4")
+
+    # Train the dictionary on one half and measure every codec on the other
+    training, evaluation = payloads[::2], payloads[1::2]
+    dictionary = train_zstd_dictionary(training, args.dict_size)
+    if args.save_dictionary:
+        Path(args.save_dictionary).write_bytes(dictionary)
+
+    codecs = {
+        "identity": RawCodec(),
+        "gzip-6": GzipCodec(6),
+        "gzip-9": GzipCodec(9),
+        "zstd-3": ZstdCodec(3),
+        "zstd-10": ZstdCodec(10),
+        "zstd-3+dict": ZstdCodec(3, dictionary),
+        "zstd-10+dict": ZstdCodec(10, dictionary),
+    }
+    raw_mb = sum(len(p) for p in evaluation) / 1e6
+    print(f"{len(evaluation)} payloads, {raw_mb:.1f} MB, dictionary trained on {len(training)}")
+    print(f"{'codec':<14}{'ratio':>8}{'stored MB':>12}{'compress MB/s':>16}{'decompress MB/s':>18}")
+    for name, codec in codecs.items():
+        result = measure(codec, evaluation, args.repeat)
+        print(
+            f"{name:<14}{result['ratio']:>8.2f}{result['stored_mb']:>12.2f}"
+            f"{result['compress_mb_s']:>16.1f}{result['decompress_mb_s']:>18.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
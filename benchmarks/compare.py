@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Compare two saved benchmark runs and report regressions.
+
+Runs are saved by the suite with --benchmark-save into baselines/ and are
+named by their file name, e.g. 0003_baseline, by a unique prefix such as
+0003, by the name given to --benchmark-save (its latest run), or by a path
+to the JSON file. Without arguments the latest run is compared with the one
+before it. The exit status is 1 if a benchmark got slower than the
+threshold, so the report can gate a CI job.
+
+Usage:
+    python -m pytest benchmarks --benchmark-save=baseline          # save a baseline
+    python -m pytest benchmarks --benchmark-save=candidate
+    python benchmarks/compare.py baseline candidate [--threshold 10] [--stat median]
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+BASELINES_DIR = Path(__file__).parent / "baselines"
+STATS = ("min", "median", "mean")
+
+
+def saved_runs(storage: Path = BASELINES_DIR) -> List[Path]:
+    """Saved runs of all machines, oldest first."""
+    return sorted(storage.glob("*/*.json"), key=lambda path: (path.stat().st_mtime, path.name))
+
+
+def resolve_run(spec: str, storage: Path = BASELINES_DIR) -> Path:
+    """Find the run file for a path, file name, number prefix or save name."""
+    path = Path(spec)
+    if path.is_file():
+        return path
+    matches = [
+        run for run in saved_runs(storage)
+        if run.stem == spec or run.stem.startswith(spec) or run.stem.split("_", 1)[-1] == spec
+    ]
+    if not matches:
+        raise ValueError(f"No saved benchmark run matches {spec!r} in {storage}")
+    return matches[-1]
+
+
+def load_run(path: Path) -> dict:
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+def compare_runs(baseline: dict, current: dict, stat: str = "median", threshold: float = 10.0) -> List[dict]:
+    """
+    Compare the benchmarks of two runs on one statistic.
+
+    Args:
+        baseline: Saved run to compare against
+        current: Saved run being checked
+        stat: Timing statistic compared, one of STATS
+        threshold: Slowdown in percent above which a benchmark counts as regressed
+
+    Returns:
+        One row per benchmark with both timings, the change in percent and a
+        status of regressed, improved, unchanged, new or removed
+    """
+    baseline_stats = {bench["fullname"]: bench["stats"][stat] for bench in baseline["benchmarks"]}
+    current_stats = {bench["fullname"]: bench["stats"][stat] for bench in current["benchmarks"]}
+
+    rows = []
+    for name in sorted(baseline_stats.keys() | current_stats.keys()):
+        before, after = baseline_stats.get(name), current_stats.get(name)
+        change = None
+        if before is None:
+            status = "new"
+        elif after is None:
+            status = "removed"
+        else:
+            change = 100 * (after - before) / before if before else 0.0
+            if change > threshold:
+                status = "regressed"
+            elif change < -threshold:
+                status = "improved"
+            else:
+                status = "unchanged"
+        rows.append({"name": name, "baseline": before, "current": after, "change": change, "status": status})
+    return rows
+
+
+def _format_time(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "-"
+    if seconds >= 1:
+        return f"{seconds:.2f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.1f} us"
+
+
+def print_report(rows: List[dict], baseline_path: Path, current_path: Path, stat: str, threshold: float):
+    print(f"Baseline: {baseline_path}")
+    print(f"Current:  {current_path}")
+    print(f"Compared on {stat}, regression threshold {threshold:.0f}%\n")
+
+    width = max([len(row["name"]) for row in rows] + [9])
+    print(f"{'benchmark':<{width}}{'baseline':>14}{'current':>14}{'change':>10}  status")
+    for row in rows:
+        change = f"{row['change']:+.1f}%" if row["change"] is not None else "-"
+        print(
+            f"{row['name']:<{width}}{_format_time(row['baseline']):>14}{_format_time(row['current']):>14}"
+            f"{change:>10}  {row['status']}"
+        )
+
+    counts = {}
+    for row in rows:
+        counts[row["status"]] = counts.get(row["status"], 0) + 1
+    print("\n" + ", ".join(f"{count} {status}" for status, count in sorted(counts.items())))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two saved benchmark runs")
+    parser.add_argument("baseline", nargs="?", default=None, help="Baseline run (default: the second latest run)")
+    parser.add_argument("current", nargs="?", default=None, help="Run to check (default: the latest run)")
+    parser.add_argument("--stat", choices=STATS, default="median", help="Timing statistic to compare")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Slowdown in percent reported as regression")
+    parser.add_argument("--storage", default=str(BASELINES_DIR), help="Directory of the saved runs")
+    args = parser.parse_args()
+
+    storage = Path(args.storage)
+    runs = saved_runs(storage)
+    try:
+        current_path = resolve_run(args.current, storage) if args.current else (runs[-1] if runs else None)
+        if args.baseline:
+            baseline_path = resolve_run(args.baseline, storage)
+        else:
+            earlier = [run for run in runs if run != current_path]
+            baseline_path = earlier[-1] if earlier else None
+    except ValueError as e:
+        parser.error(str(e))
+    if baseline_path is None or current_path is None:
+        parser.error(f"Need two saved runs in {storage}, save them with pytest benchmarks --benchmark-save=<name>")
+
+    baseline, current = load_run(baseline_path), load_run(current_path)
+    if baseline["machine_info"].get("cpu", {}).get("brand_raw") != current["machine_info"].get("cpu", {}).get("brand_raw"):
+        print("Warning: the runs were made on different CPUs, timings are not comparable\n")
+
+    rows = compare_runs(baseline, current, args.stat, args.threshold)
+    print_report(rows, baseline_path, current_path, args.stat, args.threshold)
+    sys.exit(1 if any(row["status"] == "regressed" for row in rows) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Fixtures of the benchmark suite.
+
+The suite runs without network access: documents are generated by
+sample_documents (or read from a client folder given with --client-dir),
+the Azure OpenAI client is replaced by a stand-in that answers from the
+recorded responses in recordings/, and storage goes to a local backend in a
+temporary directory. Runs saved with --benchmark-save are kept in
+baselines/ unless --benchmark-storage says otherwise. Saved runs are local
+to the machine and not committed: timings only compare between runs on the
+same hardware, so save a baseline before a change and compare after it.
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+ROOT = Path(__file__).parent.parent.absolute()
+BENCHMARKS_DIR = Path(__file__).parent.absolute()
+sys.path[:0] = [str(ROOT / "swisshacks"), str(ROOT), str(BENCHMARKS_DIR)]
+
+BASELINES_DIR = BENCHMARKS_DIR / "baselines"
+RECORDINGS_DIR = BENCHMARKS_DIR / "recordings"
+DEFAULT_STORAGE = "file://./.benchmarks"
+
+# Recorded LLM responses by file name
+RECORDINGS = {path.stem: path.read_text(encoding="utf-8") for path in RECORDINGS_DIR.glob("*.json")}
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--client-dir",
+        default=None,
+        help="Benchmark on the documents of this client folder instead of the generated ones",
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    # Runs before pytest-benchmark opens its storage
+    if config.getoption("benchmark_storage", None) == DEFAULT_STORAGE:
+        config.option.benchmark_storage = f"file://{BASELINES_DIR}"
+
+
+class RecordedOpenAI:
+    """
+    Stand-in for openai.AzureOpenAI that answers chat completions from the
+    recorded responses instead of calling the API: requests with an image
+    get recordings/passport.json, all others recordings/description.json.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    @staticmethod
+    def _recording(messages) -> str:
+        has_image = any(
+            isinstance(message["content"], list)
+            and any(part.get("type") == "image_url" for part in message["content"])
+            for message in messages
+        )
+        return "passport" if has_image else "description"
+
+    def _create(self, messages, **kwargs):
+        self.calls += 1
+        content = RECORDINGS[self._recording(messages)]
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+@pytest.fixture(scope="session", autouse=True)
+def recorded_llm():
+    """Replace the Azure OpenAI client for the whole session."""
+    import openai
+
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(openai, "AzureOpenAI", RecordedOpenAI)
+        yield RecordedOpenAI
+
+
+@pytest.fixture(scope="session")
+def documents(request) -> dict:
+    """Content of the passport, account, profile and description documents."""
+    client_dir = request.config.getoption("--client-dir")
+    if client_dir is None:
+        from sample_documents import client_documents
+
+        return client_documents()
+
+    from data_parsing.client_data_loader import DOCUMENT_FILES
+
+    return {document: (Path(client_dir) / file_name).read_bytes() for document, file_name in DOCUMENT_FILES.items()}
+
+
+@pytest.fixture(scope="session")
+def client_folder(documents, tmp_path_factory) -> Path:
+    """Folder holding the documents, laid out like a train client."""
+    from data_parsing.client_data_loader import DOCUMENT_FILES
+
+    folder = tmp_path_factory.mktemp("client")
+    for document, content in documents.items():
+        (folder / DOCUMENT_FILES[document]).write_bytes(content)
+    return folder
+
+
+@pytest.fixture(scope="session")
+def passport_parser(recorded_llm):
+    from data_parsing.client_passport_parser import ClientPassportParser, PassportBackendType
+
+    return ClientPassportParser(PassportBackendType.OPENAI)
+
+
+@pytest.fixture(scope="session")
+def client_data(documents, passport_parser):
+    """ClientData parsed from the documents."""
+    from client_data.client_data import ClientData
+    from data_parsing.client_account_parser import ClientAccountParser
+    from data_parsing.client_description_parser import ClientDescriptionParser
+    from data_parsing.client_profile_parser import ClientProfileParser
+
+    return ClientData(
+        client_file="benchmark",
+        account_form=ClientAccountParser.parse(documents["account"]),
+        client_description=ClientDescriptionParser.parse(documents["description"]),
+        client_profile=ClientProfileParser.parse(documents["profile"]),
+        passport=passport_parser.parse(documents["passport"]),
+    )
+
+
+@pytest.fixture
+def local_storage(tmp_path):
+    """Route the storage module to a local backend in a temporary directory."""
+    import storage
+    from storage_backends import LocalBackend
+
+    backend = LocalBackend(str(tmp_path / "storage"))
+    storage.set_backend(backend)
+    yield backend
+    storage.set_backend(None)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Measure cold import time of swisshacks modules with `python -X importtime`
+and compare it with the budget in import_budget.json.
+
+Usage:
+    python benchmarks/import_time.py [--repeat 5] [--update-budget]
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent.absolute()
+PACKAGE_DIR = ROOT / "swisshacks"
+BUDGET_PATH = Path(__file__).parent / "import_budget.json"
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(module: str) -> float:
+    """Import a module in a fresh interpreter and return the time it took in ms."""
+    env = dict(os.environ)
+    # The package modules import each other both as top-level modules and
+    # through the swisshacks package, so both roots need to be importable.
+    env["PYTHONPATH"] = os.pathsep.join([str(PACKAGE_DIR), str(ROOT)])
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PACKAGE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    # Top-level entries (parent packages and the module itself) add up to
+    # the cost of the import statement.
+    total_us = 0
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match and match.group(3) == " ":
+            total_us += int(match.group(2))
+    if not total_us:
+        raise RuntimeError(f"No importtime entries found for {module}")
+    return total_us / 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check swisshacks import times against a budget")
+    parser.add_argument("--repeat", "-r", type=int, default=5, help="Imports per module, the median is reported")
+    parser.add_argument("--update-budget", action="store_true", help="Write 2x the measured times as the new budget")
+    args = parser.parse_args()
+
+    with open(BUDGET_PATH, "r") as f:
+        budget = json.load(f)
+
+    measured = {}
+    over_budget = []
+    print(f"{'module':<45}{'median ms':>12}{'budget ms':>12}")
+    for module, limit in budget.items():
+        measured[module] = statistics.median(measure(module) for _ in range(args.repeat))
+        status = ""
+        if measured[module] > limit:
+            over_budget.append(module)
+            status = "  OVER BUDGET"
+        print(f"{module:<45}{measured[module]:>12.1f}{limit:>12.1f}{status}")
+
+    if args.update_budget:
+        with open(BUDGET_PATH, "w") as f:
+            json.dump({m: round(2 * t) for m, t in measured.items()}, f, indent=2)
+            f.write("\n")
+        print(f"Budget updated in {BUDGET_PATH}")
+    elif over_budget:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
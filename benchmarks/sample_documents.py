@@ -0,0 +1,268 @@
+"""
+Representative client documents for the benchmarks, generated on the fly.
+
+The documents follow the layout the parsers expect from the game documents:
+an account form PDF with AcroForm fields, a profile docx with the client
+information tables at their fixed indices, a description text with its
+section headings and a passport image with the fields at the positions the
+EasyOCR backend crops. All documents describe the same consistent client,
+so the rules run their full checks instead of stopping at a mismatch.
+"""
+
+import io
+from pathlib import Path
+from typing import Dict
+
+CLIENT = {
+    "first_name": "Erika",
+    "last_name": "Mustermann",
+    "gender": "Female",
+    "birth_date": "1985-01-01",
+    "nationality": "German",
+    "country": "Germany",
+    "country_code": "DEU",
+    "passport_number": "AB1234567",
+    "issue_date": "2020-01-01",
+    "expiry_date": "2030-01-01",
+    "street_name": "Hauptstrasse",
+    "building_number": "17",
+    "postal_code": "10115",
+    "city": "Berlin",
+    "phone_number": "+49 30 1234567",
+    "email": "erika.mustermann@example.com",
+    "employer": "ACME GmbH",
+    "position": "Engineer",
+    "university": "Technical University of Munich",
+    "graduation_year": 2008,
+}
+
+CHECKED = "☒"
+UNCHECKED = "☐"
+
+
+def passport_mrz(client: dict = CLIENT) -> list:
+    """TD3 machine readable zone of the client's passport with valid check digits."""
+    from data_parsing.mrz import compute_check_digit
+
+    number = client["passport_number"]
+    birth = client["birth_date"][2:].replace("-", "")
+    expiry = client["expiry_date"][2:].replace("-", "")
+    line1 = f"P<{client['country_code']}{client['last_name'].upper()}<<{client['first_name'].upper()}".ljust(44, "<")
+    line2 = (
+        f"{number}{compute_check_digit(number)}{client['country_code']}"
+        f"{birth}{compute_check_digit(birth)}{client['gender'][0]}"
+        f"{expiry}{compute_check_digit(expiry)}{'<' * 14}<"
+    )
+    composite = line2[0:10] + line2[13:20] + line2[21:43]
+    return [line1, line2 + compute_check_digit(composite)]
+
+
+def _pdf_string(value: str) -> str:
+    return "(" + value.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") + ")"
+
+
+def account_pdf(client: dict = CLIENT) -> bytes:
+    """Account opening form with one AcroForm field per account attribute."""
+    text_fields = {
+        "account_name": f"{client['first_name']} {client['last_name']}",
+        "account_holder_name": client["first_name"],
+        "account_holder_surname": client["last_name"],
+        "passport_number": client["passport_number"],
+        "other_ccy": "",
+        "building_number": client["building_number"],
+        "postal_code": client["postal_code"],
+        "city": client["city"],
+        "country": client["country"],
+        "street_name": client["street_name"],
+        "phone_number": client["phone_number"],
+        "email": client["email"],
+    }
+    checkboxes = {"chf": False, "eur": True, "usd": False}
+
+    lines = ["Account Opening Form", "Personal information", "Contact details", "Specimen signature"]
+    content = "BT /F1 12 Tf 72 740 Td " + " 0 -24 Td ".join(f"{_pdf_string(line)} Tj" for line in lines) + " ET"
+
+    # Objects 1-4 are the catalog, page tree, page and font; fields follow
+    field_count = len(text_fields) + len(checkboxes)
+    first_field = 6
+    field_refs = " ".join(f"{first_field + i} 0 R" for i in range(field_count))
+    objects = [
+        f"<< /Type /Catalog /Pages 2 0 R /AcroForm << /Fields [{field_refs}] >> >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 5 0 R "
+        f"/Resources << /Font << /F1 4 0 R >> >> /Annots [{field_refs}] >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        f"<< /Length {len(content)} >>\nstream\n{content}\nendstream",
+    ]
+    y = 600
+    for name, value in text_fields.items():
+        objects.append(
+            f"<< /Type /Annot /Subtype /Widget /FT /Tx /T {_pdf_string(name)} /V {_pdf_string(value)} "
+            f"/Rect [200 {y} 500 {y + 16}] /P 3 0 R >>"
+        )
+        y -= 20
+    for name, checked in checkboxes.items():
+        objects.append(
+            f"<< /Type /Annot /Subtype /Widget /FT /Btn /T {_pdf_string(name)} /V /{'Yes' if checked else 'Off'} "
+            f"/Rect [200 {y} 216 {y + 16}] /P 3 0 R >>"
+        )
+        y -= 20
+
+    pdf = io.BytesIO()
+    pdf.write(b"%PDF-1.7\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(pdf.tell())
+        pdf.write(f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1"))
+    xref = pdf.tell()
+    pdf.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1"))
+    for offset in offsets:
+        pdf.write(f"{offset:010d} 00000 n \n".encode("latin-1"))
+    pdf.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1"))
+    return pdf.getvalue()
+
+
+def _options(values, selected) -> str:
+    return " ".join(f"{CHECKED if value == selected else UNCHECKED} {value}" for value in values)
+
+
+def profile_docx(client: dict = CLIENT) -> bytes:
+    """Client profile form with the tables at the indices ClientProfileParser reads."""
+    import docx
+
+    address = f"{client['street_name']} {client['building_number']}, {client['postal_code']} {client['city']}"
+    tables = {
+        0: [("Client Information", "")],
+        1: [
+            ("Last Name", client["last_name"]),
+            ("First/ Middle Name (s)", client["first_name"]),
+            ("Address", address),
+            ("Date of birth", client["birth_date"]),
+            ("Nationality", client["nationality"]),
+            ("Passport No/ Unique ID", client["passport_number"]),
+            ("ID Type", "passport"),
+            ("ID Issue Date", client["issue_date"]),
+            ("ID Expiry Date", client["expiry_date"]),
+            ("Gender", _options(["Female", "Male"], client["gender"])),
+            ("Country of Domicile", client["country"]),
+        ],
+        3: [
+            ("Communication", f"Telephone {client['phone_number']}"),
+            ("", f"E-Mail {client['email']}"),
+        ],
+        5: [("Is the client or associated person a politically exposed person?", _options(["Yes", "No"], "No"))],
+        6: [
+            ("Marital Status", _options(["Single", "Married", "Divorced", "Widowed"], "Married")),
+            ("Highest education attained", "Tertiary"),
+            ("Education History", f"{client['university']} ({client['graduation_year']})"),
+        ],
+        8: [
+            ("Current employment and function", f"{CHECKED} Employee Since 2010"),
+            ("Current employment and function", f"Name Employer {client['employer']}"),
+            ("Current employment and function", f"Position {client['position']} (95000 EUR)"),
+        ],
+        9: [
+            ("", f"{UNCHECKED} Currently not employed Since"),
+            ("", "Previous Profession: Engineer"),
+            ("", f"{UNCHECKED} Retired Since"),
+        ],
+        11: [
+            ("Total wealth estimated", _options(["< EUR 1.5m", "EUR 1.5m-5m", "EUR 5m-10m"], "< EUR 1.5m")),
+            (f"Origin of wealth {CHECKED} Employment {UNCHECKED} Inheritance {UNCHECKED} Business", "Savings"),
+            ("Estimated assets", f"{CHECKED} Savings EUR 400000\n{CHECKED} Real Estate EUR 500000"),
+        ],
+        13: [
+            ("Estimated Total income p.a.", _options(["< EUR 250,000", "EUR 250,000 - 500,000"], "< EUR 250,000")),
+            ("Country of main source of income", client["country"]),
+        ],
+        15: [
+            ("Account Number", "DE0012345678"),
+            ("Commercial Account", _options(["Yes", "No"], "No")),
+            ("Investment Risk Profile", _options(["Low", "Moderate", "Considerable", "High"], "Moderate")),
+            ("Type of Mandate", _options(["Advisory", "Discretionary"], "Advisory")),
+            ("Investment Experience", _options(["Inexperienced", "Experienced", "Expert"], "Experienced")),
+            ("Investment Horizon", _options(["Short", "Medium", "Long-term"], "Long-term")),
+            ("Expected Transactional Behavior", "Monthly"),
+            ("Preferred Markets", "Germany, Switzerland"),
+        ],
+        17: [
+            ("Total Asset Under Management", "1,000,000"),
+            ("Asset Under Management to transfer", "250,000"),
+        ],
+    }
+
+    document = docx.Document()
+    for index in range(max(tables) + 1):
+        rows = tables.get(index, [("Section", "")])
+        table = document.add_table(rows=len(rows), cols=3)
+        for row, (label, value) in zip(table.rows, rows):
+            row.cells[0].text = label
+            row.cells[2].text = value
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def description_text(client: dict = CLIENT) -> bytes:
+    """Client description with the sections ClientDescriptionParser splits on."""
+    name = f"{client['first_name']} {client['last_name']}"
+    sections = [
+        ("Summary Note", f"{name} is a {client['nationality']} client introduced by a long-standing relationship."),
+        ("Family Background", f"{client['first_name']} is married and has two children."),
+        ("Education Background", f"{client['first_name']} graduated from {client['university']} in {client['graduation_year']}."),
+        ("Occupation History", f"Since 2010 {client['first_name']} works as {client['position']} at {client['employer']}."),
+        ("Wealth Summary", f"{client['first_name']} built savings of EUR 400000 and owns real estate worth EUR 500000."),
+        ("Client Summary", f"{name} wants to transfer part of the savings for long-term investment."),
+    ]
+    return "\n\n".join(f"{heading}: {text}" for heading, text in sections).encode("utf-8")
+
+
+def passport_png(client: dict = CLIENT) -> bytes:
+    """Passport image with each field drawn in the box the EasyOCR backend reads."""
+    from PIL import Image, ImageDraw, ImageFont
+
+    image = Image.new("RGB", (380, 280), "white")
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.load_default(size=11)
+    mrz = passport_mrz(client)
+    fields = {
+        (10, 21): f"{client['country'].upper()} / {client['country']}",
+        (130, 55): client["country_code"],
+        (22, 98): client["last_name"],
+        (131, 98): client["first_name"],
+        (245, 55): client["passport_number"],
+        (23, 139): client["birth_date"],
+        (135, 139): client["nationality"],
+        (135, 179): client["issue_date"],
+        (135, 209): client["expiry_date"],
+        (22, 177): client["gender"][0],
+        (250, 209): client["last_name"],
+        (15, 248): mrz[0],
+        (15, 260): mrz[1],
+    }
+    for position, text in fields.items():
+        draw.text(position, text, fill="black", font=font)
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def client_documents(client: dict = CLIENT) -> Dict[str, bytes]:
+    """Content of each document of the client, keyed like DOCUMENT_FILES."""
+    return {
+        "passport": passport_png(client),
+        "account": account_pdf(client),
+        "profile": profile_docx(client),
+        "description": description_text(client),
+    }
+
+
+def write_client_folder(folder: Path, client: dict = CLIENT) -> Path:
+    """Write the documents of the client to a folder laid out like a train client."""
+    from data_parsing.client_data_loader import DOCUMENT_FILES
+
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    for document, content in client_documents(client).items():
+        (folder / DOCUMENT_FILES[document]).write_bytes(content)
+    return folder
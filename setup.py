@@ -13,13 +13,20 @@ setup(
         "python-docx",
         "dataclasses-json",
         "pillow",
+        "numpy",
         "easyocr",
         "openai",
     ],
+    extras_require={
+        "zstd": ["zstandard"],
+        "bench": ["pytest", "pytest-benchmark"],
+    },
     entry_points={
         'console_scripts': [
             'swisshacks-play=swisshacks.play_game:run_game',
             'swisshacks-continuous=swisshacks.play_game:run_game_continuously',
+            'swisshacks-runner=swisshacks.game_runner:main',
+            'swisshacks-batch=swisshacks.batch_validate:main',
             'swisshacks-evaluate=swisshacks.evaluate_train:eval_on_trainset',
             'swisshacks-create-test=swisshacks.create_test_data:main',
             'swisshacks-validate=swisshacks.test_validations:main',
@@ -0,0 +1,219 @@
+"""
+Validate many client folders with a pool of worker processes and stream the
+results as JSON lines.
+
+Every worker builds its passport parser, document loader and model once and
+reuses them for all clients it is given. Results are written as soon as
+each client completes, one JSON object per line, so they can be piped into
+other tools while the batch is still running; a summary goes to stderr.
+
+Usage:
+    swisshacks-batch train/ --workers 8 > results.jsonl
+    swisshacks-batch folders.txt --passport-backend easyocr -o results.jsonl
+    find backlog/ -name passport.png -printf '%h\\n' | swisshacks-batch - --all-rules
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, List, Optional, TextIO, Tuple
+
+# Parser, loader and model of this worker process, built by _init_worker
+_worker = {}
+
+
+def find_client_folders(source: str) -> List[str]:
+    """
+    Collect the client folders to validate.
+
+    Args:
+        source: Directory searched recursively for folders holding the
+            documents of a client, a manifest file listing one folder per
+            line, or "-" to read the manifest from stdin
+
+    Returns:
+        Client folders in a stable order
+    """
+    if os.path.isdir(source):
+        from swisshacks.data_parsing.client_data_loader import DOCUMENT_FILES
+
+        folders = []
+        for directory, dirs, files in os.walk(source):
+            dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+            if all(file_name in files for file_name in DOCUMENT_FILES.values()):
+                folders.append(directory)
+        return folders
+
+    handle = sys.stdin if source == "-" else open(source, "r")
+    try:
+        return [line.strip() for line in handle if line.strip() and not line.startswith("#")]
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+
+def _init_worker(passport_backend: str, all_rules: bool):
+    from swisshacks.data_parsing.client_data_loader import ClientDataLoader
+    from swisshacks.data_parsing.client_passport_parser import ClientPassportParser, PassportBackendType
+    from swisshacks.env import load_env
+    from swisshacks.model.rule_based_model import SimpleModel
+
+    load_env()
+    passport_parser = ClientPassportParser(PassportBackendType(passport_backend))
+    # The pool already spreads clients over processes; parse a client's documents in threads
+    _worker["loader"] = ClientDataLoader(passport_parser, process_workers=0)
+    _worker["model"] = SimpleModel()
+    _worker["all_rules"] = all_rules
+
+
+def _failing_rules(client, verdicts: Dict[str, bool]) -> Tuple[List[str], Dict[str, str]]:
+    """
+    Evaluate every flag on a decided client.
+
+    Args:
+        client: Client already passed through SimpleModel.decide
+        verdicts: Verdicts of the flags decide ran, which are not run again
+
+    Returns:
+        Names of the failing flags in rule order, and the error of each flag that raised
+    """
+    from swisshacks.model.rule_based_model import RULES
+
+    failing, errors = [], {}
+    for flag, _ in RULES:
+        name = flag.__name__
+        if name not in verdicts:
+            try:
+                verdicts[name] = bool(flag(client))
+            except Exception as e:
+                # The client is decided already; a flag it never reached must not undo that
+                errors[name] = f"{type(e).__name__}: {e}"
+                continue
+        if verdicts[name]:
+            failing.append(name)
+    return failing, errors
+
+
+def validate_folder(folder: str) -> dict:
+    """
+    Parse and validate one client folder in a worker process.
+
+    Returns:
+        JSON-serializable result with the decision, failing rules and timings,
+        and with --all-rules the error of every flag that raised after the decision
+    """
+    started = time.perf_counter()
+    result = {"path": folder}
+    try:
+        client = _worker["loader"].load_directory(folder)
+        parsed = time.perf_counter()
+        verdicts = {}
+        decision, rule = _worker["model"].decide(client, verdicts)
+        decided = time.perf_counter()
+        if _worker["all_rules"]:
+            # The flags decide did not reach; flags may call external APIs
+            failing_rules, rule_errors = _failing_rules(client, verdicts)
+            if rule_errors:
+                result["rule_errors"] = rule_errors
+        else:
+            failing_rules = [rule] if rule else []
+        result.update(
+            status="ok",
+            decision=decision,
+            failing_rules=failing_rules,
+            timings_ms={
+                "parse": round((parsed - started) * 1000, 1),
+                "predict": round((decided - parsed) * 1000, 1),
+            },
+        )
+    except Exception as e:
+        result.update(status="error", error=f"{type(e).__name__}: {e}")
+    result.setdefault("timings_ms", {})["total"] = round((time.perf_counter() - started) * 1000, 1)
+    return result
+
+
+def validate_batch(
+    folders: List[str],
+    output: TextIO,
+    workers: Optional[int] = None,
+    passport_backend: str = "openai",
+    all_rules: bool = False,
+) -> dict:
+    """
+    Validate client folders in worker processes, writing one JSON line per
+    client to output in completion order.
+
+    Returns:
+        Summary counts and throughput of the batch
+    """
+    workers = workers or os.cpu_count() or 1
+    summary = {"clients": len(folders), "accepted": 0, "rejected": 0, "errors": 0}
+    started = time.perf_counter()
+
+    remaining = iter(enumerate(folders))
+    in_flight = {}
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(passport_backend, all_rules)
+    ) as pool:
+
+        def fill():
+            # A bounded window keeps memory flat for backlogs of any size
+            while len(in_flight) < 2 * workers:
+                item = next(remaining, None)
+                if item is None:
+                    return
+                in_flight[pool.submit(validate_folder, item[1])] = item[0]
+
+        fill()
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # The worker process died while validating this client
+                    result = {"path": folders[index], "status": "error", "error": f"{type(e).__name__}: {e}"}
+                result["index"] = index
+                output.write(json.dumps(result, ensure_ascii=False) + "\n")
+                output.flush()
+
+                if result["status"] != "ok":
+                    summary["errors"] += 1
+                elif result["decision"]:
+                    summary["accepted"] += 1
+                else:
+                    summary["rejected"] += 1
+            fill()
+
+    summary["elapsed"] = round(time.perf_counter() - started, 1)
+    summary["clients_per_second"] = round(len(folders) / summary["elapsed"], 2) if summary["elapsed"] else 0.0
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate client folders in parallel, streaming JSON lines")
+    parser.add_argument("source", help="Directory of client folders, manifest file with one folder per line, or -")
+    parser.add_argument("--workers", "-w", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--output", "-o", default=None, help="Output file (default: stdout)")
+    parser.add_argument(
+        "--passport-backend", default="openai", choices=["openai", "easyocr"], help="Passport parser backend"
+    )
+    parser.add_argument("--all-rules", action="store_true", help="Report every failing rule, not only the first")
+    args = parser.parse_args()
+
+    folders = find_client_folders(args.source)
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        summary = validate_batch(folders, output, args.workers, args.passport_backend, args.all_rules)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(json.dumps(summary), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -31,6 +31,16 @@ class ClientData:
     is_valid: bool = True
 
     def __post_init__(self):
+        self.update_validity()
+
+    def update_validity(self) -> bool:
+        """
+        Validate the parsed documents and store the result in is_valid.
+
+        Called on construction; call it again after correcting a field so
+        that is_valid reflects the corrected data.
+        """
+        self.is_valid = True
 
         if self.account_form is None:
             print("Account form cannot be None")
@@ -59,3 +69,4 @@ class ClientData:
         if not self.passport.is_valid():
             print("Passport is invalid")
             self.is_valid = False
+        return self.is_valid
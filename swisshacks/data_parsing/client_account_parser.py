@@ -13,7 +13,8 @@ except ImportError:
 
 # local imports
 from client_data.client_account import ClientAccount
-from data_parsing.client_parser import ParserClass
+from data_parsing.client_parser import DocumentSource, ParserClass, read_document
+from instrumentation import instrumented
 
 class ClientAccountParser(ParserClass):
     """Parser for client account pdf files"""
@@ -306,11 +307,15 @@ class ClientAccountParser(ParserClass):
         return client_account
 
     @staticmethod
-    def parse(pdf_path: Path) -> ClientAccount:
-        """Parse the client account pdf file and return a ClientAccount object"""
-        # Read the PDF file
-        with open(pdf_path, "rb") as file:
-            return ClientAccountParser.extract_client_data_from_pdf(file.read())
+    @instrumented("ClientAccountParser.parse")
+    def parse(pdf_path: DocumentSource) -> ClientAccount:
+        """
+        Parse the client account pdf and return a ClientAccount object
+
+        Args:
+            pdf_path: Path to the pdf file, or its content as bytes or a binary buffer
+        """
+        return ClientAccountParser.extract_client_data_from_pdf(read_document(pdf_path))
 
 
 if __name__ == "__main__":
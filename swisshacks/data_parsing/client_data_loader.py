@@ -0,0 +1,169 @@
+import multiprocessing
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from client_data.client_data import ClientData
+from data_parsing.client_account_parser import ClientAccountParser
+from data_parsing.client_description_parser import ClientDescriptionParser
+from data_parsing.client_parser import DocumentSource
+from data_parsing.client_passport_parser import ClientPassportParser
+from data_parsing.client_profile_parser import ClientProfileParser
+from instrumentation import REGISTRY, instrumented
+
+# File name of every document in a client directory
+DOCUMENT_FILES = {
+    "passport": "passport.png",
+    "account": "account.pdf",
+    "profile": "profile.docx",
+    "description": "description.txt",
+}
+
+# Parsers that are CPU-bound and run in the process pool
+CPU_PARSERS = {
+    "account": ClientAccountParser.parse,
+    "profile": ClientProfileParser.parse,
+    "description": ClientDescriptionParser.parse,
+}
+
+
+def _parse_document(document: str, source: DocumentSource):
+    """Module-level entry point so worker processes can unpickle the task."""
+    return CPU_PARSERS[document](source)
+
+
+def _parse_document_timed(document: str, source: DocumentSource) -> Tuple[Any, float, Optional[Exception]]:
+    """
+    Parse a document in a worker process.
+
+    Metrics a worker records stay in its own REGISTRY, so the parse time and
+    the exception, if any, are returned for the parent to record.
+
+    Returns:
+        The parsed document or None, the parse time in seconds and the exception raised or None
+    """
+    started = time.perf_counter()
+    try:
+        return _parse_document(document, source), time.perf_counter() - started, None
+    except Exception as e:
+        return None, time.perf_counter() - started, e
+
+
+class ClientDataLoader:
+    """
+    Parse the four documents of a client concurrently and assemble ClientData.
+
+    The passport parse is a network-bound LLM call and runs in a thread, while
+    the account, profile and description parsers are CPU-bound and run in a
+    process pool, so the latency of a client is that of its slowest parser
+    instead of the sum of all four. Parsers in worker processes return their
+    parse time with the result, and the loader records it in this process's
+    REGISTRY under the parser's stage, next to the end-to-end latency of
+    ClientDataLoader.load.
+    """
+
+    def __init__(
+        self,
+        passport_parser: ClientPassportParser,
+        process_workers: int = 3,
+        thread_workers: int = 4,
+    ):
+        """
+        Args:
+            passport_parser: Parser used for the passport images
+            process_workers: Size of the process pool for the CPU-bound parsers,
+                0 parses them in threads of the current process instead
+            thread_workers: Number of clients whose passports are parsed at the same time
+        """
+        self.passport_parser = passport_parser
+        self._threads = ThreadPoolExecutor(max_workers=thread_workers, thread_name_prefix="client-loader")
+        self._cpu: Executor
+        self._cpu_in_processes = bool(process_workers)
+        if process_workers:
+            # Workers are started on the first submit, from a loader thread; forking
+            # a process that runs threads can deadlock on locks held by them
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            self._cpu = ProcessPoolExecutor(
+                max_workers=process_workers, mp_context=multiprocessing.get_context(method)
+            )
+        else:
+            self._cpu = ThreadPoolExecutor(max_workers=len(CPU_PARSERS), thread_name_prefix="client-parser")
+
+    def submit(self, identifier: str, sources: Dict[str, DocumentSource]) -> Future:
+        """
+        Start parsing the documents of a client.
+
+        Args:
+            identifier: Value stored as ClientData.client_file
+            sources: Path or content of each document, keyed like DOCUMENT_FILES
+
+        Returns:
+            Future resolving to the assembled ClientData
+        """
+        missing = DOCUMENT_FILES.keys() - sources.keys()
+        if missing:
+            raise ValueError(f"Missing documents for {identifier}: {sorted(missing)}")
+        return self._threads.submit(self._load, identifier, sources)
+
+    def load(self, identifier: str, sources: Dict[str, DocumentSource]) -> ClientData:
+        """Parse the documents of a client and return the assembled ClientData."""
+        return self.submit(identifier, sources).result()
+
+    def load_directory(self, directory: Path, identifier: Optional[str] = None) -> ClientData:
+        """Parse a client directory holding the files listed in DOCUMENT_FILES."""
+        directory = Path(directory)
+        sources = {document: directory / file_name for document, file_name in DOCUMENT_FILES.items()}
+        return self.load(identifier or directory.name, sources)
+
+    @instrumented("ClientDataLoader.load")
+    def _load(self, identifier: str, sources: Dict[str, DocumentSource]) -> ClientData:
+        parse = _parse_document_timed if self._cpu_in_processes else _parse_document
+        cpu_futures = {
+            document: self._cpu.submit(parse, document, sources[document])
+            for document in CPU_PARSERS
+        }
+        try:
+            passport = self.passport_parser.parse(sources["passport"])
+        except Exception:
+            # Do not leave queued work behind in the pool if the passport failed
+            for future in cpu_futures.values():
+                future.cancel()
+            raise
+
+        parsed = self._cpu_results(cpu_futures)
+        return ClientData(
+            client_file=identifier,
+            account_form=parsed["account"],
+            client_description=parsed["description"],
+            client_profile=parsed["profile"],
+            passport=passport,
+        )
+
+    def _cpu_results(self, futures: Dict[str, Future]) -> Dict[str, Any]:
+        """Wait for the CPU parses, recording their metrics if they ran in worker processes."""
+        if not self._cpu_in_processes:
+            # The parsers' instrumentation already recorded them in this process
+            return {document: future.result() for document, future in futures.items()}
+        results, errors = {}, []
+        for document, future in futures.items():
+            result, seconds, error = future.result()
+            REGISTRY.observe(CPU_PARSERS[document].stage_name, seconds, error=error is not None)
+            results[document] = result
+            if error is not None:
+                errors.append(error)
+        # Record every parse before failing the client
+        if errors:
+            raise errors[0]
+        return results
+
+    def close(self):
+        """Wait for running parses and shut the worker pools down."""
+        self._threads.shutdown(wait=True)
+        self._cpu.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -4,30 +4,32 @@ from pathlib import Path
 import argparse  # Add import for argument parsing
 
 from client_data.client_description import ClientDescription
-from data_parsing.client_parser import ParserClass
+from data_parsing.client_parser import DocumentSource, ParserClass, read_document
+from instrumentation import instrumented
 
 class ClientDescriptionParser(ParserClass):
     """Parser for client description text files"""
 
     @staticmethod
-    def parse(text_path: Path) -> ClientDescription:
+    @instrumented("ClientDescriptionParser.parse")
+    def parse(text_path: DocumentSource) -> ClientDescription:
         """
         Parse the client description text file and return a ClientDescription object
         
         Args:
-            text_path (str): Path to the description text file
+            text_path (str): Path to the description text file, or its content as bytes or a binary buffer
             
         Returns:
             ClientDescription: Populated client description object
         """
         try:
             # Check if file exists
-            if not os.path.exists(text_path):
+            if isinstance(text_path, (str, Path)) and not os.path.exists(text_path):
                 raise FileNotFoundError(f"File not found: {text_path}")
             
-            # Read the text file
-            with open(text_path, 'r', encoding='utf-8') as file:
-                content = file.read()
+            # Read the text, normalizing newlines the way text mode does
+            content = read_document(text_path).decode('utf-8')
+            content = content.replace('\r\n', '\n').replace('\r', '\n')
             
             # Create ClientDescription object
             client_description = ClientDescription()
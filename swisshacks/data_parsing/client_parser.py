@@ -1,9 +1,34 @@
 from abc import ABC, abstractmethod
 from pathlib import Path
 from dataclasses import dataclass
+from typing import BinaryIO, Union
+
+# A document handed to a parser: a path on disk or its content in memory
+DocumentSource = Union[str, Path, bytes, bytearray, memoryview, BinaryIO]
+
+
+def read_document(source: DocumentSource) -> bytes:
+    """
+    Return the raw content of a document given as a path, a buffer or a
+    binary file-like object.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    if isinstance(source, (str, Path)):
+        with open(source, "rb") as file:
+            return file.read()
+    return source.read()
+
+
+def describe_document(source: DocumentSource) -> str:
+    """Name a document for log messages without dumping in-memory content."""
+    if isinstance(source, (str, Path)):
+        return str(source)
+    return f"<in-memory document, {type(source).__name__}>"
+
 
 class ParserClass(ABC):
     @abstractmethod
-    def parse(self, path_to_file: Path) -> dataclass:
+    def parse(self, path_to_file: DocumentSource) -> dataclass:
         pass
-    
\ No newline at end of file
+    
@@ -1,45 +1,81 @@
 from pathlib import Path
 from enum import Enum
+from typing import Optional
 
 from client_data.client_passport import ClientPassport
-from data_parsing.client_parser import ParserClass
+from data_parsing.client_parser import DocumentSource, ParserClass, read_document
+from data_parsing.mrz import passes_check_digits
+from instrumentation import instrumented
 
 class PassportBackendType(Enum):
     OPENAI = "openai"
     EASY_OCR = "easyocr"
     TESSERACT = "tesseract"
 
+def create_backend(backend_type: PassportBackendType):
+    """Instantiate the passport parser for the given backend type."""
+    if backend_type == PassportBackendType.OPENAI:
+        from data_parsing.parse_passport_openai import PassportParserOpenAI
+        return PassportParserOpenAI()
+    elif backend_type == PassportBackendType.EASY_OCR:
+        from data_parsing.parse_passport_easyocr import PassportParserEasyOCR
+        return PassportParserEasyOCR()
+    elif backend_type == PassportBackendType.TESSERACT:
+        raise NotImplementedError("Tesseract backend is not implemented yet.")
+    else:
+        raise ValueError(f"Unsupported backend type: {backend_type}")
+
+
 class ClientPassportParser(ParserClass):
-    def __init__(self, backend_type: PassportBackendType):
+    def __init__(
+        self,
+        backend_type: PassportBackendType,
+        fallback_backend_type: Optional[PassportBackendType] = None,
+    ):
+        """
+        Args:
+            backend_type: Backend used for every passport
+            fallback_backend_type: Optional backend used when the MRZ read by
+                the first backend fails its check digits
+        """
         self.backend_type = backend_type
-        self.parser = None
-        
-        if backend_type == PassportBackendType.OPENAI:
-            from data_parsing.parse_passport_openai import PassportParserOpenAI
-            self.parser = PassportParserOpenAI()
-        elif backend_type == PassportBackendType.EASY_OCR:
-            from data_parsing.parse_passport_easyocr import PassportParserEasyOCR
-            self.parser = PassportParserEasyOCR()
-        elif backend_type == PassportBackendType.TESSERACT:
-            raise NotImplementedError("Tesseract backend is not implemented yet.")
-        else:
-            raise ValueError(f"Unsupported backend type: {backend_type}")
-        
-        
-    def parse(self, passport_file_path: Path) -> ClientPassport:
+        self.fallback_backend_type = fallback_backend_type
+        self.parser = create_backend(backend_type)
+        self.fallback_parser = None
+
+    @instrumented("ClientPassportParser.parse")
+    def parse(self, passport_file_path: DocumentSource) -> ClientPassport:
         """
         Parse a passport image (PNG) to extract structured data.
-        
+
+        The MRZ check digits act as a confidence signal: if they fail and a
+        fallback backend is configured, the passport is parsed again with it
+        and the fallback result is kept when its MRZ validates.
+
         Args:
-            passport_file_path: Path to the passport image file
+            passport_file_path: Path to the passport image file, or its
+                content as bytes or a binary buffer
             
         Returns:
             Dictionary containing extracted passport information
         """
         if not self.parser:
             raise ValueError("Parser not initialized.")
-        
-        return self.parser.parse(passport_file_path)
+
+        # A stream can only be consumed once, keep the bytes for the fallback
+        if not isinstance(passport_file_path, (str, Path, bytes, bytearray, memoryview)):
+            passport_file_path = read_document(passport_file_path)
+
+        passport = self.parser.parse(passport_file_path)
+        if self.fallback_backend_type is None or passes_check_digits(passport.passport_mrz):
+            return passport
+
+        if self.fallback_parser is None:
+            self.fallback_parser = create_backend(self.fallback_backend_type)
+        fallback_passport = self.fallback_parser.parse(passport_file_path)
+        if passes_check_digits(fallback_passport.passport_mrz):
+            return fallback_passport
+        return passport
     
 
         
\ No newline at end of file
@@ -1,3 +1,4 @@
+import io
 import docx
 import logging
 import argparse  # Add import for argument parsing
@@ -15,6 +16,8 @@ from swisshacks.client_data.client_profile import (
     IncomeRange,
     WealthSource,
 )
+from data_parsing.client_parser import DocumentSource, describe_document, read_document
+from instrumentation import instrumented
 
 
 class ClientProfileParser:
@@ -386,8 +389,9 @@ class ClientProfileParser:
                     client.account_details.transfer_assets = row_value
 
     @staticmethod
-    def parse(file_path: str) -> ClientProfile:
-        """Parse a docx file and return a ClientProfile object"""
+    @instrumented("ClientProfileParser.parse")
+    def parse(file_path: DocumentSource) -> ClientProfile:
+        """Parse a docx file (path, bytes or binary buffer) and return a ClientProfile object"""
         client = ClientProfile()
         primary_employment = Employment()
         
@@ -395,8 +399,8 @@ class ClientProfileParser:
         logger = logging.getLogger("ClientProfileParser")
 
         try:
-            logger.info(f"Parsing profile document: {file_path}")
-            doc = docx.Document(file_path)
+            logger.info(f"Parsing profile document: {describe_document(file_path)}")
+            doc = docx.Document(io.BytesIO(read_document(file_path)))
 
             # Parse tables based on their function
             for i, table in enumerate(doc.tables):
@@ -451,7 +455,7 @@ class ClientProfileParser:
             logger.info(f"Successfully parsed profile for {client.first_name} {client.last_name}")
             
         except Exception as e:
-            logger.error(f"Error parsing {file_path}: {e}")
+            logger.error(f"Error parsing {describe_document(file_path)}: {e}")
 
         return client
 
@@ -0,0 +1,197 @@
+"""Decoder for ICAO 9303 TD3 (passport) machine readable zones."""
+
+from dataclasses import dataclass
+from typing import List, Sequence
+
+TD3_LINE_LENGTH = 44
+
+# Weights cycle 7, 3, 1 over the characters of a checked field.
+CHECK_DIGIT_WEIGHTS = (7, 3, 1)
+
+# OCR misreads that can be undone in positions that can only hold digits.
+NUMERIC_OCR_FIXES = str.maketrans({"O": "0", "D": "0", "Q": "0", "I": "1", "L": "1", "Z": "2", "S": "5", "B": "8"})
+
+
+def _character_value(char: str) -> int:
+    if char.isdigit():
+        return int(char)
+    if "A" <= char <= "Z":
+        return ord(char) - ord("A") + 10
+    if char == "<":
+        return 0
+    raise ValueError(f"Invalid MRZ character: {char!r}")
+
+
+def compute_check_digit(value: str) -> str:
+    """Compute the ICAO 9303 check digit of an MRZ field."""
+    total = sum(
+        _character_value(char) * CHECK_DIGIT_WEIGHTS[i % 3]
+        for i, char in enumerate(value)
+    )
+    return str(total % 10)
+
+
+def normalize_mrz_line(line: str) -> str:
+    """Uppercase an MRZ line and drop whitespace introduced by OCR."""
+    return "".join(line.split()).upper().replace("«", "<")
+
+
+def _numeric(value: str) -> str:
+    return value.translate(NUMERIC_OCR_FIXES)
+
+
+def _check_passes(value: str, check: str) -> bool:
+    try:
+        return compute_check_digit(value) == check
+    except ValueError:
+        return False
+
+
+def _composite(line2: str) -> str:
+    return line2[0:10] + line2[13:20] + line2[21:43]
+
+
+def _repair_field(line2: str, start: int, check: int, digits_start: int) -> str:
+    """
+    Undo OCR confusions in line2[digits_start:check + 1], the digits of a
+    field and its check digit, if that makes the check digit over
+    line2[start:check] pass. Otherwise the line is returned unchanged, so a
+    corrupted field still fails its check.
+    """
+    if _check_passes(line2[start:check], line2[check]):
+        return line2
+    repaired = line2[:digits_start] + _numeric(line2[digits_start:check + 1]) + line2[check + 1:]
+    if _check_passes(repaired[start:check], repaired[check]):
+        return repaired
+    return line2
+
+
+def repair_ocr_digits(line2: str) -> str:
+    """
+    Undo OCR confusions (O for 0, S for 5, ...) in the digit positions of a
+    normalized TD3 line 2, field by field, keeping a substitution only where
+    it turns a failing check digit into a passing one.
+    """
+    line2 = _repair_field(line2, 0, 9, 9)  # document number check digit
+    line2 = _repair_field(line2, 13, 19, 13)  # birth date
+    line2 = _repair_field(line2, 21, 27, 21)  # expiry date
+    if not _check_passes(_composite(line2), line2[43]) and _check_passes(_composite(line2), _numeric(line2[43])):
+        line2 = line2[:43] + _numeric(line2[43])
+    return line2
+
+
+@dataclass
+class TD3MRZ:
+    """Fields of a two-line TD3 MRZ, as printed (dates are YYMMDD)."""
+
+    document_type: str
+    issuing_country: str
+    surname: str
+    given_names: str
+    document_number: str
+    document_number_check: str
+    nationality: str
+    birth_date: str
+    birth_date_check: str
+    sex: str
+    expiry_date: str
+    expiry_date_check: str
+    optional_data: str
+    optional_data_check: str
+    composite_check: str
+    line1: str
+    line2: str
+
+    def failed_checks(self) -> List[str]:
+        """
+        Validate all check digits of the MRZ.
+
+        Returns:
+            Names of the fields whose check digit does not match, empty if all pass
+        """
+        line2 = self.line2
+        checks = [
+            ("document_number", self.document_number, self.document_number_check),
+            ("birth_date", self.birth_date, self.birth_date_check),
+            ("expiry_date", self.expiry_date, self.expiry_date_check),
+            ("composite", _composite(line2), self.composite_check),
+        ]
+        # An empty optional data field may carry a filler instead of a digit
+        if not (self.optional_data_check == "<" and self.optional_data.strip("<") == ""):
+            checks.append(("optional_data", self.optional_data, self.optional_data_check))
+
+        failed = []
+        for name, value, check in checks:
+            try:
+                if compute_check_digit(value) != check:
+                    failed.append(name)
+            except ValueError:
+                failed.append(name)
+        return failed
+
+    def is_valid(self) -> bool:
+        """Check if all check digits of the MRZ are correct."""
+        return not self.failed_checks()
+
+
+def decode_td3(line1: str, line2: str, ocr_fixes: bool = False) -> TD3MRZ:
+    """
+    Decode both lines of a TD3 passport MRZ into fields.
+
+    Args:
+        line1: First MRZ line (document type, issuing state and name)
+        line2: Second MRZ line (document number, dates and check digits)
+        ocr_fixes: Repair OCR confusions in digit positions where that makes
+            a check digit pass (see repair_ocr_digits). Off by default, so
+            validators see the MRZ as read.
+
+    Returns:
+        TD3MRZ with the decoded fields
+
+    Raises:
+        ValueError: If the lines do not have the TD3 layout
+    """
+    line1 = normalize_mrz_line(line1)
+    line2 = normalize_mrz_line(line2)
+
+    if len(line1) != TD3_LINE_LENGTH or len(line2) != TD3_LINE_LENGTH:
+        raise ValueError(
+            f"TD3 MRZ lines must have {TD3_LINE_LENGTH} characters, got {len(line1)} and {len(line2)}"
+        )
+    if not line1.startswith("P"):
+        raise ValueError(f"TD3 MRZ must start with 'P', got {line1[0]!r}")
+
+    if ocr_fixes:
+        line2 = repair_ocr_digits(line2)
+
+    surname, _, given_names = line1[5:].partition("<<")
+
+    return TD3MRZ(
+        document_type=line1[0:2].rstrip("<"),
+        issuing_country=line1[2:5].rstrip("<"),
+        surname=surname.replace("<", " ").strip(),
+        given_names=given_names.replace("<", " ").strip(),
+        document_number=line2[0:9],
+        document_number_check=line2[9],
+        nationality=line2[10:13].rstrip("<"),
+        birth_date=line2[13:19],
+        birth_date_check=line2[19],
+        sex=line2[20],
+        expiry_date=line2[21:27],
+        expiry_date_check=line2[27],
+        optional_data=line2[28:42],
+        optional_data_check=line2[42],
+        composite_check=line2[43],
+        line1=line1,
+        line2=line2,
+    )
+
+
+def passes_check_digits(mrz_lines: Sequence[str], ocr_fixes: bool = False) -> bool:
+    """Return True if the lines decode as a TD3 MRZ with all check digits valid."""
+    if len(mrz_lines) != 2:
+        return False
+    try:
+        return decode_td3(*mrz_lines, ocr_fixes=ocr_fixes).is_valid()
+    except ValueError:
+        return False
@@ -1,16 +1,18 @@
 # system imports
 import argparse
+import io
 from pathlib import Path
 import json
 
 # third party imports
-import easyocr
 import numpy as np
-import cv2  # OpenCV for visualization
 from PIL import Image
 
 # local imports
 from client_data.client_passport import ClientPassport, GenderEnum
+from data_parsing.client_parser import DocumentSource, read_document
+from data_parsing.mrz import TD3_LINE_LENGTH, normalize_mrz_line, repair_ocr_digits
+from instrumentation import instrumented
 
 FIELD_BB ={
     "issuing_country": [(10,21), (370,21), (370,40), (10,40)],
@@ -31,13 +33,19 @@ FIELD_BB ={
 
 class PassportParserEasyOCR:
     def __init__(self, *args, **kwargs):
+        import easyocr
+
         self.reader = easyocr.Reader(['en'])  # specify the language
         self.threshold = 0.1  # default threshold for OCR confidence
         
         if "threshold" in kwargs:
             self.threshold = kwargs["threshold"]
 
-    def parse(self, passport_file_path: Path) -> ClientPassport:
+    @instrumented("PassportParserEasyOCR.parse")
+    def parse(self, passport_file_path: DocumentSource) -> ClientPassport:
+        """
+        Parse a passport image given as a path, or its content as bytes or a binary buffer.
+        """
         
         def crop_image(np_image: np.ndarray, bounding_box: list[tuple[int, int]]) -> np.ndarray:
             """
@@ -63,6 +71,10 @@ class PassportParserEasyOCR:
                 cleaned_list = [value for value in extracted_fields[field] if value is not None]
                 passport_mrz.append("".join(cleaned_list))
                 extracted_fields.pop(field)
+            # OCR confuses letters and digits; repair line 2 where that makes a check digit pass
+            line2 = normalize_mrz_line(passport_mrz[1])
+            if len(line2) == TD3_LINE_LENGTH:
+                passport_mrz[1] = repair_ocr_digits(line2)
             extracted_fields["passport_mrz"] = passport_mrz  
             return extracted_fields 
         
@@ -86,10 +98,10 @@ class PassportParserEasyOCR:
             
         
         # Read the image using EasyOCR
-        if not passport_file_path.exists():
+        if isinstance(passport_file_path, (str, Path)) and not Path(passport_file_path).exists():
             raise FileNotFoundError(f"File '{passport_file_path}' does not exist")
         
-        image = Image.open(passport_file_path)
+        image = Image.open(io.BytesIO(read_document(passport_file_path)))
         image_np = np.array(image)
             
         extraction_results = dict()    
@@ -129,6 +141,8 @@ class PassportParserEasyOCR:
         """
         Visualize the bounding boxes on the passport image.
         """
+        import cv2  # OpenCV for visualization
+
         image = Image.open(passport_file_path)
         image_np = np.array(image)
         
@@ -2,33 +2,37 @@ import base64
 import json
 from pathlib import Path
 import os
-from openai import AzureOpenAI
 
 from client_data.client_passport import ClientPassport, GenderEnum
-
-# Get API key from environment variable or define it
-api_key = os.environ.get("AZURE_OPENAI_API_KEY")
-api_endpoint = os.environ.get("AZURE_OPENAI_ENDPOINT")
+from data_parsing.client_parser import DocumentSource, read_document
+from instrumentation import instrumented
 
 
 class PassportParserOpenAI():
     def __init__(self, *args, **kwargs):
         """
         Initialize the PassportParserOpenAI class.
+
+        The API key and endpoint are read from AZURE_OPENAI_API_KEY and
+        AZURE_OPENAI_ENDPOINT when the parser is created, so they may be
+        loaded after this module is imported.
         """
         super().__init__(*args, **kwargs)
+        from openai import AzureOpenAI
+
         self.client = AzureOpenAI(
-            api_key=api_key,
+            api_key=os.environ.get("AZURE_OPENAI_API_KEY"),
             api_version="2025-03-01-preview",
-            azure_endpoint=api_endpoint,
+            azure_endpoint=os.environ.get("AZURE_OPENAI_ENDPOINT"),
         )
 
-    def parse(self, path_to_file: Path) -> ClientPassport:
+    @instrumented("PassportParserOpenAI.parse")
+    def parse(self, path_to_file: DocumentSource) -> ClientPassport:
         """
         Parse a passport image file to extract structured data.
 
         Args:
-            path_to_file: Path to the passport image file
+            path_to_file: Path to the passport image file, or the PNG content as bytes or a binary buffer
 
         Returns:
             ClientPassport object containing extracted passport information
@@ -48,13 +52,11 @@ class PassportParserOpenAI():
             else:
                 raise ValueError(f"Issuing country format is not recognized: {passport['issuing_country']!r}")
 
-        if not path_to_file.exists():
+        if isinstance(path_to_file, (str, Path)) and not Path(path_to_file).exists():
             raise FileNotFoundError(f"File '{path_to_file!r}' does not exist")
 
         # Encode PNG as base64 for the AI to analyze
-        with open(path_to_file, "rb") as image_file:
-            image_data = image_file.read()
-            encoded_data = base64.b64encode(image_data).decode("utf-8")
+        encoded_data = base64.b64encode(read_document(path_to_file)).decode("utf-8")
 
         passport_data = self.parse_png(encoded_data)
 
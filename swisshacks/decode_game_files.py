@@ -1,6 +1,10 @@
 import base64
 import os
 import mimetypes
+from pathlib import Path
+
+# Extensions for fields whose file type cannot be detected from the content
+FORCED_EXTENSIONS = {"profile": ".docx"}
 
 
 def detect_file_type(decoded_data):
@@ -124,3 +128,49 @@ def process_json_file(client_data, output_dir):
     except Exception as e:
         print(f"Error processing {output_dir}: {e}")
         return None
+
+
+def decode_field(encoded_data):
+    """Decode a base64 encoded field, falling back to the raw text if it is not base64"""
+    if isinstance(encoded_data, str):
+        try:
+            return base64.b64decode(encoded_data)
+        except Exception:
+            return encoded_data.encode("utf-8")
+    return base64.b64decode(encoded_data)
+
+
+def decode_client_files(client_data):
+    """
+    Decode the encoded fields of a game payload in memory.
+
+    Args:
+        client_data: Payload with base64 encoded passport, account, profile and description
+
+    Returns:
+        Dictionary mapping each non-empty field name to its decoded bytes
+    """
+    return {
+        field_name: decode_field(field_value)
+        for field_name, field_value in client_data.items()
+        if field_value
+    }
+
+
+def save_client_files(files, output_dir):
+    """
+    Write documents decoded by decode_client_files to a directory.
+
+    Returns:
+        Dictionary mapping each field name to the path it was saved to
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    results = {}
+    for field_name, data in files.items():
+        file_ext = FORCED_EXTENSIONS.get(field_name) or detect_file_type(data)
+        output_path = output_dir / f"{field_name}{file_ext}"
+        output_path.write_bytes(data)
+        results[field_name] = str(output_path)
+    return results
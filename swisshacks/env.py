@@ -0,0 +1,23 @@
+import functools
+import logging
+import os
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).parent.parent.absolute()
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=None)
+def load_env() -> bool:
+    """
+    Load the .env file from the project root into the environment.
+
+    Called by entry points rather than at import, so importing the package
+    stays free of I/O. Repeated calls are no-ops.
+    """
+    from dotenv import load_dotenv
+
+    env_path = os.path.join(PROJECT_ROOT, ".env")
+    logger.debug("Loading environment from %s", env_path)
+    return load_dotenv(env_path)
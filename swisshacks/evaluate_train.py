@@ -1,116 +1,77 @@
 from pathlib import Path
 
 import trainset
-from data_parsing.client_profile_parser import ClientProfileParser
-from data_parsing.client_account_parser import ClientAccountParser
-from data_parsing.client_description_parser import ClientDescriptionParser
+from env import load_env
 from data_parsing.client_passport_parser import ClientPassportParser, PassportBackendType
-from client_data.client_data import ClientData
+from data_parsing.client_data_loader import ClientDataLoader
 
 from model.document_validation_model import DocumentValidationFactory, ValidationModelType
+from model.decision_trace import configure_logging
+from instrumentation import REGISTRY
+from evaluation_metrics import EvaluationMetrics
 
 
-class TestStatistics:
-    def __init__(self):
-        self.false_positive: int = 0
-        self.false_negative: int = 0
-        self.true_positive: int = 0
-        self.true_negative: int = 0
+# Kept under its old name; the bookkeeping now lives in EvaluationMetrics
+TestStatistics = EvaluationMetrics
 
-    @property
-    def total_correct_predictions(self):
-        return self.true_positive + self.true_negative
 
-    @property
-    def total_incorrect_predictions(self):
-        return self.false_positive + self.false_negative
+def evaluate_range(minkey=None, maxkey=None, limit=None, verbose=True, log_path="validation_debug.log") -> EvaluationMetrics:
+    """
+    Evaluate the rule-based model on the train clients with ids in [minkey, maxkey).
 
-    @property
-    def total_samples(self):
-        return self.total_correct_predictions + self.total_incorrect_predictions
+    Args:
+        minkey: Smallest client id included
+        maxkey: Client ids from this value on are excluded
+        limit: Maximum number of clients
+        verbose: Print every prediction and the final report
+        log_path: File the validation log messages are written to
 
-    @property
-    def accuracy(self):
-        if self.total_samples == 0:
-            return 0
-        return (self.total_correct_predictions) / self.total_samples
-
-    def add_measurement(self, prediction: bool, ground_truth: bool):
-        if prediction is True:
-            if ground_truth is True:
-                self.true_positive += 1
-            else:
-                self.false_positive += 1
-        else:
-            if ground_truth is True:
-                self.false_negative += 1
-            else:
-                self.true_negative += 1
-
-    def get_confusion_matrix_dict(self) -> dict:
-        return {
-            "TP": self.true_positive,
-            "TN": self.true_negative,
-            "FP": self.false_positive,
-            "FN": self.false_negative,
-        }
-
-    def print_confusion_matrix(self):
-        matrix = self.get_confusion_matrix_dict()
-
-        # Create ASCII table for confusion matrix with proper axes
-        print("\nConfusion Matrix:")
-        print("+" + "-" * 31 + "+")
-        print("|" + " " * 10 + "|" + " Predicted ".center(20) + "|")
-        print("|" + " " * 10 + "+" + "-" * 9 + "+" + "-" * 10 + "|")
-        print("|" + " " * 10 + "|" + "Positive".center(9) + "|" + "Negative".center(10) + "|")
-        print("+" + "-" * 10 + "+" + "-" * 9 + "+" + "-" * 10 + "+")
-        print("|" + "Positive".center(10) + "|" + f"TP: {matrix['TP']}".center(9) + "|" + f"FN: {matrix['FN']}".center(10) + "|")
-        print("|" + " Ground ".center(10) + "|" + " " * 9 + "|" + " " * 10 + "|")
-        print("|" + " Truth ".center(10) + "+" + "-" * 9 + "+" + "-" * 10 + "+")
-        print("|" + "Negative".center(10) + "|" + f"FP: {matrix['FP']}".center(9) + "|" + f"TN: {matrix['TN']}".center(10) + "|")
-        print("+" + "-" * 10 + "+" + "-" * 9 + "+" + "-" * 10 + "+")
-
-    def __str__(self):
-        return f"Total: {self.total_samples}, Correct: {self.total_correct_predictions}, Incorrect: {self.total_incorrect_predictions}, Accuracy: {self.accuracy:.2f}, TP: {self.true_positive}, TN: {self.true_negative}, FP: {self.false_positive}, FN: {self.false_negative}"
-
-def eval_on_trainset():
-    trainiter = trainset.TrainIterator()
+    Returns:
+        Metrics of the evaluated clients, also if the run was interrupted
+    """
+    validation_logging = configure_logging(log_path, console=verbose)
     model = DocumentValidationFactory.create_model(ValidationModelType.RULE_BASED)()
-    stats = TestStatistics()
-    passport_parser = ClientPassportParser(PassportBackendType.OPENAI)
+    loader = ClientDataLoader(ClientPassportParser(PassportBackendType.OPENAI))
+    # Parse clients ahead while the model runs, so the loop waits on the model only
+    trainiter = trainset.PrefetchingTrainIterator(loader, prefetch=8, limit=limit, minkey=minkey, maxkey=maxkey)
+    stats = trainiter.metrics
 
     try:
-        for path in trainiter:
-            input_dir = Path(path)
-            print(input_dir)
-            identifier = path.split('/')[-1]
-
-            account = ClientAccountParser.parse(str(input_dir / "account.pdf"))
-            profile = ClientProfileParser.parse(input_dir / "profile.docx")
-            description = ClientDescriptionParser.parse(input_dir / "description.txt")
-            passport = passport_parser.parse(input_dir / "passport.png")
-
-            cd = ClientData(identifier, account, description, profile, passport)
-            prediction = model.predict(cd)
-            gt = bool(int((path.split('/')[-3][-1])))
-
-            stats.add_measurement(bool(prediction), bool(gt))
-
-            print(f"Prediction: {prediction}, GT: {gt}, Status: {gt == prediction}")
-
-            trainiter.predict(prediction)
-            print(trainiter, input_dir)
-            print("----------")
-
-            if stats.total_samples % 50 == 0:
-                print(stats)
+        for cd in trainiter:
+            input_dir = Path(trainiter.current_path)
+            prediction, rule = model.decide(cd)
+            gt = bool(cd.label)
+
+            # Updates the metrics, with the rejection attributed to the rule
+            trainiter.predict(prediction, rule)
+            if verbose:
+                print(input_dir)
+                print(f"Prediction: {prediction}, GT: {gt}, Status: {gt == prediction}")
+                print(trainiter, input_dir)
+                print("----------")
+
+                if stats.total_samples % 50 == 0:
+                    print(stats)
     except KeyboardInterrupt:
         print("User interrupted the run")
     finally:
-        print("Final Statistics:")
-        print(stats)
-        stats.print_confusion_matrix()
+        if verbose:
+            print("Final Statistics:")
+            print(stats)
+            stats.print_confusion_matrix()
+            print("\nRejections per rule:")
+            print(stats.rule_report())
+            print("\nPer-stage latency and reject rates:")
+            print(REGISTRY.report())
+        trainiter.close()
+        loader.close()
+        validation_logging.stop()
+    return stats
+
+
+def eval_on_trainset():
+    load_env()
+    evaluate_range()
 
 
 if __name__ == "__main__":
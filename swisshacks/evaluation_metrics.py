@@ -0,0 +1,185 @@
+"""Incremental evaluation metrics shared by the train iterators and evaluation scripts."""
+
+import json
+import os
+from typing import Dict, List, Optional
+
+
+class EvaluationMetrics:
+    """
+    Confusion counts, derived scores, misclassified clients and per-rule
+    attribution, updated in O(1) per prediction.
+
+    The positive class is a valid client (label 1, accepted). Rejections are
+    attributed to the flag that rejected the client, so a rule's false
+    negatives are valid clients it wrongly rejected. Metrics serialize to a
+    plain dict, so runs can be checkpointed and the results of shards merged.
+    """
+
+    def __init__(self):
+        self.true_positive: int = 0
+        self.true_negative: int = 0
+        self.false_positive: int = 0
+        self.false_negative: int = 0
+        # Identifiers (paths) of the misclassified clients
+        self.false_positives: List[str] = []
+        self.false_negatives: List[str] = []
+        # Rule name to {"rejected": n, "false_negatives": n}
+        self.rules: Dict[str, Dict[str, int]] = {}
+
+    def update(self, prediction: bool, ground_truth: bool, identifier: Optional[str] = None, rule: Optional[str] = None):
+        """
+        Record one prediction.
+
+        Args:
+            prediction: Whether the client was accepted
+            ground_truth: Whether the client is valid
+            identifier: Client path or id, kept for misclassified clients
+            rule: Name of the flag that rejected the client, if known
+        """
+        if prediction:
+            if ground_truth:
+                self.true_positive += 1
+            else:
+                self.false_positive += 1
+                if identifier is not None:
+                    self.false_positives.append(identifier)
+        else:
+            if ground_truth:
+                self.false_negative += 1
+                if identifier is not None:
+                    self.false_negatives.append(identifier)
+            else:
+                self.true_negative += 1
+            if rule is not None:
+                counts = self.rules.setdefault(rule, {"rejected": 0, "false_negatives": 0})
+                counts["rejected"] += 1
+                counts["false_negatives"] += int(bool(ground_truth))
+
+    def add_measurement(self, prediction: bool, ground_truth: bool):
+        """Record one prediction without identifier or rule."""
+        self.update(prediction, ground_truth)
+
+    @property
+    def total_correct_predictions(self) -> int:
+        return self.true_positive + self.true_negative
+
+    @property
+    def total_incorrect_predictions(self) -> int:
+        return self.false_positive + self.false_negative
+
+    @property
+    def total_samples(self) -> int:
+        return self.total_correct_predictions + self.total_incorrect_predictions
+
+    @property
+    def accuracy(self) -> float:
+        if self.total_samples == 0:
+            return 0.0
+        return self.total_correct_predictions / self.total_samples
+
+    @property
+    def precision(self) -> float:
+        predicted_positive = self.true_positive + self.false_positive
+        return self.true_positive / predicted_positive if predicted_positive else 0.0
+
+    @property
+    def recall(self) -> float:
+        actual_positive = self.true_positive + self.false_negative
+        return self.true_positive / actual_positive if actual_positive else 0.0
+
+    @property
+    def f1(self) -> float:
+        if self.precision + self.recall == 0:
+            return 0.0
+        return 2 * self.precision * self.recall / (self.precision + self.recall)
+
+    def get_confusion_matrix_dict(self) -> dict:
+        return {
+            "TP": self.true_positive,
+            "TN": self.true_negative,
+            "FP": self.false_positive,
+            "FN": self.false_negative,
+        }
+
+    def print_confusion_matrix(self):
+        matrix = self.get_confusion_matrix_dict()
+
+        # Create ASCII table for confusion matrix with proper axes
+        print("\nConfusion Matrix:")
+        print("+" + "-" * 31 + "+")
+        print("|" + " " * 10 + "|" + " Predicted ".center(20) + "|")
+        print("|" + " " * 10 + "+" + "-" * 9 + "+" + "-" * 10 + "|")
+        print("|" + " " * 10 + "|" + "Positive".center(9) + "|" + "Negative".center(10) + "|")
+        print("+" + "-" * 10 + "+" + "-" * 9 + "+" + "-" * 10 + "+")
+        print("|" + "Positive".center(10) + "|" + f"TP: {matrix['TP']}".center(9) + "|" + f"FN: {matrix['FN']}".center(10) + "|")
+        print("|" + " Ground ".center(10) + "|" + " " * 9 + "|" + " " * 10 + "|")
+        print("|" + " Truth ".center(10) + "+" + "-" * 9 + "+" + "-" * 10 + "+")
+        print("|" + "Negative".center(10) + "|" + f"FP: {matrix['FP']}".center(9) + "|" + f"TN: {matrix['TN']}".center(10) + "|")
+        print("+" + "-" * 10 + "+" + "-" * 9 + "+" + "-" * 10 + "+")
+
+    def rule_report(self) -> str:
+        """Table of the rejections attributed to each rule, most rejections first."""
+        lines = [f"{'rule':<40}{'rejected':>10}{'wrongly':>10}"]
+        for rule, counts in sorted(self.rules.items(), key=lambda item: -item[1]["rejected"]):
+            lines.append(f"{rule:<40}{counts['rejected']:>10}{counts['false_negatives']:>10}")
+        return "\n".join(lines)
+
+    def merge(self, other: "EvaluationMetrics") -> "EvaluationMetrics":
+        """Add the counts of another run, e.g. a different shard, to these metrics."""
+        self.true_positive += other.true_positive
+        self.true_negative += other.true_negative
+        self.false_positive += other.false_positive
+        self.false_negative += other.false_negative
+        self.false_positives.extend(other.false_positives)
+        self.false_negatives.extend(other.false_negatives)
+        for rule, counts in other.rules.items():
+            merged = self.rules.setdefault(rule, {"rejected": 0, "false_negatives": 0})
+            for key, value in counts.items():
+                merged[key] = merged.get(key, 0) + value
+        return self
+
+    def to_dict(self) -> dict:
+        return {
+            "confusion_matrix": self.get_confusion_matrix_dict(),
+            "accuracy": self.accuracy,
+            "precision": self.precision,
+            "recall": self.recall,
+            "false_positives": list(self.false_positives),
+            "false_negatives": list(self.false_negatives),
+            "rules": {rule: dict(counts) for rule, counts in self.rules.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "EvaluationMetrics":
+        """Restore metrics from to_dict output; the derived scores are recomputed."""
+        metrics = cls()
+        matrix = data["confusion_matrix"]
+        metrics.true_positive = matrix["TP"]
+        metrics.true_negative = matrix["TN"]
+        metrics.false_positive = matrix["FP"]
+        metrics.false_negative = matrix["FN"]
+        metrics.false_positives = list(data.get("false_positives", []))
+        metrics.false_negatives = list(data.get("false_negatives", []))
+        metrics.rules = {rule: dict(counts) for rule, counts in data.get("rules", {}).items()}
+        return metrics
+
+    def save(self, path: str):
+        """Write the metrics to a JSON file, replacing it atomically."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "EvaluationMetrics":
+        with open(path, "r") as f:
+            return cls.from_dict(json.load(f))
+
+    def __str__(self):
+        return (
+            f"Total: {self.total_samples}, Correct: {self.total_correct_predictions}, "
+            f"Incorrect: {self.total_incorrect_predictions}, Accuracy: {self.accuracy:.2f}, "
+            f"Precision: {self.precision:.2f}, Recall: {self.recall:.2f}, "
+            f"TP: {self.true_positive}, TN: {self.true_negative}, FP: {self.false_positive}, FN: {self.false_negative}"
+        )
@@ -0,0 +1,95 @@
+import os
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from rate_limit import RateLimiter
+
+BASE_URL = "https://hackathon-api.mlo.sehlat.io"
+
+# Request budget of the game API
+REQUESTS_PER_MINUTE = 55
+
+
+class GameClient:
+    """
+    Client for the game API.
+
+    All requests go through one requests.Session, so the TLS connection is
+    kept alive between decisions, and are paced by a RateLimiter that can be
+    shared between clients drawing from the same API budget.
+    """
+
+    def __init__(
+        self,
+        base_url: str = BASE_URL,
+        api_key: Optional[str] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        player_name: str = "3plus1",
+        timeout: float = 30.0,
+        pool_size: int = 4,
+    ):
+        """
+        Args:
+            base_url: Root URL of the game API
+            api_key: API key, defaults to JULIUS_BAER_API_KEY from the environment
+            rate_limiter: Limiter shared by all requests, defaults to REQUESTS_PER_MINUTE
+            player_name: Name the games are started under
+            timeout: Timeout of a single request in seconds
+            pool_size: Number of keep-alive connections kept open to the API
+        """
+        self.base_url = base_url.rstrip("/")
+        self.player_name = player_name
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or RateLimiter(REQUESTS_PER_MINUTE)
+
+        self.session = requests.Session()
+        self.session.headers["x-api-key"] = api_key or os.getenv("JULIUS_BAER_API_KEY") or ""
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def _post(self, endpoint: str, payload: dict) -> dict:
+        self.rate_limiter.acquire()
+        response = self.session.post(f"{self.base_url}{endpoint}", json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def start_game(self) -> dict:
+        """
+        Start a new game session.
+
+        Returns:
+            Response with session_id, client_id and client_data
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails
+        """
+        return self._post("/game/start", {"player_name": self.player_name})
+
+    def send_decision(self, session_id: str, client_id: str, decision) -> dict:
+        """
+        Send an Accept (truthy decision) or Reject to the API.
+
+        Returns:
+            Response with status, score and the next client_id and client_data
+
+        Raises:
+            requests.exceptions.RequestException: If the request fails
+        """
+        payload = {
+            "decision": "Accept" if decision == 1 else "Reject",
+            "client_id": client_id,
+            "session_id": session_id,
+        }
+        return self._post("/game/decision", payload)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
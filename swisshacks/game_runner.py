@@ -0,0 +1,221 @@
+"""
+Play several game sessions concurrently under one shared API budget.
+
+Usage:
+    swisshacks-runner --sessions 4 --games 20
+"""
+
+import argparse
+import asyncio
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import requests
+
+from swisshacks.decode_game_files import decode_client_files
+from swisshacks.data_parsing.client_passport_parser import ClientPassportParser, PassportBackendType
+from swisshacks.data_parsing.client_data_loader import ClientDataLoader
+from swisshacks.model.rule_based_model import SimpleModel
+from swisshacks.model.cached_predictor import CachedPredictor
+from swisshacks.env import PROJECT_ROOT, load_env
+from swisshacks.game_client import BASE_URL, REQUESTS_PER_MINUTE, GameClient
+from swisshacks.play_game import save_result
+from swisshacks.rate_limit import RateLimiter
+from swisshacks.uploader import BackgroundUploader
+
+data_dir = PROJECT_ROOT / "data"
+
+
+@dataclass
+class SessionResult:
+    """Outcome of one game session."""
+
+    worker: int
+    session_id: Optional[str] = None
+    score: int = 0
+    decisions: int = 0
+    elapsed: float = 0.0
+    error: Optional[str] = None
+    parse_seconds: List[float] = field(default_factory=list)
+
+
+class GameRunner:
+    """
+    Drive several game sessions as asyncio tasks.
+
+    The API only reveals the next client in the response to a decision, so a
+    single session is strictly sequential. Throughput comes from overlapping
+    sessions: while one session waits on the API, others parse and predict
+    in the shared loader pools. All sessions draw from one RateLimiter, so
+    together they stay within the request budget. API requests run on their
+    own threads, so a session blocked in the limiter never holds a thread the
+    predictor calls need.
+    """
+
+    def __init__(
+        self,
+        sessions: int = 4,
+        games: Optional[int] = None,
+        base_url: str = BASE_URL,
+        api_key: Optional[str] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        loader: Optional[ClientDataLoader] = None,
+        predictor=None,
+        uploader: Optional[BackgroundUploader] = None,
+    ):
+        """
+        Args:
+            sessions: Number of game sessions played at the same time
+            games: Total number of games to play, None to play until cancelled
+            base_url: Root URL of the game API
+            api_key: API key, defaults to JULIUS_BAER_API_KEY
+            rate_limiter: Limiter shared by all sessions, defaults to REQUESTS_PER_MINUTE
+            loader: Document loader shared by all sessions
+            predictor: Model deciding on each client, defaults to a cached SimpleModel
+            uploader: Uploader for the labelled results, None to not store them
+        """
+        self.sessions = sessions
+        self.games = games
+        self.base_url = base_url
+        self.api_key = api_key
+        self.rate_limiter = rate_limiter or RateLimiter(REQUESTS_PER_MINUTE)
+        self.loader = loader or ClientDataLoader(
+            ClientPassportParser(PassportBackendType.OPENAI), thread_workers=sessions
+        )
+        self.predictor = predictor or CachedPredictor(SimpleModel())
+        self.uploader = uploader
+        # One thread per session: at most one request of a session is in flight
+        self._api_executor = ThreadPoolExecutor(max_workers=sessions, thread_name_prefix="game-api")
+        self.results: List[SessionResult] = []
+        self._games_started = 0
+        self._started_at: Optional[float] = None
+
+    def _claim_game(self) -> bool:
+        # Only called from the event loop thread, no lock needed
+        if self.games is not None and self._games_started >= self.games:
+            return False
+        self._games_started += 1
+        return True
+
+    async def _call(self, func, *args, executor: Optional[ThreadPoolExecutor] = None):
+        """Run a blocking call in `executor`, the default executor if None."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, functools.partial(func, *args))
+
+    async def _decide(self, client_data: dict, level: int, result: SessionResult) -> int:
+        started = time.perf_counter()
+        files = decode_client_files(client_data)
+        identifier = str(data_dir / f"session_{result.worker}" / f"level_{level}")
+        try:
+            client_file = await asyncio.wrap_future(self.loader.submit(identifier, files))
+            decision = await self._call(self.predictor.predict, client_file)
+        except AssertionError as e:
+            print(f"[session {result.worker}] Error in client data: {e}")
+            decision = 0  # Default to Reject if there's an error
+        result.parse_seconds.append(time.perf_counter() - started)
+        return decision
+
+    async def play_session(self, worker: int) -> SessionResult:
+        """Play one game until game over and return its result."""
+        result = SessionResult(worker)
+        started = time.perf_counter()
+        client = GameClient(self.base_url, api_key=self.api_key, rate_limiter=self.rate_limiter)
+        try:
+            game_data = await self._call(client.start_game, executor=self._api_executor)
+            result.session_id = game_data["session_id"]
+            client_id = game_data["client_id"]
+            client_data = game_data["client_data"]
+
+            while True:
+                decision = await self._decide(client_data, result.score, result)
+                response = await self._call(
+                    client.send_decision, result.session_id, client_id, decision, executor=self._api_executor
+                )
+                result.decisions += 1
+                result.score = response["score"]
+
+                if response["status"] == "gameover":
+                    if self.uploader is not None:
+                        save_result(response, result.score + 1, 0, decision, self.uploader)
+                    break
+
+                client_id = response["client_id"]
+                client_data = response.get("client_data", {})
+                if self.uploader is not None:
+                    save_result(client_data, result.score, 1, decision, self.uploader)
+        except requests.exceptions.RequestException as e:
+            result.error = str(e)
+            print(f"[session {worker}] API error: {e}")
+        except Exception as e:
+            # Record the failure and let the other sessions play on
+            result.error = f"{type(e).__name__}: {e}"
+            print(f"[session {worker}] Error: {result.error}")
+        finally:
+            client.close()
+            result.elapsed = time.perf_counter() - started
+        return result
+
+    async def _worker(self, worker: int):
+        while self._claim_game():
+            result = await self.play_session(worker)
+            self.results.append(result)
+            print(f"[session {worker}] Game over with score {result.score} after {result.decisions} decisions")
+
+    async def run(self) -> List[SessionResult]:
+        """Play games on all sessions until `games` have been played."""
+        self._started_at = time.perf_counter()
+        await asyncio.gather(*(self._worker(i) for i in range(self.sessions)))
+        return self.results
+
+    def report(self) -> str:
+        """Summarize aggregate throughput and scores of the finished games."""
+        elapsed = time.perf_counter() - self._started_at if self._started_at else 0.0
+        decisions = sum(r.decisions for r in self.results)
+        scores = [r.score for r in self.results]
+        parse_times = sorted(t for r in self.results for t in r.parse_seconds)
+        lines = [
+            f"Games: {len(self.results)} ({sum(1 for r in self.results if r.error)} with errors)",
+            f"Decisions: {decisions} in {elapsed:.1f}s",
+            f"Throughput: {decisions / elapsed * 60 if elapsed else 0.0:.1f} decisions per minute",
+            f"Rate limiter wait: {self.rate_limiter.waited_seconds:.1f}s",
+        ]
+        if scores:
+            lines.append(f"Score: mean {sum(scores) / len(scores):.1f}, max {max(scores)}")
+        if parse_times:
+            lines.append(f"Parse and predict: median {parse_times[len(parse_times) // 2]:.2f}s")
+        return "\n".join(lines)
+
+    def close(self):
+        self._api_executor.shutdown(wait=True)
+        self.loader.close()
+        if self.uploader is not None:
+            self.uploader.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play several game sessions concurrently")
+    parser.add_argument("--sessions", "-s", type=int, default=4, help="Concurrent game sessions")
+    parser.add_argument("--games", "-g", type=int, default=None, help="Total games to play (default: run until interrupted)")
+    parser.add_argument("--no-upload", action="store_true", help="Do not store the labelled results")
+    args = parser.parse_args()
+
+    load_env()
+    runner = GameRunner(
+        sessions=args.sessions,
+        games=args.games,
+        uploader=None if args.no_upload else BackgroundUploader(),
+    )
+    try:
+        asyncio.run(runner.run())
+    except KeyboardInterrupt:
+        print("User interrupted the run")
+    finally:
+        runner.close()
+        print(runner.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""Call counts, reject counts and latency histograms for flags and parsers."""
+
+import bisect
+import functools
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+# Upper bounds of the latency buckets in seconds, Prometheus style
+LATENCY_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, float("inf"),
+)
+
+
+class StageMetrics:
+    """Counters and a fixed-bucket latency histogram for one flag or parser."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.rejects = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.bucket_counts = [0] * len(LATENCY_BUCKETS)
+
+    def observe(self, seconds: float, rejected: bool = False, error: bool = False):
+        self.calls += 1
+        self.rejects += rejected
+        self.errors += error
+        self.total_seconds += seconds
+        self.bucket_counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a latency quantile by interpolating within its bucket, the way
+        Prometheus' histogram_quantile does.
+        """
+        if self.calls == 0:
+            return 0.0
+        rank = q * self.calls
+        cumulative = 0
+        for i, count in enumerate(self.bucket_counts):
+            if cumulative + count >= rank and count:
+                lower = LATENCY_BUCKETS[i - 1] if i > 0 else 0.0
+                upper = LATENCY_BUCKETS[i]
+                if upper == float("inf"):
+                    return lower
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return LATENCY_BUCKETS[-2]
+
+    def snapshot(self) -> dict:
+        return {
+            "calls": self.calls,
+            "rejects": self.rejects,
+            "errors": self.errors,
+            "reject_rate": self.rejects / self.calls if self.calls else 0.0,
+            "total_seconds": self.total_seconds,
+            "mean_seconds": self.total_seconds / self.calls if self.calls else 0.0,
+            "p50_seconds": self.quantile(0.50),
+            "p95_seconds": self.quantile(0.95),
+            "p99_seconds": self.quantile(0.99),
+        }
+
+
+class MetricsRegistry:
+    """Process-wide collection of StageMetrics keyed by stage name."""
+
+    def __init__(self):
+        self._stages: Dict[str, StageMetrics] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float, rejected: bool = False, error: bool = False):
+        with self._lock:
+            stage = self._stages.get(name)
+            if stage is None:
+                stage = self._stages[name] = StageMetrics(name)
+            stage.observe(seconds, rejected, error)
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Return the current metrics of every stage as plain dictionaries."""
+        with self._lock:
+            return {name: stage.snapshot() for name, stage in self._stages.items()}
+
+    def to_prometheus(self, prefix: str = "swisshacks_stage") -> str:
+        """Render all stages in the Prometheus text exposition format."""
+        lines = [
+            f"# TYPE {prefix}_calls_total counter",
+            f"# TYPE {prefix}_rejects_total counter",
+            f"# TYPE {prefix}_errors_total counter",
+            f"# TYPE {prefix}_latency_seconds histogram",
+        ]
+        with self._lock:
+            for name, stage in sorted(self._stages.items()):
+                label = f'stage="{name}"'
+                lines.append(f"{prefix}_calls_total{{{label}}} {stage.calls}")
+                lines.append(f"{prefix}_rejects_total{{{label}}} {stage.rejects}")
+                lines.append(f"{prefix}_errors_total{{{label}}} {stage.errors}")
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, stage.bucket_counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{prefix}_latency_seconds_bucket{{{label},le="{le}"}} {cumulative}')
+                lines.append(f"{prefix}_latency_seconds_sum{{{label}}} {stage.total_seconds}")
+                lines.append(f"{prefix}_latency_seconds_count{{{label}}} {stage.calls}")
+        return "\n".join(lines) + "\n"
+
+    def report(self) -> str:
+        """Format a table of all stages, slowest total time first."""
+        snapshot = self.snapshot()
+        header = f"{'stage':<34}{'calls':>8}{'rejects':>9}{'rate':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'total s':>10}"
+        lines = [header, "-" * len(header)]
+        for name, stats in sorted(snapshot.items(), key=lambda item: -item[1]["total_seconds"]):
+            lines.append(
+                f"{name:<34}{stats['calls']:>8}{stats['rejects']:>9}"
+                f"{100 * stats['reject_rate']:>7.1f}%"
+                f"{1000 * stats['p50_seconds']:>10.2f}{1000 * stats['p95_seconds']:>10.2f}"
+                f"{1000 * stats['p99_seconds']:>10.2f}{stats['total_seconds']:>10.2f}"
+            )
+        return "\n".join(lines)
+
+
+REGISTRY = MetricsRegistry()
+
+
+def instrumented(name: Optional[str] = None, is_reject: Optional[Callable] = None):
+    """
+    Decorator recording call count, latency and exceptions of a function.
+
+    Args:
+        name: Stage name, defaults to the function's qualified name
+        is_reject: Optional predicate on the return value that counts a reject
+
+    The stage name is kept as the wrapper's stage_name attribute, for callers
+    that record the stage themselves, e.g. across a process boundary.
+    """
+    def decorator(func):
+        stage_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                REGISTRY.observe(stage_name, time.perf_counter() - started, error=True)
+                raise
+            rejected = bool(is_reject(result)) if is_reject is not None else False
+            REGISTRY.observe(stage_name, time.perf_counter() - started, rejected)
+            return result
+
+        wrapper.stage_name = stage_name
+        return wrapper
+
+    return decorator
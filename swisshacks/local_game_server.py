@@ -0,0 +1,139 @@
+"""
+Local stand-in for the game API, for exercising the game loop without
+network access or API budget.
+"""
+
+import json
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+
+class LocalGameServer:
+    """
+    Serve /game/start and /game/decision on localhost from a thread.
+
+    Clients are handed out in order; a decision that does not match the
+    client's label ends the game, as does running out of clients.
+
+    Usage:
+        with LocalGameServer(clients, labels) as server:
+            client = GameClient(server.url, api_key=server.api_key)
+    """
+
+    def __init__(
+        self,
+        clients: Optional[List[dict]] = None,
+        labels: Optional[List[bool]] = None,
+        api_key: str = "local-test-key",
+    ):
+        """
+        Args:
+            clients: client_data payloads served one per level
+            labels: Whether each client should be accepted, defaults to all True
+            api_key: Key the requests must carry in the x-api-key header
+        """
+        self.clients = clients if clients is not None else [{}]
+        self.labels = labels if labels is not None else [True] * len(self.clients)
+        if len(self.labels) != len(self.clients):
+            raise ValueError(f"Got {len(self.clients)} clients but {len(self.labels)} labels")
+        self.api_key = api_key
+        self.sessions = {}
+        self.request_count = 0
+        # Client address of every connection that sent a request, to check keep-alive
+        self.connections = set()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _client_response(self, session_id: str, level: int) -> dict:
+        return {
+            "session_id": session_id,
+            "client_id": f"{session_id}-{level}",
+            "client_data": self.clients[level],
+            "score": level,
+            "status": "active",
+        }
+
+    def _start(self, payload: dict) -> dict:
+        session_id = uuid.uuid4().hex
+        self.sessions[session_id] = {"player_name": payload.get("player_name"), "level": 0}
+        return self._client_response(session_id, 0)
+
+    def _decide(self, payload: dict) -> dict:
+        session = self.sessions.get(payload.get("session_id"))
+        if session is None:
+            raise KeyError("Unknown session")
+        level = session["level"]
+        if payload.get("client_id") != f"{payload['session_id']}-{level}":
+            raise KeyError("Unknown client")
+
+        accepted = payload.get("decision") == "Accept"
+        if accepted != self.labels[level] or level + 1 >= len(self.clients):
+            del self.sessions[payload["session_id"]]
+            score = level + 1 if accepted == self.labels[level] else level
+            return {"status": "gameover", "score": score}
+
+        session["level"] = level + 1
+        return self._client_response(payload["session_id"], level + 1)
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+
+                status, body = 200, None
+                with server._lock:
+                    server.request_count += 1
+                    server.connections.add(self.client_address)
+                    if self.headers.get("x-api-key") != server.api_key:
+                        status, body = 401, {"detail": "Invalid API key"}
+                    elif self.path == "/game/start":
+                        body = server._start(payload)
+                    elif self.path == "/game/decision":
+                        try:
+                            body = server._decide(payload)
+                        except KeyError as e:
+                            status, body = 404, {"detail": str(e)}
+                    else:
+                        status, body = 404, {"detail": "Not found"}
+
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
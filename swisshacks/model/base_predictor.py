@@ -2,6 +2,10 @@ from abc import ABC, abstractmethod
 from client_data.client_data import ClientData
 
 class BasePredictor(ABC):
+    # Identifies the rules a predictor applies. Decisions cached under one
+    # version are not reused once the rules change.
+    rulebook_version: str = "1"
+
     @abstractmethod
     def predict(self, client: ClientData) -> bool:
         raise NotImplementedError
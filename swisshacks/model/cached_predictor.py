@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from dataclasses import asdict
+from enum import Enum
+from pathlib import Path
+from typing import Any, Optional, Union
+
+from model.base_predictor import BasePredictor
+from client_data.client_data import ClientData
+
+# Metadata that changes on every parse without changing the documents
+IGNORED_FIELDS = {"parsed_date", "_optional_fields"}
+
+
+def _canonical(value: Any) -> Any:
+    """Convert parsed documents into plain JSON values with a stable ordering."""
+    if isinstance(value, dict):
+        return {
+            str(key): _canonical(item)
+            for key, item in value.items()
+            if key not in IGNORED_FIELDS
+        }
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted(_canonical(item) for item in value)
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def client_digest(client: ClientData, *namespace: str) -> str:
+    """
+    Compute an MD5 hash of the four parsed documents of a client.
+
+    Args:
+        client: Client data to hash
+        namespace: Extra strings mixed into the hash, e.g. model name and rulebook version
+
+    Returns:
+        Hex digest that is equal for clients with identical documents
+    """
+    documents = {
+        "account_form": asdict(client.account_form),
+        "client_description": asdict(client.client_description),
+        "client_profile": asdict(client.client_profile),
+        "passport": asdict(client.passport),
+        "namespace": list(namespace),
+    }
+    json_string = json.dumps(_canonical(documents), sort_keys=True, default=str)
+    return hashlib.md5(json_string.encode("utf-8")).hexdigest()
+
+
+class CachedPredictor(BasePredictor):
+    """
+    Memoize the decisions of any predictor by document content.
+
+    Decisions are kept in a bounded in-memory LRU and, when cache_dir is set,
+    in one small JSON file per client on disk, so resubmitted or duplicated
+    client files are answered without running the model again. The rulebook
+    version of the predictor is read once, when the cache is created.
+    """
+
+    def __init__(
+        self,
+        predictor: BasePredictor,
+        max_entries: int = 4096,
+        cache_dir: Optional[Union[str, Path]] = None,
+    ):
+        self.predictor = predictor
+        self.max_entries = max_entries
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, bool]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Hashing the rulebook walks the bytecode of every flag, too slow per predict
+        self._rulebook_version = predictor.rulebook_version
+
+    @property
+    def rulebook_version(self) -> str:
+        return self._rulebook_version
+
+    def cache_key(self, client: ClientData) -> str:
+        return client_digest(client, type(self.predictor).__name__, self._rulebook_version)
+
+    def predict(self, client: ClientData) -> bool:
+        key = self.cache_key(client)
+
+        decision = self._get(key)
+        with self._lock:
+            if decision is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if decision is not None:
+            return decision
+
+        decision = self.predictor.predict(client)
+        self._put(key, decision)
+        return decision
+
+    def clear(self):
+        """Drop the in-memory entries; the disk tier is left untouched."""
+        with self._lock:
+            self._entries.clear()
+
+    def _disk_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _get(self, key: str) -> Optional[bool]:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._disk_path(key), "r") as f:
+                decision = json.load(f)["decision"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+        self._remember(key, decision)
+        return decision
+
+    def _put(self, key: str, decision: bool):
+        self._remember(key, decision)
+        if self.cache_dir is None:
+            return
+        path = self._disk_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # A temp file per writer, threads storing the same key must not share one
+        with tempfile.NamedTemporaryFile("w", dir=path.parent, suffix=".tmp", delete=False) as f:
+            json.dump({"decision": decision}, f)
+        os.replace(f.name, path)
+
+    def _remember(self, key: str, decision: bool):
+        with self._lock:
+            self._entries[key] = decision
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
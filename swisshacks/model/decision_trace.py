@@ -0,0 +1,232 @@
+import atexit
+import contextvars
+import functools
+import json
+import logging
+import os
+import queue
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import List, Optional
+
+# Trace of the prediction running in the current thread or task, if sampled
+_current_trace: contextvars.ContextVar = contextvars.ContextVar("decision_trace", default=None)
+
+
+@dataclass
+class RuleVerdict:
+    """Outcome of a single flag within a prediction."""
+
+    rule: str
+    flagged: bool
+    duration_ms: float
+    # Log records emitted by the flag; formatted only when the trace is written
+    records: List[logging.LogRecord] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        return {
+            "rule": self.rule,
+            "flagged": self.flagged,
+            "duration_ms": round(self.duration_ms, 3),
+            "messages": [record.getMessage() for record in self.records],
+            "values": [[repr(arg) for arg in record.args or ()] for record in self.records],
+        }
+
+
+@dataclass
+class DecisionTrace:
+    """Rules evaluated for one client, their verdicts, compared values and timing."""
+
+    client_file: str
+    started_at: float = field(default_factory=time.time)
+    rules: List[RuleVerdict] = field(default_factory=list)
+    decision: Optional[bool] = None
+    _pending: List[logging.LogRecord] = field(default_factory=list)
+
+    def capture(self, record: logging.LogRecord):
+        """Keep a log record of the flag currently being evaluated."""
+        self._pending.append(record)
+
+    def add_rule(self, rule: str, flagged: bool, duration: float):
+        """Record the verdict of a flag together with the records it logged."""
+        self.rules.append(RuleVerdict(rule, flagged, duration * 1000, self._pending))
+        self._pending = []
+
+    def to_dict(self) -> dict:
+        return {
+            "client_file": self.client_file,
+            "started_at": datetime.fromtimestamp(self.started_at).isoformat(),
+            "decision": self.decision,
+            "duration_ms": round(sum(r.duration_ms for r in self.rules), 3),
+            "rules": [r.to_dict() for r in self.rules],
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False, default=str)
+
+
+class TraceCaptureHandler(logging.Handler):
+    """Attach records of the validation logger to the active decision trace."""
+
+    def emit(self, record: logging.LogRecord):
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.capture(record)
+
+
+# Attached to the validation logger by the first DecisionTracer
+_capture_handler = TraceCaptureHandler()
+
+
+def _enable_validation_logging(handler: logging.Handler):
+    """
+    Route validation messages to a consumer. Until one is attached the
+    logger stays at the default WARNING level, so the INFO messages of the
+    flags are rejected before a LogRecord is built.
+    """
+    validation_logger = logging.getLogger("validation")
+    validation_logger.setLevel(logging.INFO)
+    validation_logger.addHandler(handler)
+
+
+def _disable_validation_logging(handler: logging.Handler, level: int):
+    """Detach a consumer, restoring `level` once no consumer is left."""
+    validation_logger = logging.getLogger("validation")
+    validation_logger.removeHandler(handler)
+    if not validation_logger.handlers:
+        validation_logger.setLevel(level)
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """QueueHandler that leaves formatting to the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class _TraceFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return record.msg.to_json()
+
+
+class DecisionTracer:
+    """
+    Write sampled decision traces as JSON lines from a background thread.
+
+    Predictions only enqueue the trace object; serialization and file I/O
+    happen in a QueueListener thread. The tracer is closed at interpreter
+    exit, so traces still queued then are written out.
+    """
+
+    def __init__(self, path: str = "decision_traces.jsonl", sample_rate: float = 1.0):
+        self.path = path
+        self.sample_rate = sample_rate
+        self._queue = queue.Queue(-1)
+
+        file_handler = logging.FileHandler(path, encoding="utf-8")
+        file_handler.setFormatter(_TraceFormatter())
+        self._listener = QueueListener(self._queue, file_handler)
+        self._listener.start()
+
+        self._logger = logging.getLogger(f"validation.trace.{id(self)}")
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        self._logger.addHandler(_DeferredQueueHandler(self._queue))
+
+        _enable_validation_logging(_capture_handler)
+        self._closed = False
+        atexit.register(self.close)
+
+    @classmethod
+    def from_env(cls) -> Optional["DecisionTracer"]:
+        """
+        Create a tracer from DECISION_TRACE_PATH and DECISION_TRACE_SAMPLE_RATE,
+        or return None if tracing is not configured.
+        """
+        path = os.environ.get("DECISION_TRACE_PATH")
+        if not path:
+            return None
+        return cls(path, float(os.environ.get("DECISION_TRACE_SAMPLE_RATE", "1.0")))
+
+    def start(self, client_file: str) -> Optional[DecisionTrace]:
+        """Begin a trace for a prediction, or return None if it is not sampled."""
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return None
+        return DecisionTrace(client_file)
+
+    def activate(self, trace: DecisionTrace) -> contextvars.Token:
+        """Route validation log records to the trace until the token is reset."""
+        return _current_trace.set(trace)
+
+    def finish(self, trace: DecisionTrace, token: contextvars.Token, decision: Optional[bool]):
+        """Deactivate the trace and hand it to the background writer."""
+        _current_trace.reset(token)
+        trace.decision = decision
+        self._logger.info(trace)
+
+    def close(self):
+        """Flush pending traces and stop the writer thread."""
+        if self._closed:
+            return
+        self._closed = True
+        atexit.unregister(self.close)
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.close()
+
+
+@functools.lru_cache(maxsize=None)
+def default_tracer() -> Optional[DecisionTracer]:
+    """Process-wide tracer configured from the environment, shared by all models."""
+    return DecisionTracer.from_env()
+
+
+class ValidationLogging:
+    """
+    Handle of the log output set up by configure_logging. stop() flushes the
+    queued messages and detaches the output from the validation logger, so
+    repeated runs in one process do not pile up handlers.
+    """
+
+    def __init__(self, listener: QueueListener, handler: logging.Handler, previous_level: int):
+        self.listener = listener
+        self._handler = handler
+        self._previous_level = previous_level
+        self._stopped = False
+
+    def stop(self):
+        """Detach from the validation logger, then flush and close the output."""
+        if self._stopped:
+            return
+        self._stopped = True
+        _disable_validation_logging(self._handler, self._previous_level)
+        self.listener.stop()
+        for handler in self.listener.handlers:
+            handler.close()
+
+
+def configure_logging(path: str = "validation_debug.log", console: bool = True) -> ValidationLogging:
+    """
+    Send validation log messages to a file (and optionally the console)
+    through a queue, so flags never block on I/O.
+
+    Returns:
+        Handle of the started output; call stop() on shutdown to flush and detach it
+    """
+    log_queue = queue.Queue(-1)
+    formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+    handlers = [logging.FileHandler(path)]
+    if console:
+        handlers.append(logging.StreamHandler())
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    listener = QueueListener(log_queue, *handlers)
+    listener.start()
+    queue_handler = _DeferredQueueHandler(log_queue)
+    previous_level = logging.getLogger("validation").level
+    _enable_validation_logging(queue_handler)
+    return ValidationLogging(listener, queue_handler, previous_level)
@@ -0,0 +1,129 @@
+"""Threshold-bounded edit distance used by the MRZ and name checks."""
+
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+# Substitution costs for character pairs that OCR commonly confuses.
+# Pairs are symmetric and apply to both upper and lower case.
+OCR_CONFUSION_COSTS: Dict[Tuple[str, str], float] = {
+    ("0", "O"): 0.5,
+    ("1", "I"): 0.5,
+    ("5", "S"): 0.5,
+    ("8", "B"): 0.5,
+}
+
+
+def _substitution_table(
+    costs: Optional[Mapping[Tuple[str, str], float]]
+) -> Dict[Tuple[str, str], float]:
+    """Expand a cost mapping into a symmetric, case-insensitive lookup table."""
+    table = {}
+    if not costs:
+        return table
+    for (a, b), cost in costs.items():
+        for x, y in ((a, b), (a.lower(), b.lower()), (a.upper(), b.upper())):
+            table[(x, y)] = cost
+            table[(y, x)] = cost
+    return table
+
+
+def _bounded_distance(
+    source: str, target: str, max_distance: float, table: Dict[Tuple[str, str], float]
+) -> float:
+    """Banded (Ukkonen) Levenshtein DP that stops once max_distance is exceeded."""
+    if source == target:
+        return 0
+
+    exceeded = max_distance + 1
+    n, m = len(source), len(target)
+    # Insertions and deletions cost 1, so any alignment straying more than
+    # max_distance cells from the diagonal is already over the bound.
+    band = int(max_distance)
+    if abs(n - m) > band:
+        return exceeded
+
+    inf = float("inf")
+    previous = [j if j <= band else inf for j in range(m + 1)]
+
+    for i in range(1, n + 1):
+        current = [inf] * (m + 1)
+        lo = max(1, i - band)
+        hi = min(m, i + band)
+        current[0] = i if i <= band else inf
+
+        row_min = current[0]
+        source_char = source[i - 1]
+        for j in range(lo, hi + 1):
+            target_char = target[j - 1]
+            if source_char == target_char:
+                substitution = previous[j - 1]
+            else:
+                substitution = previous[j - 1] + table.get((source_char, target_char), 1)
+            value = min(substitution, previous[j] + 1, current[j - 1] + 1)
+            current[j] = value
+            if value < row_min:
+                row_min = value
+
+        if row_min > max_distance:
+            return exceeded
+        previous = current
+
+    distance = previous[m]
+    return distance if distance <= max_distance else exceeded
+
+
+def bounded_levenshtein(
+    source: str,
+    target: str,
+    max_distance: float,
+    costs: Optional[Mapping[Tuple[str, str], float]] = None,
+) -> float:
+    """
+    Compute the edit distance between two strings, up to a threshold.
+
+    Only cells within max_distance of the diagonal are evaluated and the
+    computation returns as soon as every cell of a row exceeds the bound,
+    so checks such as "at most one typo" cost O(len * max_distance).
+
+    Args:
+        source: First string
+        target: Second string
+        max_distance: Largest distance of interest
+        costs: Optional substitution costs for character pairs, e.g.
+            OCR_CONFUSION_COSTS. Unlisted substitutions cost 1.
+
+    Returns:
+        The edit distance if it is at most max_distance, otherwise max_distance + 1
+    """
+    return _bounded_distance(source, target, max_distance, _substitution_table(costs))
+
+
+def within_distance(
+    source: str,
+    target: str,
+    max_distance: float,
+    costs: Optional[Mapping[Tuple[str, str], float]] = None,
+) -> bool:
+    """Return True if the edit distance between the strings is at most max_distance."""
+    return bounded_levenshtein(source, target, max_distance, costs) <= max_distance
+
+
+def bounded_levenshtein_many(
+    pairs: Iterable[Tuple[str, str]],
+    max_distance: float,
+    costs: Optional[Mapping[Tuple[str, str], float]] = None,
+) -> List[float]:
+    """
+    Compute bounded edit distances for many string pairs at once.
+
+    The cost table is prepared a single time for the whole batch.
+
+    Args:
+        pairs: Iterable of (source, target) string pairs
+        max_distance: Largest distance of interest
+        costs: Optional substitution costs for character pairs
+
+    Returns:
+        List of distances in the order of the input pairs, each capped at max_distance + 1
+    """
+    table = _substitution_table(costs)
+    return [_bounded_distance(a, b, max_distance, table) for a, b in pairs]
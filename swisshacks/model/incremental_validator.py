@@ -0,0 +1,126 @@
+from dataclasses import asdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from model.decision_trace import DecisionTrace, DecisionTracer
+from model.rule_based_model import SimpleModel, evaluate_rules
+from client_data.client_data import ClientData
+
+# Metadata that changes on every parse without changing the client
+IGNORED_FIELDS = {"parsed_date"}
+
+
+def changed_fields(old: Any, new: Any, prefix: str = "") -> Set[str]:
+    """
+    Compare two snapshots produced by dataclasses.asdict and return the dotted
+    paths of the leaves that differ, e.g. {"account_form.email"}.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        changes = set()
+        for key in old.keys() | new.keys():
+            if key in IGNORED_FIELDS:
+                continue
+            path = f"{prefix}.{key}" if prefix else str(key)
+            changes |= changed_fields(old.get(key), new.get(key), path)
+        return changes
+
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        changes = set()
+        for i, (old_item, new_item) in enumerate(zip(old, new)):
+            changes |= changed_fields(old_item, new_item, f"{prefix}.{i}")
+        return changes
+
+    return set() if old == new else {prefix}
+
+
+def _overlaps(field: str, read: str) -> bool:
+    """A change affects a read if either path is a prefix of the other."""
+    return (
+        field == read
+        or field.startswith(read + ".")
+        or read.startswith(field + ".")
+    )
+
+
+class IncrementalValidator(SimpleModel):
+    """
+    Rule-based validator that caches the verdict of every flag and, when the
+    client data changes, re-evaluates only the flags that read a changed field.
+
+    Flags declare their inputs with @reads in rule_based_model; flags without
+    a declaration are re-evaluated on every change. Decisions go through
+    SimpleModel.decide, with its order, short-circuit, logging, metrics and
+    decision traces, so a correction never triggers flags (such as the
+    LLM-backed description check) that an earlier rejection makes irrelevant.
+    """
+
+    def __init__(self, rules: Optional[list] = None, tracer: Optional[DecisionTracer] = None):
+        """
+        Args:
+            rules: (flag, message) pairs, defaults to the RULES of SimpleModel
+            tracer: Writes sampled decision traces; defaults to the tracer
+                configured through DECISION_TRACE_PATH, if any
+        """
+        super().__init__(tracer=tracer, rules=rules)
+        self.results: Dict[str, bool] = {}
+        self._snapshot: Optional[dict] = None
+
+    def affected_rules(self, fields: Iterable[str]) -> List[str]:
+        """Return the names of the flags that read any of the given fields."""
+        fields = list(fields)
+        if not fields:
+            # Nothing changed, not even for flags without a declaration
+            return []
+        affected = []
+        for flag, _ in self.rules:
+            flag_reads = getattr(flag, "reads", None)
+            if flag_reads is None or any(
+                _overlaps(field, read) for field in fields for read in flag_reads
+            ):
+                affected.append(flag.__name__)
+        return affected
+
+    def invalidate(self, fields: Iterable[str]) -> List[str]:
+        """Drop the cached verdicts of the flags that read any of the given fields."""
+        affected = self.affected_rules(fields)
+        for name in affected:
+            self.results.pop(name, None)
+        return affected
+
+    def validate(self, client: ClientData) -> bool:
+        """
+        Validate the client, reusing cached verdicts for every flag whose
+        fields did not change since the previous call.
+        """
+        # is_valid is derived from the other fields, refresh it after a correction
+        client.update_validity()
+        snapshot = asdict(client)
+        if self._snapshot is None:
+            self.results.clear()
+        else:
+            self.invalidate(changed_fields(self._snapshot, snapshot))
+        self._snapshot = snapshot
+        return self.decide(client)[0]
+
+    def revalidate(self, client: ClientData, fields: Iterable[str]) -> bool:
+        """
+        Validate the client after an explicit field-level diff, re-evaluating
+        only the flags that read one of the given fields.
+        """
+        fields = set(fields)
+        if client.is_valid != client.update_validity():
+            fields.add("is_valid")
+        self.invalidate(fields)
+        self._snapshot = asdict(client)
+        return self.decide(client)[0]
+
+    def predict(self, client: ClientData) -> bool:
+        return self.validate(client)
+
+    def _evaluate(
+        self, client: ClientData, trace: Optional[DecisionTrace], verdicts: Optional[Dict[str, bool]] = None
+    ) -> Tuple[bool, Optional[str]]:
+        # Decide from the cached verdicts, evaluating only the flags without one
+        decision = evaluate_rules(client, self.rules, trace, self.results)
+        if verdicts is not None:
+            verdicts.update(self.results)
+        return decision
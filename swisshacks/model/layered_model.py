@@ -13,6 +13,10 @@ class LayeredModel(BasePredictor):
         self.rule_based_model = SimpleModel()
         self.language_model = OpenAIPredictor(*args, **kwargs)
 
+    @property
+    def rulebook_version(self) -> str:
+        return f"{self.rule_based_model.rulebook_version}-{self.language_model.rulebook_version}"
+
     def predict(self, client: ClientData) -> bool:
         """
         Predict if the client is a money launderer or not.
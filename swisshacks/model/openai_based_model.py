@@ -1,12 +1,13 @@
-from openai import AzureOpenAI
 import json
 from pathlib import Path
 from typing import List, Dict, Any
 import base64
+import hashlib
 import os
 import re
 
 from model.base_predictor import BasePredictor
+from model.rule_based_model import flag_mrz_check_digits
 from client_data.client_data import ClientData
 
 DEFAULT_RULEBOOK_PATH = Path(__file__).parent / "validation_rules.txt"
@@ -18,8 +19,13 @@ class OpenAIPredictor(BasePredictor):
 
         with open(rulebook_path, "r") as f:
             self.rules = f.read()
+        self.rulebook_version = hashlib.md5(self.rules.encode("utf-8")).hexdigest()
 
     def predict(self,client_data: ClientData) -> bool:
+        # Reject on invalid MRZ check digits before spending an LLM call
+        if flag_mrz_check_digits(client_data):
+            return False
+
         passport = client_data.passport.to_json()
         account = client_data.account_form.to_json()
         profile = client_data.client_profile.to_json()
@@ -36,6 +42,8 @@ class OpenAIPredictor(BasePredictor):
 
             Here is the JSON data: passport {passport}, account {account}, profile {profile}, description {description}
         """
+        from openai import AzureOpenAI
+
         client_openai = AzureOpenAI(
             api_key=os.getenv("AZURE_OPENAI_API_KEY"),
             api_version="2025-01-01-preview",
@@ -149,6 +157,8 @@ def check_data_consistency(
     """
 
     # Create Azure OpenAI client for this specific check
+    from openai import AzureOpenAI
+
     consistency_client = AzureOpenAI(
         api_key=os.environ.get(
             "AZURE_OPENAI_API_KEY"
@@ -5,130 +5,283 @@ import os
 from enum import Enum
 import logging
 from datetime import datetime, date
-from typing import Tuple
-import unicodedata
-import textdistance
-import pycountry
-from openai import AzureOpenAI
+from typing import Dict, Optional, Tuple
+import inspect
+from types import CodeType, FunctionType
 import json
+import hashlib
+import time
 from model.base_predictor import BasePredictor
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[logging.FileHandler("validation_debug.log"), logging.StreamHandler()],
-)
+from model.edit_distance import bounded_levenshtein
+from data_parsing.mrz import decode_td3
+from instrumentation import REGISTRY, instrumented
+from model.decision_trace import DecisionTrace, DecisionTracer, default_tracer
+
+# INFO messages are dropped before a LogRecord is built unless a consumer is
+# enabled: a DecisionTracer, or decision_trace.configure_logging() to write
+# them out off the hot path.
 logger = logging.getLogger("validation")
 
 
 def remove_accents(input_str) -> str:
+    import unicodedata
+
     # Normalize to NFKD form and encode to ASCII bytes, ignoring non-ASCII chars
     normalized = unicodedata.normalize("NFKD", input_str)
     ascii_bytes = normalized.encode("ASCII", "ignore")
     return ascii_bytes.decode("ASCII")
 
 
-class SimpleModel(BasePredictor):
-    def predict(self, client: ClientData) -> bool:
+def reads(*fields: str):
+    """
+    Declare the ClientData fields a flag reads, as dotted paths such as
+    "account_form.email". Used to re-run only the affected flags when a
+    field is corrected.
+    """
+    def decorator(flag):
+        flag.reads = frozenset(fields)
+        return flag
+    return decorator
+
 
-        if flag_invalid_client_data(client):
-            print("Client data is invalid")
-            return False
+def _hash_constant(digest, value):
+    # Set order depends on string hashing, which differs between processes
+    if isinstance(value, (set, frozenset)):
+        value = sorted(repr(item) for item in value)
+    digest.update(repr(value).encode("utf-8"))
 
+
+def _hash_code(digest, code: CodeType, namespace: dict, seen: set):
+    """
+    Hash a code object, the code nested in it (inner functions, lambdas,
+    comprehensions) and the module-level names it uses: helper functions,
+    recursively, and constants such as prompt templates.
+    """
+    digest.update(code.co_code)
+    for constant in code.co_consts:
+        if isinstance(constant, CodeType):
+            _hash_code(digest, constant, namespace, seen)
+        else:
+            _hash_constant(digest, constant)
+    # co_names also holds attribute names; those that are not globals are skipped
+    for name in code.co_names:
+        if name not in namespace:
+            continue
+        value = inspect.unwrap(namespace[name]) if callable(namespace[name]) else namespace[name]
+        if isinstance(value, FunctionType):
+            if value in seen:
+                continue
+            seen.add(value)
+            digest.update(f"{value.__module__}.{value.__qualname__}".encode("utf-8"))
+            _hash_code(digest, value.__code__, value.__globals__, seen)
+        elif isinstance(value, (str, bytes, int, float, bool, tuple, list, dict, set, frozenset)):
+            digest.update(name.encode("utf-8"))
+            _hash_constant(digest, value)
+
+
+def _hash_flag(digest, flag):
+    flag = inspect.unwrap(flag)
+    digest.update(flag.__name__.encode("utf-8"))
+    _hash_code(digest, flag.__code__, flag.__globals__, {flag})
+
+
+def flag_version(flag) -> str:
+    """Hash of a single flag, its code and its helpers, like SimpleModel.rulebook_version for one rule."""
+    digest = hashlib.md5()
+    _hash_flag(digest, flag)
+    return digest.hexdigest()
+
+
+class SimpleModel(BasePredictor):
+    @property
+    def rulebook_version(self) -> str:
+        """Hash of the flags, their code and the helpers they call, so any rule edit changes the version."""
+        rulebook = hashlib.md5()
+        for flag, _ in self.rules:
+            _hash_flag(rulebook, flag)
+        return rulebook.hexdigest()
+
+    def __init__(self, tracer: Optional[DecisionTracer] = None, rules: Optional[list] = None):
+        """
+        Args:
+            tracer: Writes sampled decision traces; defaults to the tracer
+                configured through DECISION_TRACE_PATH, if any
+            rules: (flag, message) pairs in evaluation order, defaults to RULES
+        """
+        self.tracer = tracer if tracer is not None else default_tracer()
+        self.rules = RULES if rules is None else rules
+
+    def predict(self, client: ClientData) -> bool:
+        return self.decide(client)[0]
+
+    @instrumented("SimpleModel.predict", is_reject=lambda result: not result[0])
+    def decide(self, client: ClientData, verdicts: Optional[Dict[str, bool]] = None) -> Tuple[bool, Optional[str]]:
+        """
+        Validate a client and report which flag decided.
+
+        Args:
+            client: Client to validate
+            verdicts: Optional dict the verdict of every flag that ran is
+                stored in, by flag name, so callers can reuse them
+
+        Returns:
+            The decision, and the name of the flag that rejected the client or None if it passed
+        """
+        trace = self.tracer.start(client.client_file) if self.tracer else None
+        if trace is None:
+            return self._evaluate(client, None, verdicts)
+
+        token = self.tracer.activate(trace)
+        decision = None
+        try:
+            decision, rule = self._evaluate(client, trace, verdicts)
+            return decision, rule
+        finally:
+            self.tracer.finish(trace, token, decision)
+
+    def _evaluate(
+        self, client: ClientData, trace: Optional[DecisionTrace], verdicts: Optional[Dict[str, bool]] = None
+    ) -> Tuple[bool, Optional[str]]:
         # Missing value check is already done in the client_data class
-        if flag_verify_email(client):
-            print("Email mismatch")
-            return False
-        if flag_phone(client):
-            print("Phone number mismatch")
-            return False
-        if flag_country(client):
-            print("Country mismatch")
-            return False
-        if flag_inconsistent_name(client):
-            return False
-        if flag_passport(client):
-            print("Passport mismatch")
-            return False
-        if flag_address(client):
-            print("Address mismatch")
-            return False
-        if flag_birth_date(client):
-            print("Birth date mismatch")
-            return False
-        if flag_nationality(client):
-            print("Nationality mismatch")
-            return False
-        if flat_date_consistencies(client):
-            print("Date inconsistencies detected")
-            return False
-        if flag_wealth(client):
-            print("Wealth inconsistencies detected")
-            return False
-        if flag_gender(client):
-            print("Gender mismatch")
-            return False
-        if flag_description(client):
-            print("Description mismatch")
-            return False
-        if flag_passport_country_code(client):
-            print("Passport country code mismatch")
-            return False
-        # If all checks pass, return 1
-        return True
+        return evaluate_rules(client, self.rules, trace, verdicts)
 
 
+def evaluate_rules(
+    client: ClientData,
+    rules: list,
+    trace: Optional[DecisionTrace] = None,
+    verdicts: Optional[Dict[str, bool]] = None,
+) -> Tuple[bool, Optional[str]]:
+    """
+    Run the flags in order until one rejects the client, recording the
+    metrics of every flag that runs and adding its verdict to the trace.
+
+    Args:
+        client: Client to validate
+        rules: (flag, message) pairs in evaluation order
+        trace: Decision trace of this prediction, if sampled
+        verdicts: Cached verdict per flag name; flags with a cached verdict
+            are not run again, and the verdicts of the flags that run are
+            stored in it
+
+    Returns:
+        The decision, and the name of the flag that rejected the client or None if it passed
+    """
+    for flag, message in rules:
+        name = flag.__name__
+        if verdicts is not None and name in verdicts:
+            flagged, elapsed = verdicts[name], 0.0
+        else:
+            started = time.perf_counter()
+            try:
+                flagged = bool(flag(client))
+            except Exception:
+                REGISTRY.observe(name, time.perf_counter() - started, error=True)
+                raise
+            elapsed = time.perf_counter() - started
+            REGISTRY.observe(name, elapsed, rejected=flagged)
+            if verdicts is not None:
+                verdicts[name] = flagged
+        if flagged and message:
+            logger.info(message)
+        if trace is not None:
+            trace.add_rule(name, flagged, elapsed)
+        if flagged:
+            return False, name
+    # If all checks pass, return 1
+    return True, None
+
+
+@reads("is_valid", "account_form", "client_description", "client_profile", "passport")
 def flag_invalid_client_data(client: ClientData) -> bool:
     if not client.is_valid:
         return True
     return False
 
+@reads("passport.passport_mrz")
+def flag_mrz_check_digits(client: ClientData) -> bool:
+    """
+    Check the ICAO 9303 check digits of the passport MRZ.
+
+    Runs before any other passport logic, so a single mistyped digit rejects
+    the client without further work. MRZs that do not have the TD3 layout are
+    left to flag_passport.
+    """
+    if len(client.passport.passport_mrz) != 2:
+        return False
+    try:
+        mrz = decode_td3(*client.passport.passport_mrz)
+    except ValueError:
+        return False
+
+    failed_checks = mrz.failed_checks()
+    if failed_checks:
+        logger.info("MRZ check digits failed for: %s", failed_checks)
+        return True
+    return False
+
+
+@reads("client_profile.gender", "passport.sex")
 def flag_gender(client: ClientData) -> bool:
     if client.client_profile.gender.value != client.passport.sex.value:
-        print(f"Gender mismatch {client.client_profile.gender.value=} != {client.passport.sex.value=}")
+        logger.info(
+            "Gender mismatch client.client_profile.gender.value=%r != client.passport.sex.value=%r",
+            client.client_profile.gender.value,
+            client.passport.sex.value,
+        )
         return True
     return False
 
 
+@reads("passport.country_code", "passport.issuing_country")
 def flag_passport_country_code(client: ClientData) -> bool:
     passport_country_code = client.passport.country_code
     passport_country_name = client.passport.issuing_country
 
     if len(passport_country_code) != 3:
-        print("Passport country code is incorrect!")
+        logger.info("Passport country code is incorrect!")
         return True
 
+    import pycountry
+
     pycntry_country_code = pycountry.countries.get(alpha_3=passport_country_code)
     if not pycntry_country_code:
-        print(f"Country code {passport_country_code} is not valid.")
+        logger.info("Country code %s is not valid.", passport_country_code)
         return True
 
     pycountry_country_fz_name = pycountry.countries.search_fuzzy(passport_country_name)
 
     if pycountry_country_fz_name:
         if pycountry_country_fz_name[0] != pycntry_country_code:
-            print(
-                f"Country name {passport_country_name} does not match country code {passport_country_code}"
+            logger.info(
+                "Country name %s does not match country code %s",
+                passport_country_name,
+                passport_country_code,
             )
             return True
 
     return False
 
 
+@reads("account_form.email", "client_profile.contact_info.email")
 def flag_verify_email(client: ClientData) -> bool:
     email_pattern = r"^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$"
 
     # Check if the email in the account form matches the one in the client profile
     if client.account_form.email != client.client_profile.contact_info.email:
-        print(f"Client account email {client.account_form.email} does not match profile email {client.client_profile.contact_info.email}")
+        logger.info(
+            "Client account email %s does not match profile email %s",
+            client.account_form.email,
+            client.client_profile.contact_info.email,
+        )
         return True
     if not re.match(email_pattern, client.account_form.email):
-        print(f"Account email {client.account_form.email} is not valid")
+        logger.info("Account email %s is not valid", client.account_form.email)
         return True
     return False
 
 
+@reads("account_form.phone_number", "client_profile.contact_info.telephone")
 def flag_phone(client: ClientData) -> bool:
 
     def check_phone_number_formats(phone_number_string: str) -> bool:
@@ -145,45 +298,66 @@ def flag_phone(client: ClientData) -> bool:
     profile_phone_number = client.client_profile.contact_info.telephone.replace(" ", "")
 
     if check_phone_number_formats(account_phone_number):
-        print(f"Account phone number format is incorrect: {account_phone_number}")
+        logger.info("Account phone number format is incorrect: %s", account_phone_number)
         return True
     if check_phone_number_formats(profile_phone_number):
-        print(f"Client phone number format is incorrect: {profile_phone_number}")
+        logger.info("Client phone number format is incorrect: %s", profile_phone_number)
         return True
 
     if account_phone_number != profile_phone_number:
-        print(f"Client phone number mismatch: {account_phone_number=} != {profile_phone_number=}")
+        logger.info(
+            "Client phone number mismatch: account_phone_number=%r != profile_phone_number=%r",
+            account_phone_number,
+            profile_phone_number,
+        )
         return True
 
     return False
 
 
+@reads("account_form.country", "client_profile.country_of_domicile")
 def flag_country(client: ClientData) -> bool:
     if client.account_form.country != client.client_profile.country_of_domicile:
-        print(f"Client country mismatch: {client.account_form.country} != {client.client_profile.country_of_domicile}")
+        logger.info(
+            "Client country mismatch: %s != %s",
+            client.account_form.country,
+            client.client_profile.country_of_domicile,
+        )
         return True
     return False
 
 
+@reads("passport.citizenship", "client_profile.nationality")
 def flag_nationality(client: ClientData) -> bool:
     passport_nationality = client.passport.citizenship.lower()
     profile_nationality = client.client_profile.nationality.lower()
 
     if len(passport_nationality) == len(profile_nationality):
         if passport_nationality != profile_nationality:
-            print(
-                f"Client nationality mismatch: {client.passport.citizenship} != {client.client_profile.nationality}"
+            logger.info(
+                "Client nationality mismatch: %s != %s",
+                client.passport.citizenship,
+                client.client_profile.nationality,
             )
             return True
     else:
         if profile_nationality not in passport_nationality:
-            print(
-                f"Profile nationality {profile_nationality} does not match {passport_nationality}"
+            logger.info(
+                "Profile nationality %s does not match %s",
+                profile_nationality,
+                passport_nationality,
             )
             return True
     return False
 
 
+@reads(
+    "client_profile.address",
+    "account_form.street_name",
+    "account_form.building_number",
+    "account_form.postal_code",
+    "account_form.city",
+)
 def flag_address(client: ClientData) -> bool:
     address = client.client_profile.address  # i.e., "Place de la Concorde 17, 26627 Toulon"
     street, street_number, postal_code, city = "", "", "", ""
@@ -217,21 +391,47 @@ def flag_address(client: ClientData) -> bool:
                 postal_code = location_part
 
     if remove_accents(street) != remove_accents(client.account_form.street_name):
-        print(f"Street name mismatch: {street=} != {client.account_form.street_name=}")
+        logger.info(
+            "Street name mismatch: street=%r != client.account_form.street_name=%r",
+            street,
+            client.account_form.street_name,
+        )
         return True
     if street_number != client.account_form.building_number:
-        print(f"Street number mismatch: {street_number=} != {client.account_form.building_number=}")
+        logger.info(
+            "Street number mismatch: street_number=%r != client.account_form.building_number=%r",
+            street_number,
+            client.account_form.building_number,
+        )
         return True
     if postal_code != client.account_form.postal_code:
-        print(f"Postal code mismatch: {postal_code=} != {client.account_form.postal_code=}")
+        logger.info(
+            "Postal code mismatch: postal_code=%r != client.account_form.postal_code=%r",
+            postal_code,
+            client.account_form.postal_code,
+        )
         return True
     if remove_accents(city) != remove_accents(client.account_form.city):
-        print(f"City mismatch: {city=} != {client.account_form.city=}")
+        logger.info(
+            "City mismatch: city=%r != client.account_form.city=%r",
+            city,
+            client.account_form.city,
+        )
         return True
 
     return False
 
 
+@reads(
+    "client_profile.first_name",
+    "client_profile.last_name",
+    "account_form.account_name",
+    "account_form.account_holder_name",
+    "account_form.account_holder_surname",
+    "account_form.name",
+    "passport.given_name",
+    "passport.surname",
+)
 def flag_inconsistent_name(client: ClientData) -> bool:
     """
     Check if the name in the client profile and passport are inconsistent.
@@ -263,34 +463,57 @@ def flag_inconsistent_name(client: ClientData) -> bool:
 
     # account.json data consistency
     if account_account_name != account_name:
-        print(f"Account name mismatch: {account_account_name=} != {account_name=}")
+        logger.info(
+            "Account name mismatch: account_account_name=%r != account_name=%r",
+            account_account_name,
+            account_name,
+        )
         return True
 
     if (
         account_account_name
         != (account_holder_name + " " + account_holder_surname).strip()
     ):
-        print(
-            f"Account name mismatch: {account_account_name=} != {account_holder_name} {account_holder_surname}"
+        logger.info(
+            "Account name mismatch: account_account_name=%r != %s %s",
+            account_account_name,
+            account_holder_name,
+            account_holder_surname,
         )
         return True
 
     # cross value consistency
 
     if profile_last_name != passport_last_name:
-        print(f"Last name mismatch: {profile_last_name=} != {passport_last_name=}")
+        logger.info(
+            "Last name mismatch: profile_last_name=%r != passport_last_name=%r",
+            profile_last_name,
+            passport_last_name,
+        )
         return True
 
     if profile_full_name != account_name:
-        print(f"Full name mismatch: {profile_full_name=} != {account_name=}")
+        logger.info(
+            "Full name mismatch: profile_full_name=%r != account_name=%r",
+            profile_full_name,
+            account_name,
+        )
         return True
 
     if passport_given_name != account_holder_name:
-        print(f"Given name mismatch: {passport_given_name=} != {account_holder_name=}")
+        logger.info(
+            "Given name mismatch: passport_given_name=%r != account_holder_name=%r",
+            passport_given_name,
+            account_holder_name,
+        )
         return True
 
     if passport_last_name != profile_last_name:
-        print(f"Full name mismatch: {passport_last_name=} != {profile_last_name=}")
+        logger.info(
+            "Full name mismatch: passport_last_name=%r != profile_last_name=%r",
+            passport_last_name,
+            profile_last_name,
+        )
         return True
 
     return False
@@ -322,19 +545,32 @@ def simple_mrz(passport_data: ClientPassport) -> Tuple[str, str]:
     return [remove_accents(l1.upper()) for l1 in line1], line2.upper()
 
 
+@reads(
+    "client_profile.passport_id",
+    "account_form.passport_number",
+    "passport.number",
+    "passport.passport_mrz",
+    "passport.given_name",
+    "passport.surname",
+    "passport.country_code",
+    "passport.birth_date",
+)
 def flag_passport(client: ClientData):
     if not (
         client.client_profile.passport_id
         == client.account_form.passport_number
         == client.passport.number
     ):
-        print(
-            f"Passport numbers are not matching: {client.client_profile.passport_id} != {client.account_form.passport_number} != {client.passport.number}"
+        logger.info(
+            "Passport numbers are not matching: %s != %s != %s",
+            client.client_profile.passport_id,
+            client.account_form.passport_number,
+            client.passport.number,
         )
         return True
 
     if len(client.passport.passport_mrz) != 2:
-        print("MRZ not in prescribed format")
+        logger.info("MRZ not in prescribed format")
         return True
 
     mrz_line1, mrz_line2 = simple_mrz(client.passport)
@@ -343,11 +579,11 @@ def flag_passport(client: ClientData):
     passport_line1 = [remove_accents(s.upper()) for s in passport_line1.split("<") if s]
 
     if (
-        textdistance.levenshtein(" ".join(mrz_line1), " ".join(passport_line1)) > 1
-        or textdistance.levenshtein(mrz_line2[:18], passport_line2[:18]) > 2
+        bounded_levenshtein(" ".join(mrz_line1), " ".join(passport_line1), 1) > 1
+        or bounded_levenshtein(mrz_line2[:18], passport_line2[:18], 2) > 2
     ):
-        print(mrz_line1, passport_line1)
-        print(mrz_line2[:18], passport_line2[:18])
+        logger.debug("%s %s", mrz_line1, passport_line1)
+        logger.debug("%s %s", mrz_line2[:18], passport_line2[:18])
         return True
 
     if not re.match("\w\w\d{7}", client.passport.number):
@@ -355,11 +591,22 @@ def flag_passport(client: ClientData):
 
     return False
 
+@reads(
+    "client_profile.birth_date",
+    "client_profile.id_type",
+    "client_profile.id_issue_date",
+    "client_profile.id_expiry_date",
+    "passport.birth_date",
+    "passport.issue_date",
+    "passport.expiry_date",
+)
 def flag_birth_date(client: ClientData):
     # Check if birth dates match between client profile and passport
     if client.client_profile.birth_date != client.passport.birth_date:
-        print(
-            f"Birth date mismatch: {client.client_profile.birth_date} != {client.passport.birth_date}"
+        logger.info(
+            "Birth date mismatch: %s != %s",
+            client.client_profile.birth_date,
+            client.passport.birth_date,
         )
         return True
 
@@ -368,14 +615,18 @@ def flag_birth_date(client: ClientData):
 
     if client.client_profile.id_type == "passport":
         if passport_issue_date != client.client_profile.id_issue_date:
-            print(
-                f"Passport issue date mismatch: {passport_issue_date} != {client.client_profile.id_issue_date}"
+            logger.info(
+                "Passport issue date mismatch: %s != %s",
+                passport_issue_date,
+                client.client_profile.id_issue_date,
             )
             return True
 
         if passport_expiry_date != client.client_profile.id_expiry_date:
-            print(
-                f"Passport expiry date mismatch: {passport_expiry_date} != {client.client_profile.id_expiry_date}"
+            logger.info(
+                "Passport expiry date mismatch: %s != %s",
+                passport_expiry_date,
+                client.client_profile.id_expiry_date,
             )
             return True
 
@@ -385,31 +636,37 @@ def flag_birth_date(client: ClientData):
         datetime.strptime(passport_issue_date, "%Y-%m-%d").date()
         > datetime.strptime(passport_expiry_date, "%Y-%m-%d").date()
     ):
-        print(
-            f"Passport issue date {passport_issue_date} is after expiry date {passport_expiry_date}"
+        logger.info(
+            "Passport issue date %s is after expiry date %s",
+            passport_issue_date,
+            passport_expiry_date,
         )
         return True
     if (
         datetime.strptime(passport_issue_date, "%Y-%m-%d").date()
         < datetime.strptime(client.client_profile.birth_date, "%Y-%m-%d").date()
     ):
-        print(
-            f"Passport issue date {passport_issue_date} is before birth date {client.client_profile.birth_date}"
+        logger.info(
+            "Passport issue date %s is before birth date %s",
+            passport_issue_date,
+            client.client_profile.birth_date,
         )
         return True
     if (
         datetime.strptime(passport_expiry_date, "%Y-%m-%d").date()
         < datetime.strptime(client.client_profile.birth_date, "%Y-%m-%d").date()
     ):
-        print(
-            f"Passport expiry date {passport_expiry_date} is before birth date {client.client_profile.birth_date}"
+        logger.info(
+            "Passport expiry date %s is before birth date %s",
+            passport_expiry_date,
+            client.client_profile.birth_date,
         )
         return True
     if datetime.strptime(passport_issue_date, "%Y-%m-%d").date() > today:
-        print(f"Passport issue date {passport_issue_date} is in the future")
+        logger.info("Passport issue date %s is in the future", passport_issue_date)
         return True
     if datetime.strptime(passport_expiry_date, "%Y-%m-%d").date() < today:
-        print(f"Passport expiry date {passport_expiry_date} is in the past")
+        logger.info("Passport expiry date %s is in the past", passport_expiry_date)
         return True
 
     try:
@@ -429,20 +686,33 @@ def flag_birth_date(client: ClientData):
 
         # Check if age is reasonable (typically 18-120 years for banking clients)
         if age < 18:
-            logger.info(f"Client is too young: {age} years old")
+            logger.info("Client is too young: %s years old", age)
             return True
         if age > 120:
-            logger.info(f"Client age is unrealistic: {age} years old")
+            logger.info("Client age is unrealistic: %s years old", age)
             return True
     except ValueError:
         # If there's an issue parsing the date
         logger.error(
-            f"Invalid birth date format: {client.client_profile.birth_date}"
+            "Invalid birth date format: %s", client.client_profile.birth_date
         )
         return True
 
     return False
 
+@reads(
+    "client_profile.birth_date",
+    "client_profile.id_issue_date",
+    "client_profile.id_expiry_date",
+    "client_profile.passport_id",
+    "client_profile.employment",
+    "client_profile.personal_info.highest_education",
+    "client_profile.personal_info.education_history",
+    "passport.birth_date",
+    "passport.issue_date",
+    "passport.expiry_date",
+    "passport.number",
+)
 def flat_date_consistencies(client: ClientData) -> bool:
 
     MINIMM_WORKING_AGE = 15
@@ -474,62 +744,98 @@ def flat_date_consistencies(client: ClientData) -> bool:
     for employment in client.client_profile.employment:
         if employment.current_status.since not in ["", None]:
             # Check if the date is in the past
-            print("Employment start date:", employment.current_status.since)
+            logger.debug("Employment start date: %s", employment.current_status.since)
             if int(employment.current_status.since) > int(today.year)+1:
-                print(f"Employment start date is in the future: {employment.current_status.since}")
+                logger.info(
+                    "Employment start date is in the future: %s",
+                    employment.current_status.since,
+                )
                 return True
             # Check the date is after the person's birth date
             if int(employment.current_status.since) < int(birth_date.year):
-                print(f"Employment start date is before birth date: {employment.current_status.since} < {birth_date.year}")
+                logger.info(
+                    "Employment start date is before birth date: %s < %s",
+                    employment.current_status.since,
+                    birth_date.year,
+                )
                 return True
             # Check that the person was at least 15 years old when they started working
             if int(employment.current_status.since) < int(birth_date.year) + MINIMM_WORKING_AGE:
-                print(f"Employment start date is too early: {employment.current_status.since} < {birth_date.year + MINIMM_WORKING_AGE}")
+                logger.info(
+                    "Employment start date is too early: %s < %s",
+                    employment.current_status.since,
+                    birth_date.year + MINIMM_WORKING_AGE,
+                )
                 return True
             
     if client.client_profile.personal_info.highest_education is not None:
         # The date is in the string in (YYYY) format
-        print("Highest education:", client.client_profile.personal_info.education_history)
+        logger.debug("Highest education: %s", client.client_profile.personal_info.education_history)
         graduation_year = re.search(r"\d{4}", client.client_profile.personal_info.education_history)
 
         if graduation_year is not None:
             graduation_year = graduation_year.group()
-            print("Graduation year:", graduation_year)
+            logger.debug("Graduation year: %s", graduation_year)
             graduation_year = int(graduation_year)
             if graduation_year > today.year + 1:
-                print(f"Graduation year is in the future: {graduation_year}")
+                logger.info("Graduation year is in the future: %s", graduation_year)
                 return True
             if graduation_year < birth_date.year:
-                print(f"Graduation year is before birth date: {graduation_year} < {birth_date.year}")
+                logger.info(
+                    "Graduation year is before birth date: %s < %s",
+                    graduation_year,
+                    birth_date.year,
+                )
                 return True
             if graduation_year < birth_date.year + MINIMUM_GRADUATION_AGE:
-                print(f"Graduation year is too early: {graduation_year} < {birth_date.year + MINIMUM_GRADUATION_AGE}")
+                logger.info(
+                    "Graduation year is too early: %s < %s",
+                    graduation_year,
+                    birth_date.year + MINIMUM_GRADUATION_AGE,
+                )
                 return True
 
 
     if not birth_date < issue_date < today:
-        print(f"Passport issue date {issue_date} is not valid: bd-{birth_date} < issue-{issue_date} < now-{today}")
+        logger.info(
+            "Passport issue date %s is not valid: bd-%s < issue-%s < now-%s",
+            issue_date,
+            birth_date,
+            issue_date,
+            today,
+        )
         return True
     if not issue_date < expiry_date:
-        print(f"Passport expiry date {expiry_date} is not valid: issue-{issue_date} < expiry-{expiry_date}")
+        logger.info(
+            "Passport expiry date %s is not valid: issue-%s < expiry-%s",
+            expiry_date,
+            issue_date,
+            expiry_date,
+        )
         return True
     if not MINIMUM_APPLICANT_AGE <= today.year - birth_date.year < MAXIMUM_APPLICANT_AGE:
-        print(f"Client age is not valid: {today.year - birth_date.year} years old")
+        logger.info("Client age is not valid: %s years old", today.year - birth_date.year)
         return True
     return False
 
 # TODO: Check passport dates are reasonable; (not too far in the past, not too far in the future)
 
 
+@reads(
+    "client_profile.account_details.total_assets",
+    "client_profile.account_details.transfer_assets",
+    "client_profile.wealth_info.assets",
+    "client_profile.wealth_info.total_wealth_range",
+)
 def flag_wealth(client: ClientData) -> bool:
     total_assets = client.client_profile.account_details.total_assets
     transfer_assets = client.client_profile.account_details.transfer_assets
 
     if total_assets < 0 or transfer_assets < 0:
-        print("Negative assets detected")
+        logger.info("Negative assets detected")
         return True
     if transfer_assets > total_assets:
-        print("Transfer assets exceed total assets")
+        logger.info("Transfer assets exceed total assets")
         return True
 
     combined_assets = 0
@@ -540,9 +846,7 @@ def flag_wealth(client: ClientData) -> bool:
         combined_assets += value
 
     if combined_assets > total_assets:
-        print(
-            f"Combined assets exceed total assets: {combined_assets} > {total_assets}"
-        )
+        logger.info("Combined assets exceed total assets: %s > %s", combined_assets, total_assets)
         return True
 
     total_wealth_range = client.client_profile.wealth_info.total_wealth_range
@@ -637,7 +941,17 @@ def simple_compare(gpt_value, client_value: Enum):
     return gpt_value != client_value
 
 
+@reads(
+    "client_description",
+    "client_profile.birth_date",
+    "client_profile.personal_info",
+    "client_profile.employment",
+    "client_profile.wealth_info.wealth_sources",
+    "client_profile.wealth_info.source_info",
+)
 def flag_description(client: ClientData):
+    from openai import AzureOpenAI
+
     openai_client = AzureOpenAI(
         api_key=os.environ.get("AZURE_OPENAI_API_KEY"),
         api_version="2025-03-01-preview",
@@ -660,12 +974,13 @@ def flag_description(client: ClientData):
     except json.decoder.JSONDecodeError:
         return False
 
-    print("Parsed description:")
-    print(response_data)
+    logger.debug("Parsed description: %s", response_data)
 
     if flag_compare_age(response_data.get("age"), client):
-        print(
-            f"age mismatch: {response_data.get('age')} != {client.client_profile.birth_date}"
+        logger.info(
+            "age mismatch: %s != %s",
+            response_data.get('age'),
+            client.client_profile.birth_date,
         )
         return True
 
@@ -673,16 +988,20 @@ def flag_description(client: ClientData):
         response_data.get("marital_status"),
         client.client_profile.personal_info.marital_status,
     ):
-        print(
-            f"marital status mismatch: {response_data.get('marital_status')} != {client.client_profile.personal_info.marital_status}"
+        logger.info(
+            "marital status mismatch: %s != %s",
+            response_data.get('marital_status'),
+            client.client_profile.personal_info.marital_status,
         )
         return True
 
     if simple_compare(
         response_data.get("company"), client.client_profile.employment[0].employer
     ):
-        print(
-            f"company mismatch: {response_data.get('company')} != {client.client_profile.employment[0].employer}"
+        logger.info(
+            "company mismatch: %s != %s",
+            response_data.get('company'),
+            client.client_profile.employment[0].employer,
         )
         return True
 
@@ -690,8 +1009,10 @@ def flag_description(client: ClientData):
         response_data.get("position"),
         client.client_profile.employment[0].position,
     ):
-        print(
-            f"position mismatch: {response_data.get('position')} != {client.client_profile.employment[0].position}"
+        logger.info(
+            "position mismatch: %s != %s",
+            response_data.get('position'),
+            client.client_profile.employment[0].position,
         )
         return True
 
@@ -702,7 +1023,7 @@ def flag_description(client: ClientData):
     wealth_sources = client.client_profile.wealth_info.wealth_sources
     inherit_profile = "Inheritance" in wealth_sources
     if inheritance != inherit_profile and response_data.get("inherited_from"):
-        print(f"inheritance mismatch: {inheritance} != {inherit_profile}")
+        logger.info("inheritance mismatch: %s != %s", inheritance, inherit_profile)
         return True
 
     # Inheritance source
@@ -713,13 +1034,13 @@ def flag_description(client: ClientData):
 
         inh_info = client.client_profile.wealth_info.source_info
         if inh_from and inh_from not in inh_info[0]:
-            print(f"inheritance source mismatch: {inh_from} != {inh_info}")
+            logger.info("inheritance source mismatch: %s != %s", inh_from, inh_info)
             return True
         if inh_year and str(inh_year) not in inh_info[0]:
-            print(f"inheritance year mismatch: {inh_year} != {inh_info}")
+            logger.info("inheritance year mismatch: %s != %s", inh_year, inh_info)
             return True
         if inh_pos and inh_pos not in inh_info[0]:
-            print(f"inheritance position mismatch: {inh_pos} != {inh_info}")
+            logger.info("inheritance position mismatch: %s != %s", inh_pos, inh_info)
             return True
 
     # Education university and secondary
@@ -731,12 +1052,12 @@ def flag_description(client: ClientData):
         edu_prof = client.client_profile.personal_info.education_history
   
         if university_education.get('university') not in edu_prof:
-            print(f"University name mismatch: {university_education} not in {edu_prof}")
+            logger.info("University name mismatch: %s not in %s", university_education, edu_prof)
             return True
         # Check that graduation year is in the education history
         graduation_year = university_education.get('graduation_year')
         if graduation_year and str(graduation_year) not in edu_prof:
-            print(f"Graduation year mismatch: {graduation_year} not in {edu_prof}")
+            logger.info("Graduation year mismatch: %s not in %s", graduation_year, edu_prof)
             return True
         # Check that graduation year is reasonable: clients should be at least 18 years old when graduating from university
         graduation_year = int(graduation_year)
@@ -744,11 +1065,17 @@ def flag_description(client: ClientData):
         birth_date = datetime.strptime(client.client_profile.birth_date, "%Y-%m-%d").date()
         age_at_graduation = graduation_year - birth_date.year
         if age_at_graduation > today.year - birth_date.year:
-            print(f"Client claims to be {age_at_graduation} years old at university graduation")
+            logger.info(
+                "Client claims to be %s years old at university graduation",
+                age_at_graduation,
+            )
             return True
         # Check that highest education level is "Tertiary"
         if client.client_profile.personal_info.highest_education != "Tertiary":
-            print(f"Highest education level mismatch: {client.client_profile.personal_info.highest_education} != Tertiary")
+            logger.info(
+                "Highest education level mismatch: %s != Tertiary",
+                client.client_profile.personal_info.highest_education,
+            )
             return True
 
     if secondary_education.get('school') != "":
@@ -758,15 +1085,26 @@ def flag_description(client: ClientData):
             if university_education.get('graduation_year') != "":
                 university_year = university_education.get('graduation_year')
                 if secondary_year and university_year and int(secondary_year) >= int(university_year):
-                    print(f"Secondary education year {secondary_year} is not before university year {university_year}")
+                    logger.info(
+                        "Secondary education year %s is not before university year %s",
+                        secondary_year,
+                        university_year,
+                    )
                     return True
             else:
                 # If no university is porvided, check that profile indicates correct secondary education
                 if client.client_profile.personal_info.highest_education != "Secondary":
-                    print(f"Highest education level mismatch: {client.client_profile.personal_info.highest_education} != Secondary")
+                    logger.info(
+                        "Highest education level mismatch: %s != Secondary",
+                        client.client_profile.personal_info.highest_education,
+                    )
                     return True
                 if secondary_education.get('school') not in client.client_profile.personal_info.education_history:
-                    print(f"Secondary school name mismatch: {secondary_education.get('school')} not in {client.client_profile.personal_info.education_history}")
+                    logger.info(
+                        "Secondary school name mismatch: %s not in %s",
+                        secondary_education.get('school'),
+                        client.client_profile.personal_info.education_history,
+                    )
                     return True
             # Check that secondary education graduation year is reasonable: clients should be at least 15 years old when graduating from secondary school
             graduation_year = int(secondary_year)
@@ -774,10 +1112,37 @@ def flag_description(client: ClientData):
             birth_date = datetime.strptime(client.client_profile.birth_date, "%Y-%m-%d").date()
             age_at_graduation = graduation_year - birth_date.year
             if graduation_year > today.year:
-                print(f"Secondary education graduation year {graduation_year} is in the future")
+                logger.info(
+                    "Secondary education graduation year %s is in the future",
+                    graduation_year,
+                )
                 return True
             if age_at_graduation < 15:
-                print(f"Secondary education graduation year {graduation_year} indicates client is too young: {age_at_graduation} years old")
+                logger.info(
+                    "Secondary education graduation year %s indicates client is too young: %s years old",
+                    graduation_year,
+                    age_at_graduation,
+                )
                 return True
 
     return False
+
+
+# Flags evaluated by SimpleModel, in order, with the message printed on reject.
+RULES = [
+    (flag_invalid_client_data, "Client data is invalid"),
+    (flag_mrz_check_digits, "MRZ check digit mismatch"),
+    (flag_verify_email, "Email mismatch"),
+    (flag_phone, "Phone number mismatch"),
+    (flag_country, "Country mismatch"),
+    (flag_inconsistent_name, None),
+    (flag_passport, "Passport mismatch"),
+    (flag_address, "Address mismatch"),
+    (flag_birth_date, "Birth date mismatch"),
+    (flag_nationality, "Nationality mismatch"),
+    (flat_date_consistencies, "Date inconsistencies detected"),
+    (flag_wealth, "Wealth inconsistencies detected"),
+    (flag_gender, "Gender mismatch"),
+    (flag_description, "Description mismatch"),
+    (flag_passport_country_code, "Passport country code mismatch"),
+]
@@ -0,0 +1,173 @@
+"""
+Compression codecs for stored payloads.
+
+The codec of an object is recorded as its Content-Encoding where the backend
+supports metadata, and otherwise detected from the magic bytes of the
+payload, so objects written with any codec can always be read back.
+
+Configuration:
+    STORAGE_CODEC      Codec used for new objects: gzip (default), zstd or identity
+    STORAGE_ZSTD_LEVEL Compression level of zstd (default 3)
+    STORAGE_ZSTD_DICT  Path of a trained zstd dictionary, see train_zstd_dictionary
+"""
+
+import functools
+import gzip
+import io
+import os
+from abc import ABC, abstractmethod
+from typing import BinaryIO, List, Optional
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstandard package is required for zstd. Install it with: pip install zstandard")
+    return zstandard
+
+
+class Codec(ABC):
+    # Value of the Content-Encoding header of objects written with this codec
+    content_encoding: str
+
+    @abstractmethod
+    def compress(self, data: bytes) -> bytes:
+        pass
+
+    @abstractmethod
+    def decompress(self, data: bytes) -> bytes:
+        pass
+
+    @abstractmethod
+    def reader(self, stream: BinaryIO) -> BinaryIO:
+        """Wrap a stream of compressed data in a stream of decompressed data."""
+
+
+class RawCodec(Codec):
+    content_encoding = "identity"
+
+    def compress(self, data: bytes) -> bytes:
+        return data
+
+    def decompress(self, data: bytes) -> bytes:
+        return data
+
+    def reader(self, stream: BinaryIO) -> BinaryIO:
+        return stream
+
+
+class GzipCodec(Codec):
+    content_encoding = "gzip"
+
+    def __init__(self, level: int = 9):
+        # Level 9 is what gzip.compress uses, and what store_dict always used
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return gzip.compress(data, compresslevel=self.level)
+
+    def decompress(self, data: bytes) -> bytes:
+        return gzip.decompress(data)
+
+    def reader(self, stream: BinaryIO) -> BinaryIO:
+        return gzip.GzipFile(fileobj=stream, mode="rb")
+
+
+class ZstdCodec(Codec):
+    """
+    Zstandard, optionally with a dictionary trained on typical payloads.
+    Game payloads are very similar to each other, so a dictionary helps
+    most on the small objects.
+    """
+
+    content_encoding = "zstd"
+
+    def __init__(self, level: int = 3, dictionary: Optional[bytes] = None):
+        zstandard = _zstandard()
+        self.level = level
+        self.dictionary = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        self._compressor = zstandard.ZstdCompressor(level=level, dict_data=self.dictionary)
+        self._decompressor = zstandard.ZstdDecompressor(dict_data=self.dictionary)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        dict_id = _zstandard().get_frame_parameters(data).dict_id
+        if dict_id and (self.dictionary is None or self.dictionary.dict_id() != dict_id):
+            raise ValueError(f"Payload needs zstd dictionary {dict_id}, set STORAGE_ZSTD_DICT to it")
+        # Frames written by streaming compressors do not record their size
+        return self._decompressor.decompressobj().decompress(data)
+
+    def reader(self, stream: BinaryIO) -> BinaryIO:
+        return io.BufferedReader(self._decompressor.stream_reader(stream, read_across_frames=True))
+
+
+@functools.lru_cache(maxsize=None)
+def _zstd_codec() -> ZstdCodec:
+    dictionary = None
+    dictionary_path = os.environ.get("STORAGE_ZSTD_DICT")
+    if dictionary_path:
+        with open(dictionary_path, "rb") as f:
+            dictionary = f.read()
+    return ZstdCodec(int(os.environ.get("STORAGE_ZSTD_LEVEL", "3")), dictionary)
+
+
+def get_codec(name: Optional[str] = None) -> Codec:
+    """Return the codec with the given name, or the one configured by STORAGE_CODEC."""
+    name = (name or os.environ.get("STORAGE_CODEC") or "gzip").lower()
+    if name == "gzip":
+        return GzipCodec()
+    elif name == "zstd":
+        return _zstd_codec()
+    elif name in ("identity", "raw"):
+        return RawCodec()
+    else:
+        raise ValueError(f"Unsupported codec: {name}")
+
+
+def sniff_encoding(data: bytes) -> str:
+    """Detect the codec of a payload from its magic bytes."""
+    if data[:2] == GZIP_MAGIC:
+        return "gzip"
+    if data[:4] == ZSTD_MAGIC:
+        return "zstd"
+    return "identity"
+
+
+def decode_payload(data: bytes, content_encoding: Optional[str] = None) -> bytes:
+    """
+    Decompress a stored payload.
+
+    Args:
+        data: Stored bytes
+        content_encoding: Recorded Content-Encoding, detected from the data if missing
+    """
+    return get_codec(content_encoding or sniff_encoding(data)).decompress(data)
+
+
+def decode_stream(stream: BinaryIO, content_encoding: Optional[str] = None) -> BinaryIO:
+    """
+    Decompress a stored payload while it is read.
+
+    Args:
+        stream: Stream of the stored bytes; it needs peek() if content_encoding is missing
+        content_encoding: Recorded Content-Encoding, detected from the first bytes if missing
+    """
+    if not content_encoding:
+        content_encoding = sniff_encoding(stream.peek(4)[:4])
+    return get_codec(content_encoding).reader(stream)
+
+
+def train_zstd_dictionary(samples: List[bytes], dict_size: int = 112640) -> bytes:
+    """
+    Train a zstd dictionary on sample payloads.
+
+    Returns:
+        Dictionary bytes, to be saved and referenced by STORAGE_ZSTD_DICT
+    """
+    return _zstandard().train_dictionary(dict_size, samples).as_bytes()
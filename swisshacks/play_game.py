@@ -1,35 +1,35 @@
 import requests
 import json
 import time
-from dotenv import load_dotenv
 import hashlib
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import os
 
 # Use absolute imports with the package structure
-from swisshacks.decode_game_files import process_json_file
+from swisshacks.decode_game_files import decode_client_files, save_client_files
 from swisshacks.data_parsing.client_profile_parser import ClientProfileParser
 from swisshacks.data_parsing.client_account_parser import ClientAccountParser
 from swisshacks.data_parsing.client_description_parser import ClientDescriptionParser
-from swisshacks.data_parsing.parse_passport_openai import parse_png_to_json
+from swisshacks.data_parsing.client_passport_parser import ClientPassportParser, PassportBackendType
+from swisshacks.data_parsing.client_data_loader import ClientDataLoader
 from swisshacks.model.rule_based_model import SimpleModel
-from swisshacks.client_data.client_data import ClientData
+from swisshacks.model.cached_predictor import CachedPredictor
 from swisshacks.storage import store_dict
 from swisshacks import trainset
+from swisshacks.env import PROJECT_ROOT, load_env
+from swisshacks.game_client import GameClient
+from swisshacks.uploader import BackgroundUploader
 
-# Get the project root directory (assuming scripts is directly under project root)
-PROJECT_ROOT = Path(__file__).parent.parent.absolute()
 
-# Load .env file from project root
-print(f"Env path: {os.path.join(PROJECT_ROOT, '.env')}")
-load_dotenv(os.path.join(PROJECT_ROOT, ".env"))
+data_dir = PROJECT_ROOT / "data"
 
 
-data_dir = PROJECT_ROOT / "data"
-# API configuration
-BASE_URL = "https://hackathon-api.mlo.sehlat.io"
-API_KEY = os.getenv("JULIUS_BAER_API_KEY")
-HEADERS = {"x-api-key": API_KEY}
+@functools.lru_cache(maxsize=None)
+def get_game_client() -> GameClient:
+    """Shared API client, loading .env on first use so the API key is available"""
+    load_env()
+    return GameClient()
 
 
 def save_to_json(data, output_path):
@@ -38,16 +38,13 @@ def save_to_json(data, output_path):
         json_file.write(data.to_json(indent=2, ensure_ascii=False))
 
 
-def start_game():
+def start_game(client: GameClient = None):
     """Start a new game session and return session details"""
 
-    url = f"{BASE_URL}/game/start"
-    payload = {"player_name": "3plus1"}
+    client = client or get_game_client()
 
     try:
-        response = requests.post(url, headers=HEADERS, json=payload)
-        response.raise_for_status()
-        response_data = response.json()
+        response_data = client.start_game()
 
         print("Game started successfully!")
         print(f"Session ID: {response_data['session_id']}")
@@ -60,26 +57,13 @@ def start_game():
         return None
 
 
-def send_decision(session_id, client_id, decision):
+def send_decision(session_id, client_id, decision, client: GameClient = None):
     """Send the decision (Accept or Reject) to the API and return the response"""
 
-    url = f"{BASE_URL}/game/decision"
-
-    picked_decision = "Accept" if decision == 1 else "Reject"
-
-    payload = {
-        "decision": picked_decision,
-        "client_id": client_id,
-        "session_id": session_id,
-    }
+    client = client or get_game_client()
 
-    # Return also the decision (1 for Accept, 0 for Reject)
     try:
-        response = requests.post(url, headers=HEADERS, json=payload)
-        response.raise_for_status()
-        response_data = response.json()  # Converts the response to a dict object
-
-        return response_data
+        return client.send_decision(session_id, client_id, decision)
 
     except requests.exceptions.RequestException as e:
         print(f"Error making decision: {e}")
@@ -94,22 +78,46 @@ def toMd5(client_data: dict):
     return md5_hash
 
 
-def save_result(client_data, score, status, answer):
-    """Save the result"""
+def save_result(client_data, score, status, answer, uploader: BackgroundUploader = None):
+    """Save the result, in the background if an uploader is given"""
 
     result = "1" if status else "0"
 
     # Format the score as a two-digit string
     formatted_score = str(score).zfill(2)
 
-    print(f"test/{result}/{formatted_score}/{toMd5(client_data)}")
-    store_dict(client_data, f"test/{result}/{formatted_score}/{toMd5(client_data)}")
+    object_name = f"test/{result}/{formatted_score}/{toMd5(client_data)}"
+    print(object_name)
+    if uploader is not None:
+        uploader.submit_dict(client_data, object_name)
+    else:
+        store_dict(client_data, object_name)
     # print(f"\nlevel_{formatted_score}-answer_{answer}_result_{result}.json")
 
 
-def run_game():
-    """Main script"""
-    game_data = start_game()
+def persist_level(output_dir, files, client_file):
+    """Write the decoded documents of a level and their parsed JSON to disk"""
+    save_client_files(files, output_dir)
+    save_to_json(client_file.passport, output_dir / "passport.json")
+    save_to_json(client_file.account_form, output_dir / "account.json")
+    save_to_json(client_file.client_profile, output_dir / "profile.json")
+    save_to_json(client_file.client_description, output_dir / "description.json")
+
+
+def run_game(persist_documents=False, client: GameClient = None):
+    """
+    Main script
+
+    Args:
+        persist_documents: Also write every level's documents and parsed JSON
+            under data/, in a background thread off the game loop
+        client: Game API client, defaults to the shared client whose rate
+            limiter paces every request
+    """
+    # The parsers and flags read their API settings from the environment
+    load_env()
+    client = client or get_game_client()
+    game_data = start_game(client)
 
     if not game_data:
         print("Failed to start game. Exiting.")
@@ -122,85 +130,67 @@ def run_game():
     client_data = game_data["client_data"]
     score = 0  # Starting score
 
-    # Calculate delay to achieve 55 requests per minute
-    delay = 60 / 55  # seconds per request
-
     # Run the queries
     queries_made = 0
     start_time = time.time()
 
-    predictor = SimpleModel()
-
-    while True:  # Run indefinitely until game over
-        print(f"\nChecking result for level {score} ...")
-
-        output_dir = data_dir / f"level_{score}"
-        process_json_file(client_data, output_dir)
-
-        ### Parse saved documents
-        # Parse the PNG passport image and save as JSON
-        passport_png_path = output_dir / "passport.png"
-        parsed_png = parse_png_to_json(passport_png_path)
-        save_to_json(parsed_png, output_dir / "passport.json")
-
-        # Parse the PDF clien account banking form and save as JSON
-        client_account = ClientAccountParser.parse(output_dir / "account.pdf")
-        save_to_json(client_account, output_dir / "account.json")
-
-        # Parse the client profile DOCX file and save as JSON
-        client_profile = ClientProfileParser.parse(output_dir / "profile.docx")
-        save_to_json(client_profile, output_dir / "profile.json")
-
-        # Parse the TXT file and save as JSON
-        client_description = ClientDescriptionParser.parse(
-            output_dir / "description.txt"
-        )
-        save_to_json(client_description, output_dir / "description.json")
-
-        try:
-            client_file = ClientData(
-                client_file=str(output_dir),
-                account_form=client_account,
-                client_description=client_description,
-                client_profile=client_profile,
-                passport=parsed_png,
-            )
-            decision = predictor.predict(client_file)
-        except AssertionError as e:
-            print(f"Error in client data: {e}")
-            decision = 0  # Default to Reject if there's an error
-
-        print(f"Decision: {decision}")
-        response = send_decision(session_id, current_client_id, decision)
-
-        queries_made += 1
-        client_data = response.get("client_data", {})
-        score = response["score"]
-
-        # Check if game is over
-        if response["status"] == "gameover":
-            print(f"\nGame over! Final score: {score}")
-
-            # Save the result
-            save_result(response, score + 1, 0, decision)
-            break
-
-        else:
-            # Update client ID and score for next request immediately after receiving the response
-            current_client_id = response["client_id"]
+    predictor = CachedPredictor(SimpleModel())
+    loader = ClientDataLoader(ClientPassportParser(PassportBackendType.OPENAI))
+    persist_executor = ThreadPoolExecutor(max_workers=1) if persist_documents else None
+    uploader = BackgroundUploader()
 
+    try:
+        while True:  # Run indefinitely until game over
+            print(f"\nChecking result for level {score} ...")
+
+            output_dir = data_dir / f"level_{score}"
+            # Decode and parse the documents in memory
+            files = decode_client_files(client_data)
+
+            try:
+                # Passport, account, profile and description are parsed concurrently
+                client_file = loader.load(str(output_dir), files)
+                if persist_executor is not None:
+                    persist_executor.submit(persist_level, output_dir, files, client_file)
+
+                decision = predictor.predict(client_file)
+            except AssertionError as e:
+                print(f"Error in client data: {e}")
+                decision = 0  # Default to Reject if there's an error
+
+            print(f"Decision: {decision}")
+            response = send_decision(session_id, current_client_id, decision, client)
+            if response is None:
+                raise RuntimeError(f"Sending the decision for client {current_client_id} failed")
+
+            queries_made += 1
+            client_data = response.get("client_data", {})
             score = response["score"]
 
-            # Save the result
-            save_result(client_data, score, 1, decision)
-
-        # Calculate time to sleep to maintain 55 requests per minute
-        elapsed = time.time() - start_time
-        expected_elapsed = queries_made * delay
-        sleep_time = max(0, expected_elapsed - elapsed)
-
-        if sleep_time > 0:
-            time.sleep(sleep_time)
+            # Check if game is over
+            if response["status"] == "gameover":
+                print(f"\nGame over! Final score: {score}")
+
+                # Save the result
+                save_result(response, score + 1, 0, decision, uploader)
+                break
+
+            else:
+                # Update client ID and score for next request immediately after receiving the response
+                current_client_id = response["client_id"]
+
+                score = response["score"]
+
+                # Save the result
+                save_result(client_data, score, 1, decision, uploader)
+    finally:
+        # Also on errors, so results already queued are not lost with the daemon upload threads
+        loader.close()
+        if persist_executor is not None:
+            persist_executor.shutdown(wait=True)
+        # Wait for the pending results to reach storage
+        uploader.close()
+        print(f"Uploads: {uploader.stats()}")
 
     # Print summary
     elapsed_time = time.time() - start_time
@@ -0,0 +1,66 @@
+"""Thread-safe token bucket used to pace requests to rate limited APIs."""
+
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Token bucket allowing `rate` requests per `per` seconds with bursts of up
+    to `burst` requests. One limiter can be shared by every thread and game
+    session that draws from the same API budget.
+    """
+
+    def __init__(self, rate: float, per: float = 60.0, burst: int = 1):
+        """
+        Args:
+            rate: Number of requests allowed per period
+            per: Length of the period in seconds
+            burst: Maximum number of requests that may be sent back to back
+        """
+        if rate <= 0 or per <= 0:
+            raise ValueError(f"Rate must be positive, got {rate} per {per}s")
+        if burst < 1:
+            raise ValueError(f"Burst must be at least 1, got {burst}")
+        self.rate = rate
+        self.per = per
+        self.burst = burst
+        self._tokens_per_second = rate / per
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waited_seconds = 0.0
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self._tokens_per_second)
+        self._updated = now
+
+    def try_acquire(self, tokens: int = 1) -> bool:
+        """Take tokens if they are available right now, without waiting."""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: int = 1) -> float:
+        """
+        Block until tokens are available and take them.
+
+        Returns:
+            Seconds spent waiting
+        """
+        if tokens > self.burst:
+            raise ValueError(f"Cannot acquire {tokens} tokens from a bucket of {self.burst}")
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            # Reserve the tokens now, so concurrent callers queue up behind
+            # each other instead of all waking at the same instant
+            self._tokens -= tokens
+            wait = max(0.0, -self._tokens / self._tokens_per_second)
+            self.waited_seconds += wait
+        if wait > 0:
+            time.sleep(wait)
+        return wait
@@ -0,0 +1,285 @@
+"""
+Offline rule ablation from a cached clients x rules verdict matrix.
+
+`build` parses the train set once and evaluates every flag on every client,
+without the short-circuit of SimpleModel, and stores the verdicts in a
+compressed NumPy archive. Any subset or ordering of the rules is then scored
+from the matrix alone: a client is accepted when none of the chosen flags
+fires, and a rejection is attributed to the first firing flag in the order.
+
+Usage:
+    python rule_ablation.py build --output verdicts.npz [--limit 500]
+    python rule_ablation.py eval verdicts.npz --rules flag_passport,flag_address
+    python rule_ablation.py ablate verdicts.npz [--greedy]
+"""
+
+import argparse
+import time
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from evaluation_metrics import EvaluationMetrics
+
+
+class VerdictMatrix:
+    """Verdict of every flag on every client, with the ground truth of each client."""
+
+    def __init__(
+        self,
+        verdicts: np.ndarray,
+        errors: np.ndarray,
+        labels: np.ndarray,
+        clients: List[str],
+        rules: List[str],
+        rule_versions: List[str],
+    ):
+        """
+        Args:
+            verdicts: Boolean clients x rules matrix, True where the flag fired or raised
+            errors: Boolean clients x rules matrix, True where the flag raised
+            labels: Ground truth of each client, True for a valid client
+            clients: Identifier (path) of each row
+            rules: Flag name of each column
+            rule_versions: flag_version of each column when the matrix was built
+        """
+        self.verdicts = verdicts
+        self.errors = errors
+        self.labels = labels
+        self.clients = clients
+        self.rules = rules
+        self.rule_versions = rule_versions
+
+    @classmethod
+    def compute(cls, clients: Iterable[Tuple[str, "ClientData"]], rules: Optional[list] = None) -> "VerdictMatrix":
+        """
+        Evaluate every flag on every client.
+
+        Args:
+            clients: Pairs of identifier and ClientData with its label set
+            rules: (flag, message) pairs, defaults to the RULES of SimpleModel
+        """
+        from model.rule_based_model import RULES, flag_version
+
+        rules = RULES if rules is None else rules
+        rows, error_rows, labels, identifiers = [], [], [], []
+        for identifier, client in clients:
+            row, error_row = [], []
+            for flag, _ in rules:
+                try:
+                    row.append(bool(flag(client)))
+                    error_row.append(False)
+                except Exception:
+                    # SimpleModel would fail the client; count it as a rejection
+                    row.append(True)
+                    error_row.append(True)
+            rows.append(row)
+            error_rows.append(error_row)
+            labels.append(bool(client.label))
+            identifiers.append(identifier)
+
+        shape = (len(rows), len(rules))
+        return cls(
+            np.array(rows, dtype=bool).reshape(shape),
+            np.array(error_rows, dtype=bool).reshape(shape),
+            np.array(labels, dtype=bool),
+            identifiers,
+            [flag.__name__ for flag, _ in rules],
+            [flag_version(flag) for flag, _ in rules],
+        )
+
+    def save(self, path: str):
+        np.savez_compressed(
+            path,
+            verdicts=self.verdicts,
+            errors=self.errors,
+            labels=self.labels,
+            clients=np.array(self.clients, dtype=str),
+            rules=np.array(self.rules, dtype=str),
+            rule_versions=np.array(self.rule_versions, dtype=str),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> "VerdictMatrix":
+        with np.load(path) as archive:
+            return cls(
+                archive["verdicts"],
+                archive["errors"],
+                archive["labels"],
+                archive["clients"].tolist(),
+                archive["rules"].tolist(),
+                archive["rule_versions"].tolist(),
+            )
+
+    def stale_rules(self, rules: Optional[list] = None) -> List[str]:
+        """Names of the current flags whose code changed since the matrix was built, or that it lacks."""
+        from model.rule_based_model import RULES, flag_version
+
+        stored = dict(zip(self.rules, self.rule_versions))
+        return [
+            flag.__name__ for flag, _ in (RULES if rules is None else rules)
+            if stored.get(flag.__name__) != flag_version(flag)
+        ]
+
+    def _columns(self, rules: Optional[Sequence[str]]) -> List[int]:
+        if rules is None:
+            return list(range(len(self.rules)))
+        unknown = [rule for rule in rules if rule not in self.rules]
+        if unknown:
+            raise ValueError(f"Rules not in the verdict matrix: {unknown}")
+        return [self.rules.index(rule) for rule in rules]
+
+    def evaluate(self, rules: Optional[Sequence[str]] = None) -> EvaluationMetrics:
+        """
+        Score a subset and ordering of the rules from the stored verdicts.
+
+        Args:
+            rules: Flag names in evaluation order, defaults to all columns in stored order
+
+        Returns:
+            Metrics as if SimpleModel ran only these rules in this order
+        """
+        columns = self._columns(rules)
+        fired = self.verdicts[:, columns]
+        rejected = fired.any(axis=1)
+        accepted = ~rejected
+        labels = self.labels
+
+        metrics = EvaluationMetrics()
+        metrics.true_positive = int((accepted & labels).sum())
+        metrics.false_positive = int((accepted & ~labels).sum())
+        metrics.true_negative = int((rejected & ~labels).sum())
+        metrics.false_negative = int((rejected & labels).sum())
+        metrics.false_positives = [self.clients[i] for i in np.flatnonzero(accepted & ~labels)]
+        metrics.false_negatives = [self.clients[i] for i in np.flatnonzero(rejected & labels)]
+
+        if not columns:
+            return metrics
+        # argmax finds the first firing column, which is the rule that rejects
+        first = fired.argmax(axis=1)
+        for position, column in enumerate(columns):
+            decided = rejected & (first == position)
+            count = int(decided.sum())
+            if count:
+                metrics.rules[self.rules[column]] = {
+                    "rejected": count,
+                    "false_negatives": int((decided & labels).sum()),
+                }
+        return metrics
+
+
+def leave_one_out(matrix: VerdictMatrix, rules: Optional[Sequence[str]] = None) -> List[Tuple[str, EvaluationMetrics]]:
+    """Metrics with each rule removed in turn from the given rules."""
+    rules = list(matrix.rules if rules is None else rules)
+    return [(rule, matrix.evaluate([r for r in rules if r != rule])) for rule in rules]
+
+
+def greedy_elimination(matrix: VerdictMatrix, rules: Optional[Sequence[str]] = None) -> List[Tuple[str, float]]:
+    """
+    Remove rules one at a time while that improves accuracy, always removing
+    the rule whose removal helps most.
+
+    Returns:
+        Removed rules with the accuracy reached after each removal
+    """
+    rules = list(matrix.rules if rules is None else rules)
+    accuracy = matrix.evaluate(rules).accuracy
+    removed = []
+    while rules:
+        best_rule, best_metrics = max(leave_one_out(matrix, rules), key=lambda item: item[1].accuracy)
+        if best_metrics.accuracy <= accuracy:
+            break
+        rules.remove(best_rule)
+        accuracy = best_metrics.accuracy
+        removed.append((best_rule, accuracy))
+    return removed
+
+
+def _train_clients(limit=None, minkey=None, maxkey=None):
+    """Parse train clients with prefetching, skipping those that fail to parse."""
+    from data_parsing.client_data_loader import ClientDataLoader
+    from data_parsing.client_passport_parser import ClientPassportParser, PassportBackendType
+    from trainset import PrefetchingTrainIterator
+
+    with ClientDataLoader(ClientPassportParser(PassportBackendType.OPENAI)) as loader:
+        trainiter = PrefetchingTrainIterator(loader, limit=limit, minkey=minkey, maxkey=maxkey)
+        try:
+            while True:
+                try:
+                    client = next(trainiter)
+                except StopIteration:
+                    return
+                except Exception as e:
+                    print(f"Skipping {trainiter.current_path}: {e}")
+                    continue
+                yield trainiter.current_path, client
+        finally:
+            trainiter.close()
+
+
+def _print_row(name: str, metrics: EvaluationMetrics, baseline: Optional[EvaluationMetrics] = None):
+    delta = f"{100 * (metrics.accuracy - baseline.accuracy):+8.2f}" if baseline is not None else " " * 8
+    print(
+        f"{name:<32}{100 * metrics.accuracy:>8.2f}{delta}{metrics.precision:>8.3f}{metrics.recall:>8.3f}"
+        f"{metrics.false_positive:>6}{metrics.false_negative:>6}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build a rule verdict matrix and run ablations on it")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Evaluate every rule on the train set")
+    build_parser.add_argument("--output", "-o", default="verdicts.npz", help="Verdict matrix file")
+    build_parser.add_argument("--limit", type=int, default=None, help="Maximum number of clients")
+    build_parser.add_argument("--minkey", type=int, default=None, help="Smallest client id included")
+    build_parser.add_argument("--maxkey", type=int, default=None, help="Client ids from this value on are excluded")
+
+    eval_parser = subparsers.add_parser("eval", help="Score a subset or ordering of the rules")
+    eval_parser.add_argument("matrix", help="Verdict matrix file")
+    eval_parser.add_argument("--rules", default=None, help="Comma-separated flag names in order (default: all)")
+
+    ablate_parser = subparsers.add_parser("ablate", help="Score the rules with each one left out")
+    ablate_parser.add_argument("matrix", help="Verdict matrix file")
+    ablate_parser.add_argument("--greedy", action="store_true", help="Also remove rules greedily while accuracy improves")
+
+    args = parser.parse_args()
+    if args.command == "build":
+        from env import load_env
+
+        load_env()
+        started = time.perf_counter()
+        matrix = VerdictMatrix.compute(_train_clients(args.limit, args.minkey, args.maxkey))
+        matrix.save(args.output)
+        print(f"Saved {len(matrix.clients)} clients x {len(matrix.rules)} rules to {args.output} "
+              f"in {time.perf_counter() - started:.0f}s")
+        return
+
+    matrix = VerdictMatrix.load(args.matrix)
+    stale = matrix.stale_rules()
+    if stale:
+        print(f"Warning: rules changed since the matrix was built, rebuild it to score them: {stale}")
+
+    print(f"{'rules':<32}{'acc %':>8}{'delta':>8}{'prec':>8}{'recall':>8}{'FP':>6}{'FN':>6}")
+    if args.command == "eval":
+        rules = args.rules.split(",") if args.rules else None
+        metrics = matrix.evaluate(rules)
+        _print_row("selected", metrics)
+        print()
+        print(metrics.rule_report())
+        return
+
+    started = time.perf_counter()
+    baseline = matrix.evaluate()
+    _print_row("all", baseline)
+    for rule, metrics in leave_one_out(matrix):
+        _print_row(f"-{rule}", metrics, baseline)
+    if args.greedy:
+        print("\nGreedy elimination:")
+        for rule, accuracy in greedy_elimination(matrix):
+            print(f"  remove {rule:<32}accuracy {100 * accuracy:.2f}%")
+    print(f"\nScored from the matrix in {1000 * (time.perf_counter() - started):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
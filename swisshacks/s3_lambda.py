@@ -1,54 +1,281 @@
+"""
+Parse the passport images stored under a prefix into passport.json objects.
+
+The work is planned from a single listing: every passport.png without a
+passport.json next to it is parsed, so a rerun only does what is left and
+redoes a passport whose passport.json was deleted. Outcomes are also
+appended to a local checkpoint, which lets a rerun skip passports that
+failed before instead of paying for them again.
+
+Usage:
+    python s3_lambda.py --prefix train/ [--workers 10] [--rate 300] [--skip-failed] [--dry-run]
+"""
+
+import argparse
 import json
-import logging
-import concurrent.futures
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
 import storage
+from rate_limit import RateLimiter
 
-from data_parsing.parse_passport_openai import parse_png
+PASSPORT_IMAGE = "passport.png"
+PASSPORT_JSON = "passport.json"
 
-# Set up logging
-logger = logging.getLogger(__name__)
 
+def _sort_key(passport_key: str):
+    # Keys end in <client id>/passport.png; order numerically where possible
+    client_id = passport_key.split("/")[-2]
+    return (0, int(client_id), passport_key) if client_id.isdigit() else (1, 0, passport_key)
 
-def parse_s3_passport(passport_key):
-    # Get the image data from S3
-    image_data = storage.read_object(passport_key)
-    json_key = passport_key.replace("passport.png", "passport.json")
-    if storage.check_object_exists(json_key):
-        return
 
-    # Process the passport image
-    passport_data = parse_png(image_data)
+def plan_passports(prefix: str = "train/", exclude=()) -> List[str]:
+    """
+    List the passport images under a prefix that still need parsing.
+
+    Args:
+        prefix: Storage prefix to search for passport.png files
+        exclude: Passport keys to leave out, e.g. those that failed in a previous run
+
+    Returns:
+        Keys of the passport images without a passport.json, ordered by client id
+    """
+    keys = storage.list_objects(prefix)
+    parsed = {key[: -len(PASSPORT_JSON)] for key in keys if key.endswith(PASSPORT_JSON)}
+    exclude = set(exclude)
+    pending = [
+        key for key in keys
+        if key.endswith(PASSPORT_IMAGE) and key[: -len(PASSPORT_IMAGE)] not in parsed and key not in exclude
+    ]
+    return sorted(pending, key=_sort_key)
+
 
-    # Store the processed data
-    assert storage.store_object(json.dumps(passport_data), json_key)
-    print(f"Processed passport file: {json_key}")
+class Checkpoint:
+    """
+    Append-only log of finished passport keys. Each line is a JSON record of
+    a key and its outcome; the last record of a key wins, so a passport that
+    failed and later succeeded counts as completed.
+
+    The listing decides what is left to do, so completed keys are kept for
+    reference only; the failed ones can be skipped on a rerun. The file is
+    opened on the first record, so loading a checkpoint leaves it untouched.
+    """
+
+    def __init__(self, path: Optional[str]):
+        """
+        Args:
+            path: Log file, None to keep the checkpoint in memory only
+        """
+        self.path = path
+        self.completed = set()
+        self.failed: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._file = None
+        if path and os.path.exists(path):
+            with open(path, "r") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # A line cut short by an interrupted run
+                        continue
+                    self._apply(entry["key"], entry.get("error"))
+
+    def _apply(self, key: str, error: Optional[str]):
+        if error is None:
+            self.completed.add(key)
+            self.failed.pop(key, None)
+        else:
+            self.failed[key] = error
+
+    def record(self, key: str, error: Optional[str] = None):
+        """Record a finished key, with the error message if it failed."""
+        with self._lock:
+            self._apply(key, error)
+            if self._file is None and self.path:
+                self._file = open(self.path, "a")
+            if self._file is not None:
+                self._file.write(json.dumps({"key": key, "error": error}) + "\n")
+                self._file.flush()
 
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
 
-def parse_s3_passports(prefix: str = "train/") -> int:
+
+@dataclass
+class JobStats:
+    total: int = 0
+    completed: int = 0
+    failed: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def done(self) -> int:
+        return self.completed + self.failed
+
+    def __str__(self):
+        rate = self.done / self.elapsed if self.elapsed else 0.0
+        line = f"{self.done}/{self.total} passports ({self.completed} parsed, {self.failed} failed) in {self.elapsed:.0f}s"
+        line += f", {rate * 60:.1f}/min"
+        if rate and self.done < self.total:
+            line += f", ETA {(self.total - self.done) / rate:.0f}s"
+        return line
+
+
+def parse_s3_passport(passport_key: str, parser, rate_limiter: Optional[RateLimiter] = None):
     """
-    Process all passport.png files in S3 under the given prefix and store results as JSON.
+    Parse one stored passport image and store the result next to it as passport.json.
 
     Args:
-        prefix: S3 prefix to search for passport.png files (default: "" which means all)
+        passport_key: Key of the passport.png object
+        parser: Passport parser, e.g. ClientPassportParser
+        rate_limiter: Limiter shared by all parses, taken before each parser call
+    """
+    # Each image is read once, so stream it instead of filling the read cache
+    stream = storage.open_object(passport_key)
+    if stream is None:
+        raise RuntimeError(f"Could not read {passport_key}")
+    with stream:
+        image_data = stream.read()
+
+    if rate_limiter is not None:
+        rate_limiter.acquire()
+    passport = parser.parse(image_data)
+
+    json_key = passport_key[: -len(PASSPORT_IMAGE)] + PASSPORT_JSON
+    if not storage.store_object(passport.to_json(ensure_ascii=False), json_key, content_type="application/json"):
+        raise RuntimeError(f"Could not store {json_key}")
+
+
+def plan_run(prefix: str, checkpoint: Checkpoint, skip_failed: bool = False) -> List[str]:
+    """
+    Plan a run from the listing, skipping the checkpoint's failures if asked.
+
+    Args:
+        prefix: Storage prefix to search for passport.png files
+        checkpoint: Checkpoint of previous runs
+        skip_failed: Skip passports that failed in a previous run
 
     Returns:
-        Number of processed files
+        Keys of the passport images to parse, ordered by client id
     """
-    # List all objects with the given prefix
-    all_objects = storage.list_objects(prefix=prefix)
+    return plan_passports(prefix, checkpoint.failed if skip_failed else ())
+
 
-    # Filter objects to find passport.png files
-    passport_objects = [obj for obj in all_objects if obj.endswith("passport.png")]
-    passport_objects = sorted(passport_objects, key=lambda x: int(x.split("/")[-2]))
+def parse_s3_passports(
+    prefix: str = "train/",
+    workers: int = 10,
+    requests_per_minute: float = 300,
+    checkpoint_path: Optional[str] = None,
+    skip_failed: bool = False,
+    parser=None,
+    progress_interval: float = 5.0,
+) -> JobStats:
+    """
+    Parse every passport.png under a prefix that has no passport.json yet.
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-        # Submit tasks to the thread pool
-        executor.map(parse_s3_passport, passport_objects)
+    Args:
+        prefix: Storage prefix to search for passport.png files
+        workers: Number of passports parsed concurrently
+        requests_per_minute: Rate limit of the parser's API
+        checkpoint_path: Log of finished keys, None to not keep one
+        skip_failed: Skip passports that failed in a previous run
+        parser: Passport parser, defaults to the OpenAI backend
+        progress_interval: Seconds between progress lines
 
-    print(f"Processed {len(passport_objects)} passport files")
-    return len(passport_objects)
+    Returns:
+        Statistics of the run
+    """
+    checkpoint = Checkpoint(checkpoint_path)
+    passport_keys = plan_run(prefix, checkpoint, skip_failed)
+    stats = JobStats(total=len(passport_keys))
+    print(f"Planned {stats.total} passports under {prefix!r}")
+    if not passport_keys:
+        checkpoint.close()
+        return stats
+
+    if parser is None:
+        from data_parsing.client_passport_parser import ClientPassportParser, PassportBackendType
+
+        parser = ClientPassportParser(PassportBackendType.OPENAI)
+    rate_limiter = RateLimiter(requests_per_minute, burst=workers)
+
+    started = time.perf_counter()
+    last_report = started
+    remaining = iter(passport_keys)
+    in_flight = {}
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+
+            def fill():
+                # Keep a bounded window of submitted work instead of the whole plan
+                while len(in_flight) < 2 * workers:
+                    key = next(remaining, None)
+                    if key is None:
+                        return
+                    in_flight[pool.submit(parse_s3_passport, key, parser, rate_limiter)] = key
+
+            fill()
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = in_flight.pop(future)
+                    try:
+                        future.result()
+                    except Exception as e:
+                        print(f"Failed to parse {key}: {e}")
+                        checkpoint.record(key, str(e) or type(e).__name__)
+                        stats.failed += 1
+                    else:
+                        checkpoint.record(key)
+                        stats.completed += 1
+                fill()
+
+                now = time.perf_counter()
+                if now - last_report >= progress_interval:
+                    stats.elapsed = now - started
+                    print(stats)
+                    last_report = now
+    finally:
+        checkpoint.close()
+    stats.elapsed = time.perf_counter() - started
+    print(stats)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse stored passport images into passport.json objects")
+    parser.add_argument("--prefix", default="train/", help="Storage prefix to search for passport.png files")
+    parser.add_argument("--workers", type=int, default=10, help="Passports parsed concurrently")
+    parser.add_argument("--rate", type=float, default=300, help="Parser requests per minute")
+    parser.add_argument("--checkpoint", default=None, help="Checkpoint file (default .s3_lambda_checkpoint.jsonl)")
+    parser.add_argument("--skip-failed", action="store_true", help="Skip passports that failed in a previous run")
+    parser.add_argument("--dry-run", action="store_true", help="Only print how many passports are left")
+    args = parser.parse_args()
+
+    from env import PROJECT_ROOT, load_env
+
+    load_env()
+    checkpoint_path = args.checkpoint or str(PROJECT_ROOT / ".s3_lambda_checkpoint.jsonl")
+    if args.dry_run:
+        passport_keys = plan_run(args.prefix, Checkpoint(checkpoint_path), args.skip_failed)
+        print(f"{len(passport_keys)} passports left under {args.prefix!r}")
+        return
+    parse_s3_passports(
+        args.prefix,
+        workers=args.workers,
+        requests_per_minute=args.rate,
+        checkpoint_path=checkpoint_path,
+        skip_failed=args.skip_failed,
+    )
 
 
 if __name__ == "__main__":
-    # Example usage
-    parse_s3_passports("train/")
+    main()
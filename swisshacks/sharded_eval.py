@@ -0,0 +1,263 @@
+"""
+Evaluate the train set in deterministic shards, in a local process pool or
+spread over several machines, and merge the per-shard results.
+
+Shards are contiguous ranges of client ids holding about the same number of
+clients. The same train folder always gives the same shards, so machines
+only need to agree on the shard count. Each shard writes its own results
+file, and a shard whose complete results exist is not evaluated again.
+
+Usage:
+    python sharded_eval.py run --shards 8 --workers 4 --output eval_results/
+    python sharded_eval.py run --shards 8 --node 0 --nodes 2 --upload eval/run1/   # on each machine
+    python sharded_eval.py merge --output eval_results/ [--remote eval/run1/]
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import List, Optional
+
+import storage
+from evaluation_metrics import EvaluationMetrics
+from trainset import FOLDER
+
+RESULTS_PATTERN = "shard-{:03d}-of-{:03d}.json"
+
+
+@dataclass
+class Shard:
+    index: int
+    count: int
+    # Client ids in [minkey, maxkey); None leaves the range open
+    minkey: Optional[int]
+    maxkey: Optional[int]
+    # Number of clients in the range, to detect incomplete results
+    clients: int
+
+    @property
+    def results_name(self) -> str:
+        return RESULTS_PATTERN.format(self.index, self.count)
+
+
+def partition(count: int, folder: str = FOLDER) -> List[Shard]:
+    """
+    Split the clients of a train folder into `count` ranges of client ids
+    with about the same number of clients each.
+    """
+    if count < 1:
+        raise ValueError(f"Shard count must be at least 1, got {count}")
+    ids = sorted(
+        int(client_id)
+        for label in "01"
+        if os.path.isdir(os.path.join(folder, label, "0"))
+        for client_id in os.listdir(os.path.join(folder, label, "0"))
+    )
+    if not ids:
+        raise ValueError(f"No clients found in {folder}")
+
+    bounds = [None] + [ids[i * len(ids) // count] for i in range(1, count)] + [None]
+    shards = []
+    for index in range(count):
+        minkey, maxkey = bounds[index], bounds[index + 1]
+        clients = sum(1 for i in ids if (minkey is None or i >= minkey) and (maxkey is None or i < maxkey))
+        shards.append(Shard(index, count, minkey, maxkey, clients))
+    return shards
+
+
+def _is_complete(result: dict) -> bool:
+    return result["evaluated"] >= result["clients"]
+
+
+def _write_json(path: str, data: dict):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def run_shard(shard: Shard, output_dir: str, upload_prefix: Optional[str] = None) -> dict:
+    """
+    Evaluate one shard and write its results file.
+
+    Returns:
+        The results: shard range, client counts, elapsed seconds and metrics
+    """
+    from env import load_env
+    from evaluate_train import evaluate_range
+
+    load_env()
+    started = time.perf_counter()
+    log_path = os.path.join(output_dir, f"validation_debug-{shard.index:03d}.log")
+    metrics = evaluate_range(shard.minkey, shard.maxkey, verbose=False, log_path=log_path)
+    result = {
+        "shard": shard.index,
+        "shards": shard.count,
+        "minkey": shard.minkey,
+        "maxkey": shard.maxkey,
+        "clients": shard.clients,
+        "evaluated": metrics.total_samples,
+        "elapsed": time.perf_counter() - started,
+        "metrics": metrics.to_dict(),
+    }
+    _write_json(os.path.join(output_dir, shard.results_name), result)
+    if upload_prefix is not None:
+        storage.store_object(json.dumps(result), upload_prefix + shard.results_name, content_type="application/json")
+    return result
+
+
+def run_shards(
+    count: int,
+    output_dir: str,
+    workers: int = 4,
+    node: int = 0,
+    nodes: int = 1,
+    upload_prefix: Optional[str] = None,
+    force: bool = False,
+) -> List[dict]:
+    """
+    Evaluate the shards assigned to this node in a process pool.
+
+    Args:
+        count: Total number of shards
+        output_dir: Directory the results files are written to
+        workers: Number of shards evaluated at the same time
+        node: Index of this machine, it evaluates the shards with index % nodes == node
+        nodes: Number of machines sharing the evaluation
+        upload_prefix: If given, results files are also stored under this prefix
+        force: Evaluate shards again even if their complete results exist
+
+    Returns:
+        Results of the shards evaluated in this call
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    shards = [shard for shard in partition(count) if shard.index % nodes == node]
+    pending = []
+    for shard in shards:
+        path = os.path.join(output_dir, shard.results_name)
+        if not force and os.path.exists(path):
+            with open(path, "r") as f:
+                if _is_complete(json.load(f)):
+                    print(f"Shard {shard.index}: complete results exist, skipping")
+                    continue
+        pending.append(shard)
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_shard, shard, output_dir, upload_prefix): shard for shard in pending}
+        for future in as_completed(futures):
+            shard = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"Shard {shard.index} failed: {e}")
+                continue
+            results.append(result)
+            accuracy = result["metrics"]["accuracy"]
+            print(
+                f"Shard {shard.index}: {result['evaluated']}/{result['clients']} clients, "
+                f"accuracy {100 * accuracy:.1f}%, {result['elapsed']:.0f}s"
+            )
+    return results
+
+
+def load_results(output_dir: Optional[str] = None, remote_prefix: Optional[str] = None) -> List[dict]:
+    """Read the results files from a local directory or from a storage prefix."""
+    results = []
+    if remote_prefix is not None:
+        for key in storage.list_objects(remote_prefix):
+            if os.path.basename(key).startswith("shard-") and key.endswith(".json"):
+                content = storage.read_object(key)
+                if content is not None:
+                    results.append(json.loads(content))
+    else:
+        for name in sorted(os.listdir(output_dir)):
+            if name.startswith("shard-") and name.endswith(".json"):
+                with open(os.path.join(output_dir, name), "r") as f:
+                    results.append(json.load(f))
+    return sorted(results, key=lambda result: result["shard"])
+
+
+def merge_results(results: List[dict]) -> dict:
+    """
+    Merge shard results into one report.
+
+    Returns:
+        Dictionary with the shard count, the missing and incomplete shard
+        indices and the merged metrics
+    """
+    if not results:
+        raise ValueError("No shard results to merge")
+    counts = {result["shards"] for result in results}
+    if len(counts) != 1:
+        raise ValueError(f"Results of different shard counts cannot be merged: {sorted(counts)}")
+    count = counts.pop()
+
+    metrics = EvaluationMetrics()
+    for result in results:
+        metrics.merge(EvaluationMetrics.from_dict(result["metrics"]))
+    present = {result["shard"] for result in results}
+    return {
+        "shards": count,
+        "missing": [index for index in range(count) if index not in present],
+        "incomplete": [result["shard"] for result in results if not _is_complete(result)],
+        "elapsed": sum(result["elapsed"] for result in results),
+        "metrics": metrics.to_dict(),
+    }
+
+
+def print_report(report: dict):
+    metrics = EvaluationMetrics.from_dict(report["metrics"])
+    print(metrics)
+    metrics.print_confusion_matrix()
+    print("\nRejections per rule:")
+    print(metrics.rule_report())
+    print(f"\nFalse positives ({len(metrics.false_positives)}):")
+    for path in metrics.false_positives:
+        print(f"  {path}")
+    print(f"False negatives ({len(metrics.false_negatives)}):")
+    for path in metrics.false_negatives:
+        print(f"  {path}")
+    if report["missing"] or report["incomplete"]:
+        print(f"\nWarning: missing shards {report['missing']}, incomplete shards {report['incomplete']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate the train set in shards and merge the results")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Evaluate shards")
+    run_parser.add_argument("--shards", type=int, required=True, help="Total number of shards")
+    run_parser.add_argument("--workers", type=int, default=4, help="Shards evaluated at the same time")
+    run_parser.add_argument("--output", "-o", default="eval_results", help="Results directory")
+    run_parser.add_argument("--node", type=int, default=0, help="Index of this machine")
+    run_parser.add_argument("--nodes", type=int, default=1, help="Number of machines")
+    run_parser.add_argument("--upload", default=None, help="Storage prefix to store the results files under")
+    run_parser.add_argument("--force", action="store_true", help="Evaluate shards with existing results again")
+
+    merge_parser = subparsers.add_parser("merge", help="Merge shard results into one report")
+    merge_parser.add_argument("--output", "-o", default="eval_results", help="Results directory")
+    merge_parser.add_argument("--remote", default=None, help="Read the results from this storage prefix instead")
+
+    args = parser.parse_args()
+    from env import load_env
+
+    load_env()
+    if args.command == "run":
+        if not 0 <= args.node < args.nodes:
+            parser.error(f"--node must be in [0, {args.nodes})")
+        run_shards(args.shards, args.output, args.workers, args.node, args.nodes, args.upload, args.force)
+        if args.nodes > 1:
+            return
+
+    report = merge_results(load_results(args.output, getattr(args, "remote", None)))
+    os.makedirs(args.output, exist_ok=True)
+    _write_json(os.path.join(args.output, "merged.json"), report)
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""
+Pack the train set into a few large zip shards and stream clients from them.
+
+Each client is four small files, so syncing the raw train set means
+thousands of tiny GETs. A shard holds many clients as uncompressed zip
+members named `<label>/<client id>/<file>`; the zip central directory at the
+end of the file is the index, so a reader fetches the footer once and then
+reads members sequentially, from disk or with ranged S3 reads.
+
+Usage:
+    python shards.py pack --shard-size 64 --upload shards/train/
+    python shards.py list shards/train/
+"""
+
+import argparse
+import io
+import os
+import random
+import zipfile
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+import storage
+from trainset import FOLDER, TrainIterator
+
+SHARD_PATTERN = "train-{:05d}.zip"
+
+
+@dataclass
+class ShardedClient:
+    """A training client read from a shard."""
+
+    # Path shaped like the train folder, <shard>/<label>/0/<client id>, so
+    # evaluate_predictions can read the label from it
+    path: str
+    label: bool
+    # File name (passport.png, account.pdf, ...) to content
+    files: Dict[str, bytes]
+
+
+def _client_dirs(folder: str, minkey: Optional[int] = None, maxkey: Optional[int] = None) -> List[tuple]:
+    clients = []
+    for label in "01":
+        label_dir = os.path.join(folder, label, "0")
+        if not os.path.isdir(label_dir):
+            continue
+        for client_id in sorted(os.listdir(label_dir), key=int):
+            if (maxkey is None or int(client_id) < maxkey) and (minkey is None or int(client_id) >= minkey):
+                clients.append((label, client_id, os.path.join(label_dir, client_id)))
+    return clients
+
+
+def pack_dataset(
+    output_dir: str,
+    folder: str = FOLDER,
+    shard_size_mb: float = 64,
+    upload_prefix: Optional[str] = None,
+) -> List[str]:
+    """
+    Pack the clients of a train folder into zip shards.
+
+    Clients are shuffled before packing, so every shard holds a mix of both
+    labels and any subset of shards is a fair sample.
+
+    Args:
+        output_dir: Directory the shards are written to
+        folder: Train folder with the <label>/0/<client id>/ layout
+        shard_size_mb: A shard is closed once it exceeds this size
+        upload_prefix: If given, each shard is also uploaded under this prefix
+
+    Returns:
+        Paths of the written shards
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    clients = _client_dirs(folder)
+    random.Random(42).shuffle(clients)
+
+    shard_paths = []
+    shard = None
+    shard_bytes = 0
+
+    def close_shard():
+        shard.close()
+        print(f"Packed {shard.filename} ({shard_bytes / 1e6:.1f} MB)")
+        if upload_prefix is not None:
+            with open(shard.filename, "rb") as handle:
+                storage.store_object(handle.read(), f"{upload_prefix}{os.path.basename(shard.filename)}")
+
+    for label, client_id, client_dir in clients:
+        if shard is None:
+            shard_paths.append(os.path.join(output_dir, SHARD_PATTERN.format(len(shard_paths))))
+            # Stored, not deflated: the documents are already compressed formats
+            shard = zipfile.ZipFile(shard_paths[-1], "w", compression=zipfile.ZIP_STORED)
+            shard_bytes = 0
+
+        for file_name in sorted(os.listdir(client_dir)):
+            if file_name.startswith("."):
+                # Hidden files are partial downloads and OS metadata, not documents
+                continue
+            file_path = os.path.join(client_dir, file_name)
+            shard.write(file_path, f"{label}/{client_id}/{file_name}")
+            shard_bytes += os.path.getsize(file_path)
+
+        if shard_bytes >= shard_size_mb * 1e6:
+            close_shard()
+            shard = None
+
+    if shard is not None:
+        close_shard()
+    print(f"Packed {len(clients)} clients into {len(shard_paths)} shards")
+    return shard_paths
+
+
+class RangedObjectReader(io.RawIOBase):
+    """
+    Seekable read-only file over an S3 object, fetching aligned blocks with
+    ranged GETs. zipfile only needs seek, tell and read, so a shard can be
+    opened without downloading it; reading members in order costs about one
+    GET per block.
+    """
+
+    def __init__(self, object_name: str, size: Optional[int] = None, block_size: int = 8 << 20):
+        self.object_name = object_name
+        self.size = size if size is not None else storage.get_object_size(object_name)
+        if self.size is None:
+            raise FileNotFoundError(f"Object {object_name} does not exist")
+        self.block_size = block_size
+        self.requests = 0
+        self._position = 0
+        self._block_start = -1
+        self._block = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._position = offset
+        elif whence == io.SEEK_CUR:
+            self._position += offset
+        elif whence == io.SEEK_END:
+            self._position = self.size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        return self._position
+
+    def _load_block(self, block_start: int):
+        end = min(block_start + self.block_size, self.size) - 1
+        data = storage.read_object_range(self.object_name, block_start, end)
+        if data is None:
+            raise IOError(f"Could not read bytes {block_start}-{end} of {self.object_name}")
+        self.requests += 1
+        self._block_start = block_start
+        self._block = data
+
+    def readinto(self, buffer) -> int:
+        if self._position >= self.size:
+            return 0
+        block_start = self._position - self._position % self.block_size
+        if block_start != self._block_start:
+            self._load_block(block_start)
+        offset = self._position - block_start
+        chunk = self._block[offset:offset + len(buffer)]
+        buffer[:len(chunk)] = chunk
+        self._position += len(chunk)
+        return len(chunk)
+
+
+def list_shards(source: str, remote: bool = False) -> List[str]:
+    """Return the shard files in a local directory or under a storage prefix."""
+    if remote:
+        return sorted(key for key in storage.list_objects(source) if key.endswith(".zip"))
+    return sorted(os.path.join(source, name) for name in os.listdir(source) if name.endswith(".zip"))
+
+
+def _open_shard(shard: str, remote: bool, block_size: int) -> zipfile.ZipFile:
+    if remote:
+        return zipfile.ZipFile(io.BufferedReader(RangedObjectReader(shard, block_size=block_size)))
+    return zipfile.ZipFile(shard)
+
+
+class ShardTrainIterator(TrainIterator):
+    """
+    TrainIterator over packed shards, yielding ShardedClient objects with the
+    files in memory instead of directory paths.
+
+    Shards are visited in random order and clients in their packed order,
+    which keeps reads sequential. predict() and the accuracy bookkeeping of
+    TrainIterator work unchanged.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        remote: bool = False,
+        limit: Optional[int] = None,
+        minkey: Optional[int] = None,
+        maxkey: Optional[int] = None,
+        block_size: int = 8 << 20,
+    ):
+        """
+        Args:
+            source: Local shard directory, or storage prefix if remote
+            remote: Read shards from storage with ranged GETs
+            limit: Maximum number of clients
+            minkey: Smallest client id included
+            maxkey: Client ids from this value on are excluded
+            block_size: Size of the ranged reads from storage
+        """
+        self.remote = remote
+        self.block_size = block_size
+        self.shards = list_shards(source, remote)
+        random.shuffle(self.shards)
+
+        # Read the index of every shard to know the clients up front
+        self._members: Dict[str, Dict[str, List[str]]] = {}
+        paths = []
+        for shard in self.shards:
+            with _open_shard(shard, remote, block_size) as archive:
+                clients: Dict[str, List[str]] = {}
+                for name in archive.namelist():
+                    label, client_id, _ = name.split("/", 2)
+                    clients.setdefault(f"{label}/{client_id}", []).append(name)
+            self._members[shard] = clients
+            for key in clients:
+                label, client_id = key.split("/")
+                if (maxkey is None or int(client_id) < maxkey) and (minkey is None or int(client_id) >= minkey):
+                    paths.append(f"{shard}/{label}/0/{client_id}")
+
+        super().__init__(limit=limit, paths=paths)
+        self._clients = self._read_clients()
+
+    def _read_clients(self) -> Iterator[ShardedClient]:
+        wanted = set(self.paths)
+        for shard in self.shards:
+            if not any(path.startswith(f"{shard}/") for path in wanted):
+                continue
+            with _open_shard(shard, self.remote, self.block_size) as archive:
+                for key, names in self._members[shard].items():
+                    label, client_id = key.split("/")
+                    path = f"{shard}/{label}/0/{client_id}"
+                    if path not in wanted:
+                        continue
+                    files = {name.rsplit("/", 1)[1]: archive.read(name) for name in names}
+                    yield ShardedClient(path, label == "1", files)
+
+    def __next__(self) -> ShardedClient:
+        if self.current_index < len(self.paths):
+            client = next(self._clients)
+            self.current_index += 1
+            return client
+        else:
+            print(self)
+            raise StopIteration
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack the train set into shards or inspect shards")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    pack_parser = subparsers.add_parser("pack", help="Pack the local train folder into shards")
+    pack_parser.add_argument("--output", "-o", default=os.path.join(FOLDER, "..", "shards"), help="Output directory")
+    pack_parser.add_argument("--shard-size", type=float, default=64, help="Shard size in MB")
+    pack_parser.add_argument("--upload", default=None, help="Storage prefix to upload the shards to")
+
+    list_parser = subparsers.add_parser("list", help="Count the clients in shards")
+    list_parser.add_argument("source", help="Shard directory, or storage prefix with --remote")
+    list_parser.add_argument("--remote", action="store_true", help="Read the shards from storage")
+
+    args = parser.parse_args()
+    from env import load_env
+
+    load_env()
+    if args.command == "pack":
+        pack_dataset(args.output, shard_size_mb=args.shard_size, upload_prefix=args.upload)
+    else:
+        iterator = ShardTrainIterator(args.source, remote=args.remote)
+        print(f"{len(iterator.shards)} shards with {len(iterator.paths)} clients")
+
+
+if __name__ == "__main__":
+    main()
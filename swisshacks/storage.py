@@ -1,121 +1,330 @@
+import io
 import os
 import json
-import gzip
-import boto3
-from botocore.exceptions import ClientError
-from typing import Union, Optional
+import functools
+import threading
+from typing import BinaryIO, Dict, Iterator, Union, Optional, Tuple
 import logging
 
+from payload_codecs import decode_stream, get_codec
+from storage_backends import NotModified, ObjectStream, StorageBackend, StorageError, create_backend
+
 logger = logging.getLogger(__name__)
 
+_backend: Optional[StorageBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_backend() -> StorageBackend:
+    """
+    Return the storage backend, created on first use from STORAGE_BACKEND
+    (s3, local or memory, default s3).
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_backend()
+        return _backend
+
+
+def set_backend(backend: Optional[StorageBackend]):
+    """Replace the storage backend, or reset it to the configured one with None."""
+    global _backend
+    _backend = backend
 
-def get_s3_client():
-    """Initialize and return an S3 client using environment variables for authentication."""
-    try:
-        s3_client = boto3.client(
-            "s3",
-            aws_access_key_id=os.environ.get("S3_ACCESS"),
-            aws_secret_access_key=os.environ.get("S3_SECRET"),
-        )
-        return s3_client
-    except Exception as e:
-        logger.error(f"Failed to initialize S3 client: {e}")
-        raise
 
+@functools.lru_cache(maxsize=None)
+def get_object_cache():
+    """
+    Return the local read-through cache, or None if it is disabled.
+
+    Configured with STORAGE_CACHE_DIR (default .storage_cache in the project
+    root, empty to disable) and STORAGE_CACHE_MAX_MB (default 1024).
+    """
+    from env import PROJECT_ROOT
+    from storage_cache import ObjectCache
+
+    cache_dir = os.environ.get("STORAGE_CACHE_DIR", str(PROJECT_ROOT / ".storage_cache"))
+    if not cache_dir:
+        return None
+    max_mb = float(os.environ.get("STORAGE_CACHE_MAX_MB", "1024"))
+    return ObjectCache(cache_dir, int(max_mb * 1024 * 1024))
 
-S3_CLIENT = get_s3_client()
-S3_BUCKET = os.environ.get("S3_BUCKET")
 
-assert S3_BUCKET, "S3_BUCKET environment variable is not set"
+def _cache_for(backend: StorageBackend):
+    """The read-through cache applies only to backends that go over the network."""
+    return get_object_cache() if backend.remote else None
+
+
+def is_offline() -> bool:
+    """Check if STORAGE_OFFLINE is set, in which case reads are served from the cache only."""
+    return os.environ.get("STORAGE_OFFLINE", "").lower() in ("1", "true", "yes")
+
+
+def caches_writes() -> bool:
+    """
+    Check if STORAGE_CACHE_WRITES is set, in which case uploads are also
+    written to the local cache. Off by default, so uploads do not push the
+    objects that are actually read out of the cache.
+    """
+    return os.environ.get("STORAGE_CACHE_WRITES", "").lower() in ("1", "true", "yes")
 
 
-def store_object(data: Union[str, bytes], object_name: str) -> bool:
+def store_object(
+    data: Union[str, bytes],
+    object_name: str,
+    content_type: Optional[str] = None,
+    content_encoding: Optional[str] = None,
+) -> bool:
     """
-    Upload data directly to an S3 bucket.
+    Upload data directly to storage.
 
     Args:
         data: The data to upload (string or bytes)
-        object_name: S3 object name
+        object_name: Object name
+        content_type: Content-Type recorded with the object
+        content_encoding: Content-Encoding recorded with the object
 
     Returns:
         True if successful, False otherwise
     """
+    backend = get_backend()
     try:
         # Convert string to bytes if needed
         if isinstance(data, str):
             data = data.encode("utf-8")
 
-        S3_CLIENT.put_object(Body=data, Bucket=S3_BUCKET, Key=object_name)
-        logger.info(f"Successfully uploaded data to {S3_BUCKET}/{object_name}")
+        etag = backend.put(object_name, data, content_type=content_type, content_encoding=content_encoding)
+        logger.info(f"Successfully uploaded data to {backend.describe(object_name)}")
+
+        cache = _cache_for(backend)
+        if cache is not None:
+            if caches_writes():
+                cache.put(object_name, data, etag=etag, content_encoding=content_encoding)
+            else:
+                # Drop the old copy, a fresh entry would otherwise be served within the TTL
+                cache.delete(object_name)
         return True
-    except ClientError as e:
-        logger.error(f"Error uploading data to S3: {e}")
+    except StorageError as e:
+        logger.error(f"Error uploading data to storage: {e}")
         return False
 
 
-def store_dict(data: dict, object_name: str) -> bool:
+def encode_dict(data: dict, codec: Optional[str] = None) -> bytes:
+    """
+    Serialize a dictionary the way store_dict stores it: JSON compressed with
+    the given codec, or the one configured by STORAGE_CODEC (default gzip).
+    """
+    return get_codec(codec).compress(json.dumps(data).encode("utf-8"))
+
+
+def store_dict(data: dict, object_name: str, codec: Optional[str] = None) -> bool:
     """
-    Upload a dictionary as a JSON object to an S3 bucket.
+    Upload a dictionary as a compressed JSON object to storage.
 
     Args:
         data: The dictionary to upload
-        object_name: S3 object name
+        object_name: Object name
+        codec: gzip, zstd or identity, defaults to STORAGE_CODEC or gzip
     Returns:
         True if successful, False otherwise
     """
     try:
-        json_data = json.dumps(data)
-        compressed_data = gzip.compress(json_data.encode("utf-8"))
-        return store_object(compressed_data, object_name)
+        payload_codec = get_codec(codec)
+        return store_object(
+            encode_dict(data, codec),
+            object_name,
+            content_type="application/json",
+            content_encoding=payload_codec.content_encoding,
+        )
     except Exception as e:
-        logger.error(f"Error uploading dictionary to S3: {e}")
+        logger.error(f"Error uploading dictionary to storage: {e}")
         return False
 
 
 def read_object(object_name: str) -> Optional[bytes]:
     """
-    Read data from an S3 object.
+    Read data from storage through the local cache.
+
+    A cached copy is revalidated with a conditional GET and only downloaded
+    again if the object changed. With STORAGE_OFFLINE set, only the cache is
+    read.
 
     Args:
-        object_name: S3 object name
+        object_name: Object name
 
     Returns:
         Object data as bytes or None if failed
     """
+    result = _read(object_name)
+    return result[0] if result is not None else None
+
+
+def _read(object_name: str) -> Optional[Tuple[bytes, Optional[str]]]:
+    """Read an object through the cache, returning its data and Content-Encoding."""
+    backend = get_backend()
+    cache = _cache_for(backend)
+    cached = cache.get(object_name) if cache is not None else None
+
+    if is_offline() and backend.remote:
+        if cached is None:
+            logger.error(f"Object {object_name} is not cached and storage is offline")
+            return None
+        return cached[0], cached[1].get("content_encoding")
+
+    # Entries validated within STORAGE_CACHE_TTL seconds are used as is
+    ttl = float(os.environ.get("STORAGE_CACHE_TTL", "0"))
+    if cached is not None and cache.is_fresh(cached[1], ttl):
+        return cached[0], cached[1].get("content_encoding")
+
+    try:
+        data, etag, content_encoding = backend.get(
+            object_name, if_none_match=cached[1].get("etag") if cached else None
+        )
+        logger.info(f"Successfully read object {backend.describe(object_name)}")
+        if cache is not None:
+            cache.put(object_name, data, etag=etag, content_encoding=content_encoding)
+        return data, content_encoding
+    except NotModified:
+        cache.touch(object_name, revalidated=True)
+        return cached[0], cached[1].get("content_encoding")
+    except StorageError as e:
+        logger.error(f"Error reading object from storage: {e}")
+        return None
+
+
+def read_object_range(object_name: str, start: int, end: int) -> Optional[bytes]:
+    """
+    Read a byte range of an object with a ranged GET.
+
+    Args:
+        object_name: Object name
+        start: Offset of the first byte
+        end: Offset of the last byte, inclusive
+
+    Returns:
+        The requested bytes or None if failed
+    """
+    try:
+        return get_backend().get_range(object_name, start, end)
+    except StorageError as e:
+        logger.error(f"Error reading range of object from storage: {e}")
+        return None
+
+
+def open_object(object_name: str, start: int = 0, end: Optional[int] = None) -> Optional[BinaryIO]:
+    """
+    Open an object as a read-only stream, so it can be processed while it
+    downloads without holding it in memory.
+
+    A cached copy is read from disk when storage is offline or it was
+    validated within STORAGE_CACHE_TTL seconds; otherwise the object is
+    streamed from the backend and, being possibly large, not added to the cache.
+
+    Args:
+        object_name: Object name
+        start: Offset of the first byte
+        end: Offset of the last byte, inclusive, None for the end of the object
+
+    Returns:
+        Stream with etag and content_encoding attributes, or None if failed
+    """
+    backend = get_backend()
+    cache = _cache_for(backend)
+    ttl = float(os.environ.get("STORAGE_CACHE_TTL", "0"))
+    if cache is not None and (is_offline() or ttl > 0):
+        cached = cache.open(object_name)
+        if cached is not None and (is_offline() or cache.is_fresh(cached[1], ttl)):
+            handle, meta = cached
+            handle.seek(start)
+            length = None if end is None else max(end - start + 1, 0)
+            return ObjectStream(handle, length, etag=meta.get("etag"), content_encoding=meta.get("content_encoding"))
+        if cached is not None:
+            cached[0].close()
+        if is_offline():
+            logger.error(f"Object {object_name} is not cached and storage is offline")
+            return None
+
+    try:
+        return backend.open(object_name, start, end)
+    except StorageError as e:
+        logger.error(f"Error opening object in storage: {e}")
+        return None
+
+
+def iter_object(
+    object_name: str, chunk_size: int = 1 << 20, start: int = 0, end: Optional[int] = None
+) -> Iterator[bytes]:
+    """
+    Iterate over the content of an object in chunks of up to chunk_size bytes.
+
+    Args:
+        object_name: Object name
+        chunk_size: Maximum size of each chunk
+        start: Offset of the first byte
+        end: Offset of the last byte, inclusive, None for the end of the object
+
+    Raises:
+        IOError: If the object cannot be opened
+    """
+    stream = open_object(object_name, start, end)
+    if stream is None:
+        raise IOError(f"Could not open object {object_name}")
+    with stream:
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def get_object_size(object_name: str) -> Optional[int]:
+    """
+    Return the size of an object in bytes, or None if it does not exist.
+    """
     try:
-        response = S3_CLIENT.get_object(Bucket=S3_BUCKET, Key=object_name)
-        data = response["Body"].read()
-        logger.info(f"Successfully read object {S3_BUCKET}/{object_name}")
-        return data
-    except ClientError as e:
-        logger.error(f"Error reading object from S3: {e}")
+        return get_backend().head(object_name)["size"]
+    except StorageError as e:
+        logger.error(f"Error reading object metadata from storage: {e}")
         return None
 
 
 def read_dict(object_name: str) -> Optional[dict]:
     """
-    Read a JSON object from an S3 bucket and decompress it.
+    Read a JSON object from storage and decompress it. The codec is taken
+    from the recorded Content-Encoding, or detected from the data.
+
+    Backends behind the read cache, S3 by default, are read whole through
+    the cache to keep its conditional GETs. Only the other backends are
+    decompressed as the object streams in, which avoids holding the
+    compressed bytes; the decoded JSON is always read whole.
 
     Args:
-        object_name: S3 object name
+        object_name: Object name
 
     Returns:
         Dictionary if successful, None otherwise
     """
     try:
-        compressed_data = read_object(object_name)
-        if compressed_data:
-            json_data = gzip.decompress(compressed_data)
-            return json.loads(json_data.decode("utf-8"))
-        return None
+        if _cache_for(get_backend()) is not None:
+            result = _read(object_name)
+            if not result or not result[0]:
+                return None
+            stream = ObjectStream(io.BytesIO(result[0]), content_encoding=result[1])
+        else:
+            stream = open_object(object_name)
+            if stream is None:
+                return None
+        with stream, decode_stream(stream, stream.content_encoding) as decoded:
+            return json.load(decoded)
     except Exception as e:
-        logger.error(f"Error reading dictionary from S3: {e}")
+        logger.error(f"Error reading dictionary from storage: {e}")
         return None
 
 
 def list_objects(prefix: str = "") -> list:
     """
-    List objects in an S3 bucket with optional prefix, handling pagination
+    List objects in storage with optional prefix, handling pagination
     for more than 1000 objects.
 
     Args:
@@ -124,58 +333,69 @@ def list_objects(prefix: str = "") -> list:
     Returns:
         List of object keys
     """
-    try:
-        all_keys = []
-        paginator = S3_CLIENT.get_paginator("list_objects_v2")
-        page_iterator = paginator.paginate(Bucket=S3_BUCKET, Prefix=prefix)
+    return list(list_object_info(prefix))
 
-        for page in page_iterator:
-            if "Contents" in page:
-                all_keys.extend([obj["Key"] for obj in page["Contents"]])
 
-        return all_keys
-    except ClientError as e:
-        logger.error(f"Error listing objects in S3: {e}")
-        return []
+def list_object_info(prefix: str = "") -> Dict[str, dict]:
+    """
+    List objects in storage with their size and ETag.
+
+    Args:
+        prefix: Object key prefix
+
+    Returns:
+        Dictionary mapping each object key to {"size": int, "etag": str}
+    """
+    try:
+        return get_backend().list(prefix)
+    except StorageError as e:
+        logger.error(f"Error listing objects in storage: {e}")
+        return {}
 
 
 def check_object_exists(object_name: str) -> bool:
     """
-    Check if an object exists in an S3 bucket.
+    Check if an object exists in storage.
 
     Args:
-        object_name: S3 object name
+        object_name: Object name
 
     Returns:
         True if object exists, False otherwise
     """
     try:
-        S3_CLIENT.head_object(Bucket=S3_BUCKET, Key=object_name)
-        return True
-    except ClientError:
+        return get_backend().exists(object_name)
+    except StorageError:
         return False
 
 
 def delete_object(object_name: str) -> bool:
     """
-    Delete an object from an S3 bucket.
+    Delete an object from storage.
 
     Args:
-        object_name: S3 object name
+        object_name: Object name
 
     Returns:
         True if successful, False otherwise
     """
+    backend = get_backend()
     try:
-        S3_CLIENT.delete_object(Bucket=S3_BUCKET, Key=object_name)
-        logger.info(f"Successfully deleted {S3_BUCKET}/{object_name}")
+        backend.delete(object_name)
+        logger.info(f"Successfully deleted {backend.describe(object_name)}")
+        cache = _cache_for(backend)
+        if cache is not None:
+            cache.delete(object_name)
         return True
-    except ClientError as e:
-        logger.error(f"Error deleting object from S3: {e}")
+    except StorageError as e:
+        logger.error(f"Error deleting object from storage: {e}")
         return False
 
 
 if __name__ == "__main__":
+    from env import load_env
+
+    load_env()
     store_dict({"foo": "bar"}, "test/hello.txt")
     print(read_dict("test/hello.txt"))
     delete_object("test/hello.txt")
@@ -0,0 +1,507 @@
+"""
+Object storage backends behind the storage module.
+
+The backend is chosen with STORAGE_BACKEND:
+    s3      S3 bucket from S3_BUCKET, credentials from S3_ACCESS/S3_SECRET (default)
+    local   Directory from STORAGE_ROOT (default .storage in the project root)
+    memory  In-process dictionary, for tests and benchmarks
+
+All backends share the semantics of S3: keys are flat strings, listing is
+sorted by key, ETags are the MD5 of the content for single-part objects and
+deleting a missing key is not an error. The Content-Type and Content-Encoding
+of an object are kept with it; the local backend stores them, with the
+ETag, in a sidecar file next to the content.
+"""
+
+import functools
+import hashlib
+import io
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Tuple
+
+
+class StorageError(Exception):
+    """A storage operation failed."""
+
+
+class ObjectNotFound(StorageError, KeyError):
+    """The requested object does not exist."""
+
+    def __str__(self):
+        return f"Object {self.args[0]} does not exist"
+
+
+class NotModified(StorageError):
+    """A conditional read found the object unchanged."""
+
+
+def _md5(data: bytes) -> str:
+    return hashlib.md5(data).hexdigest()
+
+
+class _StreamReader(io.RawIOBase):
+    """Raw stream over anything with read(size), optionally cut off after length bytes."""
+
+    def __init__(self, source, length: Optional[int] = None):
+        self._source = source
+        self._remaining = length
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = len(buffer) if self._remaining is None else min(len(buffer), self._remaining)
+        if size <= 0:
+            return 0
+        data = self._source.read(size)
+        buffer[:len(data)] = data
+        if self._remaining is not None:
+            self._remaining -= len(data)
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self._source.close()
+        super().close()
+
+
+class ObjectStream(io.BufferedReader):
+    """
+    Buffered, read-only stream of an object's content, as returned by
+    StorageBackend.open. Only the buffer is held in memory.
+    """
+
+    def __init__(
+        self,
+        source,
+        length: Optional[int] = None,
+        etag: Optional[str] = None,
+        content_encoding: Optional[str] = None,
+        buffer_size: int = 1 << 20,
+    ):
+        """
+        Args:
+            source: Object with read(size) and close(), e.g. a file or a boto3 StreamingBody
+            length: Number of bytes to read from source, None for all
+            etag: ETag of the object
+            content_encoding: Content-Encoding of the object, None if unknown
+        """
+        super().__init__(_StreamReader(source, length), buffer_size)
+        self.etag = etag
+        self.content_encoding = content_encoding
+
+
+class StorageBackend(ABC):
+    """Interface of an object store."""
+
+    # Whether reads go over the network and are worth caching locally
+    remote = False
+
+    @abstractmethod
+    def put(
+        self,
+        key: str,
+        data: bytes,
+        content_type: Optional[str] = None,
+        content_encoding: Optional[str] = None,
+    ) -> str:
+        """Store an object with optional Content-Type and Content-Encoding, and return its ETag."""
+
+    @abstractmethod
+    def get(self, key: str, if_none_match: Optional[str] = None) -> Tuple[bytes, str, Optional[str]]:
+        """
+        Read an object.
+
+        Args:
+            key: Object key
+            if_none_match: ETag of a cached copy; NotModified is raised if it is current
+
+        Returns:
+            Content, ETag and Content-Encoding (None if unknown) of the object
+
+        Raises:
+            ObjectNotFound: If the object does not exist
+            NotModified: If the object's ETag equals if_none_match
+        """
+
+    @abstractmethod
+    def get_range(self, key: str, start: int, end: int) -> bytes:
+        """Read bytes start to end (inclusive) of an object."""
+
+    @abstractmethod
+    def open(self, key: str, start: int = 0, end: Optional[int] = None) -> ObjectStream:
+        """
+        Open an object for streaming reads.
+
+        Args:
+            key: Object key
+            start: Offset of the first byte
+            end: Offset of the last byte, inclusive, None for the end of the object
+
+        Raises:
+            ObjectNotFound: If the object does not exist
+        """
+
+    @abstractmethod
+    def head(self, key: str) -> dict:
+        """Return {"size": int, "etag": str} of an object, raising ObjectNotFound if missing."""
+
+    @abstractmethod
+    def list(self, prefix: str = "") -> Dict[str, dict]:
+        """Return {"size", "etag"} of every object under a prefix, sorted by key."""
+
+    @abstractmethod
+    def delete(self, key: str):
+        """Delete an object; deleting a missing object succeeds."""
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.head(key)
+            return True
+        except ObjectNotFound:
+            return False
+
+    def describe(self, key: str) -> str:
+        """Location of an object for log messages."""
+        return key
+
+
+@functools.lru_cache(maxsize=None)
+def get_s3_client():
+    """
+    Initialize and return an S3 client using environment variables for authentication.
+
+    The client is created on first use and shared afterwards, so importing
+    this module does not need boto3 or credentials.
+    """
+    import boto3
+    from botocore.config import Config
+
+    return boto3.client(
+        "s3",
+        aws_access_key_id=os.environ.get("S3_ACCESS"),
+        aws_secret_access_key=os.environ.get("S3_SECRET"),
+        # Room for the concurrent transfers of the transfer engine
+        config=Config(max_pool_connections=int(os.environ.get("S3_MAX_POOL_CONNECTIONS", "32"))),
+    )
+
+
+def get_bucket() -> str:
+    """Return the configured bucket name, read from S3_BUCKET on each call."""
+    bucket = os.environ.get("S3_BUCKET")
+    if not bucket:
+        raise RuntimeError("S3_BUCKET environment variable is not set")
+    return bucket
+
+
+class S3Backend(StorageBackend):
+    remote = True
+
+    def __init__(self, bucket: Optional[str] = None, client=None):
+        """
+        Args:
+            bucket: Bucket name, defaults to S3_BUCKET
+            client: boto3 S3 client, defaults to the shared client
+        """
+        self._bucket = bucket
+        self._client = client
+
+    @property
+    def bucket(self) -> str:
+        return self._bucket or get_bucket()
+
+    @property
+    def client(self):
+        return self._client or get_s3_client()
+
+    def describe(self, key: str) -> str:
+        return f"{self.bucket}/{key}"
+
+    def _call(self, operation: str, key: str, **kwargs):
+        from botocore.exceptions import ClientError
+
+        try:
+            return getattr(self.client, operation)(Bucket=self.bucket, Key=key, **kwargs)
+        except ClientError as e:
+            error = e.response.get("Error", {})
+            status = e.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+            if error.get("Code") in ("304", "NotModified") or status == 304:
+                raise NotModified(key) from e
+            if error.get("Code") in ("404", "NoSuchKey", "NotFound") or status == 404:
+                raise ObjectNotFound(key) from e
+            raise StorageError(str(e)) from e
+
+    def put(
+        self,
+        key: str,
+        data: bytes,
+        content_type: Optional[str] = None,
+        content_encoding: Optional[str] = None,
+    ) -> str:
+        metadata = {}
+        if content_type:
+            metadata["ContentType"] = content_type
+        if content_encoding:
+            metadata["ContentEncoding"] = content_encoding
+        return self._call("put_object", key, Body=data, **metadata)["ETag"].strip('"')
+
+    def get(self, key: str, if_none_match: Optional[str] = None) -> Tuple[bytes, str, Optional[str]]:
+        conditions = {"IfNoneMatch": f'"{if_none_match.strip(chr(34))}"'} if if_none_match else {}
+        response = self._call("get_object", key, **conditions)
+        return response["Body"].read(), response["ETag"].strip('"'), response.get("ContentEncoding")
+
+    def get_range(self, key: str, start: int, end: int) -> bytes:
+        return self._call("get_object", key, Range=f"bytes={start}-{end}")["Body"].read()
+
+    def open(self, key: str, start: int = 0, end: Optional[int] = None) -> ObjectStream:
+        conditions = {}
+        if start or end is not None:
+            conditions["Range"] = f"bytes={start}-{'' if end is None else end}"
+        response = self._call("get_object", key, **conditions)
+        return ObjectStream(
+            response["Body"], etag=response["ETag"].strip('"'), content_encoding=response.get("ContentEncoding")
+        )
+
+    def head(self, key: str) -> dict:
+        response = self._call("head_object", key)
+        return {"size": response["ContentLength"], "etag": response["ETag"].strip('"')}
+
+    def list(self, prefix: str = "") -> Dict[str, dict]:
+        from botocore.exceptions import ClientError
+
+        info = {}
+        try:
+            paginator = self.client.get_paginator("list_objects_v2")
+            for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+                for obj in page.get("Contents", []):
+                    info[obj["Key"]] = {"size": obj["Size"], "etag": obj["ETag"].strip('"')}
+        except ClientError as e:
+            raise StorageError(str(e)) from e
+        return info
+
+    def delete(self, key: str):
+        self._call("delete_object", key)
+
+
+class LocalBackend(StorageBackend):
+    """
+    Objects stored as files below a root directory, the key being the relative path.
+
+    The ETag, Content-Type and Content-Encoding of every object are kept in a
+    JSON sidecar below META_DIR, so listing does not read the content. Files
+    placed in the root by other means get their sidecar, from a hash of the
+    content, the first time they are looked at.
+    """
+
+    # Sidecars and in-progress writes, outside of the key space
+    META_DIR = ".storage-meta"
+
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        os.makedirs(os.path.join(self.root, self.META_DIR), exist_ok=True)
+
+    def describe(self, key: str) -> str:
+        return self._path(key)
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise StorageError(f"Key {key!r} points outside of {self.root}")
+        if os.path.relpath(path, self.root).split(os.sep, 1)[0] == self.META_DIR:
+            raise StorageError(f"Key {key!r} is reserved for metadata")
+        return path
+
+    def _meta_path(self, key: str) -> str:
+        return os.path.join(self.root, self.META_DIR, f"{key}.json")
+
+    def _write(self, path: str, content: bytes):
+        # Written under META_DIR first, so listings never see a partial file
+        tmp_path = os.path.join(self.root, self.META_DIR, f"{threading.get_ident()}-{os.urandom(4).hex()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(tmp_path, path)
+
+    def _stat(self, key: str) -> Tuple[str, os.stat_result]:
+        path = self._path(key)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError as e:
+            raise ObjectNotFound(key) from e
+        if not os.path.isfile(path):
+            raise ObjectNotFound(key)
+        return path, stat
+
+    def _meta(self, key: str, path: str, stat: os.stat_result) -> dict:
+        """Sidecar metadata of an object, recreated from its content if missing or stale."""
+        try:
+            with open(self._meta_path(key), "r") as f:
+                meta = json.load(f)
+            if meta["size"] == stat.st_size and meta["mtime_ns"] == stat.st_mtime_ns:
+                return meta
+        except (OSError, ValueError, KeyError):
+            pass
+        with open(path, "rb") as f:
+            meta = {"etag": _md5(f.read()), "content_type": None, "content_encoding": None}
+        return self._write_meta(key, stat, meta)
+
+    def _write_meta(self, key: str, stat: os.stat_result, meta: dict) -> dict:
+        meta = dict(meta, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+        try:
+            self._write(self._meta_path(key), json.dumps(meta).encode("utf-8"))
+        except OSError:
+            # Without a sidecar the next read hashes the content again
+            pass
+        return meta
+
+    def put(
+        self,
+        key: str,
+        data: bytes,
+        content_type: Optional[str] = None,
+        content_encoding: Optional[str] = None,
+    ) -> str:
+        path = self._path(key)
+        etag = _md5(data)
+        try:
+            self._write(path, data)
+            meta = {"etag": etag, "content_type": content_type, "content_encoding": content_encoding}
+            self._write_meta(key, os.stat(path), meta)
+        except OSError as e:
+            raise StorageError(str(e)) from e
+        return etag
+
+    def get(self, key: str, if_none_match: Optional[str] = None) -> Tuple[bytes, str, Optional[str]]:
+        path, stat = self._stat(key)
+        meta = self._meta(key, path, stat)
+        if if_none_match and meta["etag"] == if_none_match.strip('"'):
+            raise NotModified(key)
+        with open(path, "rb") as f:
+            data = f.read()
+        return data, meta["etag"], meta["content_encoding"]
+
+    def get_range(self, key: str, start: int, end: int) -> bytes:
+        path, _ = self._stat(key)
+        with open(path, "rb") as f:
+            f.seek(start)
+            return f.read(end - start + 1)
+
+    def open(self, key: str, start: int = 0, end: Optional[int] = None) -> ObjectStream:
+        path, stat = self._stat(key)
+        meta = self._meta(key, path, stat)
+        handle = open(path, "rb")
+        handle.seek(start)
+        return ObjectStream(
+            handle,
+            None if end is None else max(end - start + 1, 0),
+            etag=meta["etag"],
+            content_encoding=meta["content_encoding"],
+        )
+
+    def head(self, key: str) -> dict:
+        path, stat = self._stat(key)
+        return {"size": stat.st_size, "etag": self._meta(key, path, stat)["etag"]}
+
+    def list(self, prefix: str = "") -> Dict[str, dict]:
+        keys = []
+        for directory, dirs, files in os.walk(self.root):
+            if directory == self.root:
+                dirs[:] = [d for d in dirs if d != self.META_DIR]
+            for name in files:
+                key = os.path.relpath(os.path.join(directory, name), self.root).replace(os.sep, "/")
+                if key.startswith(prefix):
+                    keys.append(key)
+        info = {}
+        for key in sorted(keys):
+            try:
+                info[key] = self.head(key)
+            except ObjectNotFound:
+                # Deleted while listing
+                continue
+        return info
+
+    def delete(self, key: str):
+        for path in (self._path(key), self._meta_path(key)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                raise StorageError(str(e)) from e
+
+
+class MemoryBackend(StorageBackend):
+    """Objects kept in a dictionary of this process."""
+
+    def __init__(self):
+        self.objects: Dict[str, bytes] = {}
+        self.encodings: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+
+    def _read(self, key: str) -> bytes:
+        with self._lock:
+            try:
+                return self.objects[key]
+            except KeyError:
+                raise ObjectNotFound(key) from None
+
+    def put(
+        self,
+        key: str,
+        data: bytes,
+        content_type: Optional[str] = None,
+        content_encoding: Optional[str] = None,
+    ) -> str:
+        with self._lock:
+            self.objects[key] = bytes(data)
+            self.encodings[key] = content_encoding
+        return _md5(data)
+
+    def get(self, key: str, if_none_match: Optional[str] = None) -> Tuple[bytes, str, Optional[str]]:
+        data = self._read(key)
+        etag = _md5(data)
+        if if_none_match and etag == if_none_match.strip('"'):
+            raise NotModified(key)
+        return data, etag, self.encodings.get(key)
+
+    def get_range(self, key: str, start: int, end: int) -> bytes:
+        return self._read(key)[start:end + 1]
+
+    def open(self, key: str, start: int = 0, end: Optional[int] = None) -> ObjectStream:
+        data = self._read(key)
+        buffer = io.BytesIO(data)
+        buffer.seek(start)
+        length = None if end is None else max(end - start + 1, 0)
+        return ObjectStream(buffer, length, etag=_md5(data), content_encoding=self.encodings.get(key))
+
+    def head(self, key: str) -> dict:
+        data = self._read(key)
+        return {"size": len(data), "etag": _md5(data)}
+
+    def list(self, prefix: str = "") -> Dict[str, dict]:
+        with self._lock:
+            items = sorted((k, v) for k, v in self.objects.items() if k.startswith(prefix))
+        return {key: {"size": len(data), "etag": _md5(data)} for key, data in items}
+
+    def delete(self, key: str):
+        with self._lock:
+            self.objects.pop(key, None)
+            self.encodings.pop(key, None)
+
+
+def create_backend(backend_type: Optional[str] = None) -> StorageBackend:
+    """Create the backend named by backend_type or STORAGE_BACKEND."""
+    backend_type = (backend_type or os.environ.get("STORAGE_BACKEND") or "s3").lower()
+    if backend_type == "s3":
+        return S3Backend()
+    elif backend_type == "local":
+        from env import PROJECT_ROOT
+
+        return LocalBackend(os.environ.get("STORAGE_ROOT") or str(PROJECT_ROOT / ".storage"))
+    elif backend_type == "memory":
+        return MemoryBackend()
+    else:
+        raise ValueError(f"Unsupported storage backend: {backend_type}")
@@ -0,0 +1,170 @@
+"""Disk-backed, size-bounded LRU cache of storage objects."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import BinaryIO, Optional, Tuple
+
+
+class ObjectCache:
+    """
+    Cache of object contents on local disk, keyed by object name.
+
+    Every entry keeps the ETag of the object, so it can be revalidated with
+    a conditional GET, and its Content-Encoding. Reads touch the entry's
+    mtime, and when the cache grows beyond max_bytes the least recently used
+    entries are evicted.
+    """
+
+    def __init__(self, root: str, max_bytes: int = 1 << 30):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+        os.makedirs(root, exist_ok=True)
+
+    def _paths(self, object_name: str) -> Tuple[str, str]:
+        digest = hashlib.md5(object_name.encode("utf-8")).hexdigest()
+        base = os.path.join(self.root, digest[:2], digest)
+        return f"{base}.data", f"{base}.meta"
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get(self, object_name: str) -> Optional[Tuple[bytes, dict]]:
+        """Return the cached content and metadata of an object, or None."""
+        data_path, meta_path = self._paths(object_name)
+        try:
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            with open(data_path, "rb") as f:
+                data = f.read()
+        except (OSError, ValueError):
+            self._count(hit=False)
+            return None
+        if meta.get("key") != object_name or meta.get("size") != len(data):
+            self._count(hit=False)
+            return None
+        self._count(hit=True)
+        self.touch(object_name)
+        return data, meta
+
+    def open(self, object_name: str) -> Optional[Tuple[BinaryIO, dict]]:
+        """Open the cached content of an object for reading, returning the file and metadata, or None."""
+        data_path, meta_path = self._paths(object_name)
+        try:
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            handle = open(data_path, "rb")
+        except (OSError, ValueError):
+            self._count(hit=False)
+            return None
+        if meta.get("key") != object_name or meta.get("size") != os.fstat(handle.fileno()).st_size:
+            handle.close()
+            self._count(hit=False)
+            return None
+        self._count(hit=True)
+        self.touch(object_name)
+        return handle, meta
+
+    def is_fresh(self, meta: dict, ttl: float) -> bool:
+        """Check if an entry was validated within the last ttl seconds."""
+        return ttl > 0 and time.time() - meta.get("validated_at", 0) < ttl
+
+    def touch(self, object_name: str, revalidated: bool = False):
+        """Mark an entry as recently used, and optionally as just revalidated."""
+        data_path, meta_path = self._paths(object_name)
+        try:
+            os.utime(data_path)
+            if revalidated:
+                with open(meta_path, "r") as f:
+                    meta = json.load(f)
+                meta["validated_at"] = time.time()
+                self._write(meta_path, json.dumps(meta).encode("utf-8"))
+        except (OSError, ValueError):
+            pass
+
+    def put(
+        self,
+        object_name: str,
+        data: bytes,
+        etag: Optional[str] = None,
+        content_encoding: Optional[str] = None,
+    ):
+        """Store an object in the cache, evicting old entries if needed."""
+        if len(data) > self.max_bytes:
+            return
+        data_path, meta_path = self._paths(object_name)
+        os.makedirs(os.path.dirname(data_path), exist_ok=True)
+        previous_size = os.path.getsize(data_path) if os.path.exists(data_path) else 0
+        meta = {
+            "key": object_name,
+            "etag": etag,
+            "content_encoding": content_encoding,
+            "size": len(data),
+            "validated_at": time.time(),
+        }
+        self._write(data_path, data)
+        self._write(meta_path, json.dumps(meta).encode("utf-8"))
+
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes += len(data) - previous_size
+        self._evict()
+
+    def delete(self, object_name: str):
+        for path in self._paths(object_name):
+            try:
+                size = os.path.getsize(path) if path.endswith(".data") else 0
+                os.remove(path)
+            except OSError:
+                continue
+            with self._lock:
+                if self._total_bytes is not None:
+                    self._total_bytes -= size
+
+    def _write(self, path: str, content: bytes):
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+    def _scan(self) -> list:
+        entries = []
+        for directory, _, files in os.walk(self.root):
+            for name in files:
+                if name.endswith(".data"):
+                    path = os.path.join(directory, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self):
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._scan())
+            if self._total_bytes <= self.max_bytes:
+                return
+            # Drop least recently used entries down to 90% of the budget
+            entries = sorted(self._scan())
+            self._total_bytes = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if self._total_bytes <= 0.9 * self.max_bytes:
+                    break
+                for stale in (path, path[: -len(".data")] + ".meta"):
+                    try:
+                        os.remove(stale)
+                    except OSError:
+                        pass
+                self._total_bytes -= size
@@ -1,14 +1,13 @@
 import os
 import random
+from collections import deque
 from pathlib import Path
-from dotenv import load_dotenv
+from typing import Optional
 
-PROJECT_ROOT = Path(__file__).parent.parent.absolute()
-
-# Load .env file from project root
-print(f"Env path: {os.path.join(PROJECT_ROOT, '.env')}")
-load_dotenv(os.path.join(PROJECT_ROOT, '.env'))
 import storage
+from evaluation_metrics import EvaluationMetrics
+from transfer import TransferEngine
+from env import PROJECT_ROOT, load_env
 
 
 FOLDER = f"{os.path.dirname(__file__)}/../train/"
@@ -18,17 +17,28 @@ random.seed(42)  # Set seed for reproducibility
 
 class TrainIterator:
 
-    def __init__(self, limit=None, minkey=None, maxkey=None):
-        self.paths = [os.path.join(FOLDER, x, "0", y) \
+    def __init__(self, limit=None, minkey=None, maxkey=None, paths=None):
+        """
+        Args:
+            limit: Maximum number of clients
+            minkey: Smallest client id included
+            maxkey: Client ids from this value on are excluded
+            paths: Client paths to iterate in this order, instead of the
+                shuffled clients of the train folder
+        """
+        if paths is None:
+            paths = [os.path.join(FOLDER, x, "0", y) \
                         for x in "01" for y in os.listdir(os.path.join(FOLDER, x, "0")) \
                         if (maxkey is None or int(y) < maxkey)
                         and (minkey is None or int(y) >= minkey)]
-        random.shuffle(self.paths)
+            random.shuffle(paths)
+        self.paths = list(paths)
         self.current_index = 0
         self.predictions = []
         self.accuracy = None
         self.false_negatives = []
         self.false_positives = []
+        self.metrics = EvaluationMetrics()
         if limit is not None:
             self.paths = self.paths[:limit]
 
@@ -46,23 +56,102 @@ class TrainIterator:
             print(self)
             raise StopIteration
 
-    def predict(self, prediction: bool):
+    def predict(self, prediction: bool, rule: Optional[str] = None):
         """
         Store the prediction for the current item.
+
+        Args:
+            prediction: Whether the client is accepted
+            rule: Name of the flag that rejected the client, for per-rule attribution
         """
         assert isinstance(prediction, bool), "Prediction must be a boolean value."
         if self.current_index == 0:
             raise ValueError("No current item to predict for.")
         if len(self.predictions) >= self.current_index:
             raise ValueError("Prediction already stored.")
+        path = self.paths[len(self.predictions)]
         self.predictions.append(prediction)
+        self.metrics.update(prediction, path_label(path), path, rule)
 
     def __str__(self):
-        self.accuracy, self.false_positives, self.false_negatives = \
-            evaluate_predictions(self.paths[:len(self.predictions)], self.predictions)
+        self.accuracy = self.metrics.accuracy
+        self.false_positives = self.metrics.false_positives
+        self.false_negatives = self.metrics.false_negatives
         return f"Accuracy is {round(100*self.accuracy, 1):.1f}%"
 
 
+class PrefetchingTrainIterator(TrainIterator):
+    """
+    TrainIterator yielding parsed ClientData, with the ground-truth label set,
+    instead of directory paths.
+
+    Up to `prefetch` clients are parsed ahead on the worker pools of a
+    ClientDataLoader while the caller runs the model on the current one.
+    Clients come out in the order of self.paths, so predict() and the
+    accuracy bookkeeping work unchanged. A client that fails to parse raises
+    from __next__ like a synchronous load would.
+    """
+
+    def __init__(self, loader, prefetch=8, limit=None, minkey=None, maxkey=None):
+        """
+        Args:
+            loader: ClientDataLoader the clients are parsed with
+            prefetch: Number of clients parsed ahead of the current one
+            limit: Maximum number of clients
+            minkey: Smallest client id included
+            maxkey: Client ids from this value on are excluded
+        """
+        if prefetch < 1:
+            raise ValueError(f"Prefetch must be at least 1, got {prefetch}")
+        super().__init__(limit, minkey, maxkey)
+        self.loader = loader
+        self.prefetch = prefetch
+        self._pending = deque()
+        self._submitted = 0
+
+    def _fill(self):
+        from data_parsing.client_data_loader import DOCUMENT_FILES
+
+        while len(self._pending) < self.prefetch and self._submitted < len(self.paths):
+            path = self.paths[self._submitted]
+            sources = {document: os.path.join(path, file_name) for document, file_name in DOCUMENT_FILES.items()}
+            self._pending.append(self.loader.submit(os.path.basename(path), sources))
+            self._submitted += 1
+
+    def __next__(self):
+        if self.current_index >= len(self.paths):
+            self.close()
+            print(self)
+            raise StopIteration
+
+        self._fill()
+        future = self._pending.popleft()
+        path = self.paths[self.current_index]
+        self.current_index += 1
+        # Top the buffer up before blocking, so parsing continues while the caller works
+        self._fill()
+
+        client_data = future.result()
+        client_data.label = int(path_label(path))
+        return client_data
+
+    @property
+    def current_path(self):
+        """Path of the client last returned by __next__."""
+        return self.paths[self.current_index - 1] if self.current_index else None
+
+    def close(self):
+        """Cancel the clients parsed ahead, e.g. when stopping early."""
+        while self._pending:
+            self._pending.popleft().cancel()
+
+
+def path_label(path: str) -> bool:
+    """Ground truth of a client directory, read from its <label>/0/<client id> path."""
+    # Split on either \ or / depending on the path format
+    return {"0": False, "1": True}[path.replace('\\', '/').split('/')[-3]]
+
+
 def load_files(directory: str) -> dict:
     """
     Load files from the specified folder and return a dict of file paths.
@@ -87,84 +176,46 @@ def evaluate_predictions(paths: list[str], predictions: list[bool]) -> tuple[flo
     if len(paths) != len(predictions):
         raise ValueError(f"Groundtruth and predictions must have the same length: {len(paths)} vs {len(predictions)}")
 
-    false_negatives = []
-    false_positives = []
-    true_count = 0
+    metrics = EvaluationMetrics()
     for path, prediction in zip(paths, predictions):
-        # Split on either \ or / depending on the path format
-        path_parts = path.replace('\\', '/').split('/')
-        gt = {"0": False, "1": True}[path_parts[-3]]
-        if gt == prediction:
-            true_count += 1
-        else:
-            if gt:
-                false_negatives.append(path)
-            else:
-                false_positives.append(path)
-    return true_count / len(predictions), false_positives, false_negatives
+        metrics.update(prediction, path_label(path), path)
+    return metrics.accuracy, metrics.false_positives, metrics.false_negatives
 
 
-def upload_dataset(prefix="train/"):
+def upload_dataset(prefix="train/", workers=16):
     """
     Upload the dataset to S3, recursively traversing all subdirectories.
+    Files already stored with the same content are skipped.
+    Args:
+        prefix: Storage prefix to upload to (default: 'train/')
+        workers: Number of concurrent uploads
+    Returns:
+        Number of uploaded files
     """
-    uploaded_files = 0
-    for root, dirs, files in os.walk(FOLDER):
-        for file in files:
-            file_path = os.path.join(root, file)
-            relative_path = os.path.relpath(file_path, FOLDER)
-
-            # Read and upload file using the storage module
-            with open(file_path, 'rb') as handle:
-                storage.store_object(handle.read(), f"{prefix}{relative_path}")
-
-            uploaded_files += 1
-            if uploaded_files % 100 == 0:
-                print(f"Uploaded {uploaded_files} files to storage")
-
-    print(f"Uploaded {uploaded_files} files to storage")
-    return uploaded_files
+    engine = TransferEngine(workers, manifest_path=os.path.join(FOLDER, ".upload_manifest.json"))
+    return engine.upload(FOLDER, prefix).transferred
 
 
-def download_dataset(prefix="train/"):
+def download_dataset(prefix="train/", workers=16):
     """
     Download the dataset from S3, preserving directory structure.
+    Files that are already present with the same content are skipped, and
+    an interrupted download resumes from the manifest in the train folder.
     Args:
         prefix: Storage prefix where files were uploaded (default: 'train/')
+        workers: Number of concurrent downloads
     Returns:
-        Number of downloaded files
+        Number of files in the dataset
     """
-    downloaded_files = 0
-    # Get list of all objects in storage with the given prefix
-    objects = storage.list_objects(prefix=prefix)
-
-    for obj_key in objects:
-        # Calculate the local path where the file should be saved
-        relative_path = obj_key[len(prefix):]  # Remove prefix to get relative path
-        local_path = os.path.join(FOLDER, relative_path)
-        downloaded_files += 1
-
-        if os.path.exists(local_path):
-            continue
-
-        # Create directory structure if it doesn't exist
-        os.makedirs(os.path.dirname(local_path), exist_ok=True)
-
-        # Download the file from storage
-        content = storage.read_object(obj_key)
-
-        # Save the file locally
-        with open(local_path, 'wb') as handle:
-            handle.write(content)
-
-        if downloaded_files % 100 == 0:
-            print(f"Downloaded {downloaded_files} files from storage")
-
-    print(f"Downloaded {downloaded_files} files from storage")
-    return downloaded_files
+    os.makedirs(FOLDER, exist_ok=True)
+    engine = TransferEngine(workers, manifest_path=os.path.join(FOLDER, ".download_manifest.json"))
+    stats = engine.download(prefix, FOLDER)
+    return stats.transferred + stats.skipped
 
 
 if __name__ == "__main__":
+    load_env()
+
     # Download dataset only once
     # upload_dataset()
     download_dataset()
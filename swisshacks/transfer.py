@@ -0,0 +1,217 @@
+"""Concurrent, resumable transfers between a local directory and storage."""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+import storage
+
+
+def file_md5(path: str) -> str:
+    """MD5 of a file, which is the ETag S3 assigns to objects uploaded in one part."""
+    md5 = hashlib.md5()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+
+@dataclass
+class TransferStats:
+    total: int = 0
+    transferred: int = 0
+    skipped: int = 0
+    failed: int = 0
+    bytes: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def done(self) -> int:
+        return self.transferred + self.skipped + self.failed
+
+    def __str__(self):
+        rate = self.bytes / self.elapsed / 1e6 if self.elapsed else 0.0
+        return (
+            f"{self.done}/{self.total} files ({self.transferred} transferred, {self.skipped} unchanged, "
+            f"{self.failed} failed), {self.bytes / 1e6:.1f} MB in {self.elapsed:.1f}s ({rate:.1f} MB/s)"
+        )
+
+
+class Manifest:
+    """
+    Record of transferred files, persisted as JSON so an interrupted sync
+    resumes where it stopped. Each entry holds the object's ETag and size and
+    the local file's mtime, which lets unchanged files be skipped without
+    hashing them.
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.entries: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._dirty = 0
+        if path and os.path.exists(path):
+            with open(path, "r") as f:
+                self.entries = json.load(f)
+
+    def matches(self, key: str, local_path: str, etag: Optional[str], size: int) -> bool:
+        entry = self.entries.get(key)
+        if entry is None or not os.path.exists(local_path):
+            return False
+        stat = os.stat(local_path)
+        return (
+            entry["size"] == size == stat.st_size
+            and entry["mtime"] == stat.st_mtime
+            and (etag is None or entry["etag"] == etag)
+        )
+
+    def record(self, key: str, local_path: str, etag: str, size: int):
+        with self._lock:
+            self.entries[key] = {"etag": etag, "size": size, "mtime": os.stat(local_path).st_mtime}
+            self._dirty += 1
+            if self._dirty >= 100:
+                self._save_locked()
+
+    def save(self):
+        with self._lock:
+            self._save_locked()
+
+    def _save_locked(self):
+        self._dirty = 0
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+
+
+def _unchanged(manifest: Manifest, key: str, local_path: str, etag: Optional[str], size: int) -> bool:
+    """Check if a local file equals the stored object, recording the match in the manifest."""
+    if manifest.matches(key, local_path, etag, size):
+        return True
+    if not os.path.exists(local_path) or os.path.getsize(local_path) != size:
+        return False
+    # Multipart ETags are not an MD5 of the content; trust the size match
+    if etag and "-" not in etag and file_md5(local_path) != etag:
+        return False
+    manifest.record(key, local_path, etag or file_md5(local_path), size)
+    return True
+
+
+class TransferEngine:
+    """
+    Download or upload many files with a bounded thread pool.
+
+    Files whose size and ETag match the other side are skipped, and a
+    manifest of completed transfers is saved as the sync progresses.
+    """
+
+    def __init__(self, workers: int = 16, manifest_path: Optional[str] = None, progress_interval: float = 2.0):
+        """
+        Args:
+            workers: Number of concurrent transfers
+            manifest_path: JSON file recording completed transfers, None to keep it in memory
+            progress_interval: Seconds between progress lines
+        """
+        self.workers = workers
+        self.manifest = Manifest(manifest_path)
+        self.progress_interval = progress_interval
+
+    def _run(self, tasks: list, transfer, verb: str) -> TransferStats:
+        stats = TransferStats(total=len(tasks))
+        started = time.perf_counter()
+        last_report = started
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                futures = [pool.submit(transfer, *task) for task in tasks]
+                for future in as_completed(futures):
+                    try:
+                        transferred_bytes = future.result()
+                    except Exception as e:
+                        print(f"{verb} failed: {e}")
+                        stats.failed += 1
+                    else:
+                        if transferred_bytes is None:
+                            stats.skipped += 1
+                        else:
+                            stats.transferred += 1
+                            stats.bytes += transferred_bytes
+
+                    now = time.perf_counter()
+                    if now - last_report >= self.progress_interval:
+                        stats.elapsed = now - started
+                        remaining = (stats.total - stats.done) * stats.elapsed / stats.done
+                        print(f"{verb}: {stats}, ETA {remaining:.0f}s")
+                        last_report = now
+        finally:
+            self.manifest.save()
+        stats.elapsed = time.perf_counter() - started
+        print(f"{verb}: {stats}")
+        return stats
+
+    def download(self, prefix: str, folder: str) -> TransferStats:
+        """
+        Download every object under a prefix into a folder, keeping the key
+        structure below the prefix.
+        """
+        objects = storage.list_object_info(prefix)
+        tasks = [
+            (key, os.path.join(folder, key[len(prefix):]), info["etag"], info["size"])
+            for key, info in objects.items()
+        ]
+        return self._run(tasks, self._download_one, "Downloaded")
+
+    def _download_one(self, key: str, local_path: str, etag: str, size: int) -> Optional[int]:
+        """Download one object, returning its size or None if the local copy is unchanged."""
+        if _unchanged(self.manifest, key, local_path, etag, size):
+            return None
+        stream = storage.open_object(key)
+        if stream is None:
+            raise RuntimeError(f"Could not read {key}")
+
+        os.makedirs(os.path.dirname(local_path), exist_ok=True)
+        # Hidden, so an interrupted download is never uploaded as data
+        tmp_path = os.path.join(os.path.dirname(local_path), f".{os.path.basename(local_path)}.part")
+        with stream, open(tmp_path, "wb") as handle:
+            shutil.copyfileobj(stream, handle, 1 << 20)
+            written = handle.tell()
+        os.replace(tmp_path, local_path)
+        self.manifest.record(key, local_path, etag, written)
+        return written
+
+    def upload(self, folder: str, prefix: str) -> TransferStats:
+        """
+        Upload every file below a folder to keys under a prefix, skipping
+        hidden files such as the manifests.
+        """
+        remote = storage.list_object_info(prefix)
+        tasks = []
+        for root, dirs, files in os.walk(folder):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            for file in files:
+                if file.startswith("."):
+                    continue
+                local_path = os.path.join(root, file)
+                key = prefix + os.path.relpath(local_path, folder).replace(os.sep, "/")
+                tasks.append((key, local_path, remote.get(key)))
+        return self._run(tasks, self._upload_one, "Uploaded")
+
+    def _upload_one(self, key: str, local_path: str, remote_info: Optional[dict]) -> Optional[int]:
+        """Upload one file, returning its size or None if the stored object is unchanged."""
+        if remote_info is not None and _unchanged(
+            self.manifest, key, local_path, remote_info["etag"], remote_info["size"]
+        ):
+            return None
+        with open(local_path, "rb") as handle:
+            content = handle.read()
+        if not storage.store_object(content, key):
+            raise RuntimeError(f"Could not store {key}")
+        self.manifest.record(key, local_path, hashlib.md5(content).hexdigest(), len(content))
+        return len(content)
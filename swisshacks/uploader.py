@@ -0,0 +1,177 @@
+"""Background upload queue keeping storage latency off the game loop."""
+
+import logging
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+from instrumentation import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of the queue for a worker
+_STOP = object()
+
+
+class LocalDirectoryStore:
+    """
+    Stand-in for storage.store_object that writes objects below a local
+    directory, for running the uploader without S3.
+    """
+
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+
+    def __call__(self, data: bytes, object_name: str) -> bool:
+        path = self.root / object_name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+        return True
+
+
+class BackgroundUploader:
+    """
+    Upload objects from worker threads fed by a bounded queue.
+
+    Each worker uploads one object at a time; storage has no batch upload,
+    so concurrency comes from the number of workers. When the queue is full,
+    submit blocks: back-pressure rather than unbounded memory growth if
+    storage falls behind. The time spent blocked is reported by stats().
+    """
+
+    def __init__(
+        self,
+        store: Optional[Callable[[bytes, str], bool]] = None,
+        max_queue: int = 256,
+        workers: int = 2,
+    ):
+        """
+        Args:
+            store: Function uploading (data, object_name) and returning success,
+                defaults to storage.store_object
+            max_queue: Number of pending uploads before submit blocks
+            workers: Number of upload threads
+        """
+        if store is None:
+            import storage
+
+            store = storage.store_object
+        self.store = store
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.submitted = 0
+        self.uploaded = 0
+        self.failed = 0
+        self.bytes_uploaded = 0
+        self.max_depth = 0
+        self.blocked_submits = 0
+        self.blocked_seconds = 0.0
+        self.failed_objects: List[str] = []
+
+        self._workers = [
+            threading.Thread(target=self._run, name=f"uploader-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, data: Union[bytes, Callable[[], bytes]], object_name: str):
+        """
+        Queue an upload, blocking while the queue is full.
+
+        Args:
+            data: Object content, or a function producing it on the worker thread
+            object_name: Storage object name
+        """
+        if self._closed:
+            raise RuntimeError("Uploader is closed")
+
+        item = (data, object_name)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            started = time.perf_counter()
+            self._queue.put(item)
+            with self._lock:
+                self.blocked_submits += 1
+                self.blocked_seconds += time.perf_counter() - started
+
+        with self._lock:
+            self.submitted += 1
+            self.max_depth = max(self.max_depth, self._queue.qsize())
+
+    def submit_dict(self, data: dict, object_name: str):
+        """Queue a dictionary to be stored like storage.store_dict, encoded on the worker."""
+        import storage
+
+        self.submit(lambda: storage.encode_dict(data), object_name)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                self._upload(*item)
+            finally:
+                self._queue.task_done()
+
+    def _upload(self, data, object_name: str):
+        started = time.perf_counter()
+        try:
+            if callable(data):
+                data = data()
+            ok = bool(self.store(data, object_name))
+        except Exception as e:
+            logger.error(f"Error uploading {object_name}: {e}")
+            ok = False
+        REGISTRY.observe("BackgroundUploader.upload", time.perf_counter() - started, error=not ok)
+
+        with self._lock:
+            if ok:
+                self.uploaded += 1
+                self.bytes_uploaded += len(data)
+            else:
+                self.failed += 1
+                self.failed_objects.append(object_name)
+
+    def flush(self):
+        """Block until every upload submitted so far has finished."""
+        self._queue.join()
+
+    def close(self):
+        """Drain the queue and stop the workers."""
+        if self._closed:
+            return
+        self._closed = True
+        for _ in self._workers:
+            self._queue.put(_STOP)
+        for worker in self._workers:
+            worker.join()
+
+    def stats(self) -> Dict[str, float]:
+        """Return upload counts and back-pressure metrics."""
+        with self._lock:
+            return {
+                "pending": self._queue.qsize(),
+                "submitted": self.submitted,
+                "uploaded": self.uploaded,
+                "failed": self.failed,
+                "bytes_uploaded": self.bytes_uploaded,
+                "max_queue_depth": self.max_depth,
+                "blocked_submits": self.blocked_submits,
+                "blocked_seconds": self.blocked_seconds,
+            }
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
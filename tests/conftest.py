@@ -0,0 +1,33 @@
+"""
+Unit tests of the swisshacks modules.
+
+Modules inside swisshacks import each other by bare name, so the package
+directory goes on the path next to the project root, as in the benchmarks.
+
+Usage:
+    python -m pytest tests
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent.absolute()
+sys.path[:0] = [str(ROOT / "swisshacks"), str(ROOT)]
+
+
+@pytest.fixture
+def memory_storage(monkeypatch):
+    """Route the storage module to an in-memory backend, without the read cache."""
+    import storage
+    from storage_backends import MemoryBackend
+
+    monkeypatch.setenv("STORAGE_CACHE_DIR", "")
+    monkeypatch.delenv("STORAGE_OFFLINE", raising=False)
+    storage.get_object_cache.cache_clear()
+    backend = MemoryBackend()
+    storage.set_backend(backend)
+    yield backend
+    storage.set_backend(None)
+    storage.get_object_cache.cache_clear()
@@ -0,0 +1,41 @@
+import pytest
+
+from model.edit_distance import OCR_CONFUSION_COSTS, bounded_levenshtein, bounded_levenshtein_many
+
+
+@pytest.mark.parametrize(
+    "source, target, expected",
+    [
+        ("", "", 0),
+        ("MUELLER", "MUELLER", 0),
+        ("MUELLER", "MULLER", 1),
+        ("MULLER", "MUELLER", 1),
+        ("SMITH", "SMYTH", 1),
+        ("ANNA", "ANAN", 2),
+    ],
+)
+def test_distance_within_bound(source, target, expected):
+    assert bounded_levenshtein(source, target, 2) == expected
+
+
+def test_distance_beyond_bound_is_capped():
+    assert bounded_levenshtein("KITTEN", "SITTING", 2) == 3
+    assert bounded_levenshtein("ABCDEF", "UVWXYZ", 1) == 2
+    assert bounded_levenshtein("", "ABCD", 2) == 3
+
+
+def test_zero_bound_only_matches_equal_strings():
+    assert bounded_levenshtein("ANNA", "ANNA", 0) == 0
+    assert bounded_levenshtein("ANNA", "ANNE", 0) == 1
+
+
+def test_ocr_confusion_costs():
+    assert bounded_levenshtein("L8989O2C3", "L898902C3", 1, OCR_CONFUSION_COSTS) == 0.5
+    assert bounded_levenshtein("L8989X2C3", "L898902C3", 1, OCR_CONFUSION_COSTS) == 1
+    # Costs apply in both directions
+    assert bounded_levenshtein("L898902C3", "L8989O2C3", 1, OCR_CONFUSION_COSTS) == 0.5
+
+
+def test_many_matches_single_calls():
+    pairs = [("MUELLER", "MULLER"), ("KITTEN", "SITTING"), ("", "")]
+    assert bounded_levenshtein_many(pairs, 2) == [bounded_levenshtein(a, b, 2) for a, b in pairs]
@@ -0,0 +1,165 @@
+import asyncio
+import time
+from concurrent.futures import Future
+
+import pytest
+import requests
+
+from swisshacks.game_client import GameClient
+from swisshacks.game_runner import GameRunner
+from swisshacks.local_game_server import LocalGameServer
+from swisshacks.rate_limit import RateLimiter
+
+
+@pytest.fixture
+def server():
+    with LocalGameServer([{"level": 0}, {"level": 1}, {"level": 2}], labels=[True, False, True]) as server:
+        yield server
+
+
+@pytest.fixture
+def client(server):
+    with GameClient(server.url, api_key=server.api_key, rate_limiter=RateLimiter(1000, per=1)) as client:
+        yield client
+
+
+def test_game_until_wrong_decision(client):
+    game = client.start_game()
+    assert game["client_data"] == {"level": 0}
+
+    response = client.send_decision(game["session_id"], game["client_id"], 1)
+    assert response["status"] == "active"
+    assert response["client_data"] == {"level": 1}
+
+    response = client.send_decision(game["session_id"], response["client_id"], 1)
+    assert response == {"status": "gameover", "score": 1}
+
+
+def test_game_until_out_of_clients(client):
+    game = client.start_game()
+    client_id = game["client_id"]
+    for decision in (1, 0):
+        response = client.send_decision(game["session_id"], client_id, decision)
+        client_id = response["client_id"]
+    response = client.send_decision(game["session_id"], client_id, 1)
+    assert response == {"status": "gameover", "score": 3}
+
+
+def test_requests_reuse_one_connection(server, client):
+    game = client.start_game()
+    client.send_decision(game["session_id"], game["client_id"], 1)
+    client.start_game()
+    assert server.request_count == 3
+    assert len(server.connections) == 1
+
+
+def test_invalid_api_key_raises(server):
+    with GameClient(server.url, api_key="wrong", rate_limiter=RateLimiter(1000, per=1)) as client:
+        with pytest.raises(requests.exceptions.HTTPError) as error:
+            client.start_game()
+    assert error.value.response.status_code == 401
+
+
+def test_unknown_session_raises(server, client):
+    with pytest.raises(requests.exceptions.HTTPError) as error:
+        client.send_decision("missing", "missing-0", 1)
+    assert error.value.response.status_code == 404
+    # Errors are raised to the caller, not retried
+    assert server.request_count == 1
+
+
+def test_shared_rate_limiter_paces_clients(server):
+    limiter = RateLimiter(20, per=1)
+    clients = [GameClient(server.url, api_key=server.api_key, rate_limiter=limiter) for _ in range(2)]
+    started = time.monotonic()
+    for _ in range(3):
+        for client in clients:
+            client.start_game()
+    elapsed = time.monotonic() - started
+    for client in clients:
+        client.close()
+    # Six requests at 20 per second with a burst of one: five waits of 50 ms
+    assert elapsed >= 0.24
+    assert limiter.waited_seconds > 0
+
+
+def test_rate_limiter_burst():
+    limiter = RateLimiter(1, per=60, burst=2)
+    assert limiter.try_acquire()
+    assert limiter.try_acquire()
+    assert not limiter.try_acquire()
+    with pytest.raises(ValueError):
+        limiter.acquire(3)
+
+
+class _ReadyLoader:
+    """Loader stand-in returning the client payload instead of parsing documents."""
+
+    def submit(self, identifier, files):
+        future = Future()
+        future.set_result(identifier)
+        return future
+
+    def close(self):
+        pass
+
+
+class _Predictor:
+    def __init__(self, fail_on=None):
+        self.calls = 0
+        self.fail_on = fail_on
+
+    def predict(self, client):
+        self.calls += 1
+        if self.calls == self.fail_on:
+            raise KeyError("broken client")
+        return 1
+
+
+def _runner(server, sessions, games, predictor):
+    return GameRunner(
+        sessions=sessions,
+        games=games,
+        base_url=server.url,
+        api_key=server.api_key,
+        rate_limiter=RateLimiter(1000, per=1),
+        loader=_ReadyLoader(),
+        predictor=predictor,
+    )
+
+
+def test_runner_plays_all_games():
+    with LocalGameServer([{}] * 3) as server:
+        runner = _runner(server, sessions=2, games=4, predictor=_Predictor())
+        try:
+            results = asyncio.run(runner.run())
+        finally:
+            runner.close()
+    assert len(results) == 4
+    assert all(result.score == 3 and result.error is None for result in results)
+    assert sum(result.decisions for result in results) == 12
+
+
+def test_runner_keeps_playing_after_a_session_fails():
+    with LocalGameServer([{}] * 3) as server:
+        runner = _runner(server, sessions=2, games=3, predictor=_Predictor(fail_on=2))
+        try:
+            results = asyncio.run(runner.run())
+        finally:
+            runner.close()
+    assert len(results) == 3
+    errors = [result.error for result in results if result.error]
+    assert errors == ["KeyError: 'broken client'"]
+    assert sum(1 for result in results if result.score == 3) == 2
+
+
+def test_runner_records_api_errors():
+    with LocalGameServer([{}]) as server:
+        runner = _runner(server, sessions=1, games=1, predictor=_Predictor())
+        runner.api_key = "wrong"
+        try:
+            results = asyncio.run(runner.run())
+        finally:
+            runner.close()
+    assert len(results) == 1
+    assert "401" in results[0].error
@@ -0,0 +1,135 @@
+from dataclasses import dataclass, field
+
+import pytest
+
+from model.decision_trace import DecisionTracer
+from model.incremental_validator import IncrementalValidator, changed_fields
+from model.rule_based_model import reads
+
+
+@dataclass
+class _Account:
+    email: str = "erika@example.com"
+    city: str = "Zurich"
+
+
+@dataclass
+class _Passport:
+    number: str = "AB1234567"
+
+
+@dataclass
+class _Client:
+    """Stand-in for ClientData with the parts the validator touches."""
+
+    client_file: str = "client"
+    account_form: _Account = field(default_factory=_Account)
+    passport: _Passport = field(default_factory=_Passport)
+    is_valid: bool = True
+
+    def update_validity(self) -> bool:
+        self.is_valid = "@" in self.account_form.email
+        return self.is_valid
+
+
+class _Tracer(DecisionTracer):
+    """Tracer that never samples, so the tests write no trace files."""
+
+    def __init__(self):
+        pass
+
+    def start(self, client_file):
+        return None
+
+
+@pytest.fixture
+def calls():
+    return []
+
+
+@pytest.fixture
+def validator(calls):
+    @reads("is_valid")
+    def flag_invalid(client):
+        calls.append("flag_invalid")
+        return not client.is_valid
+
+    @reads("account_form.email")
+    def flag_email(client):
+        calls.append("flag_email")
+        return client.account_form.email.endswith(".invalid")
+
+    @reads("passport.number")
+    def flag_passport(client):
+        calls.append("flag_passport")
+        return not client.passport.number.startswith("AB")
+
+    def flag_undeclared(client):
+        calls.append("flag_undeclared")
+        return False
+
+    rules = [(flag_invalid, None), (flag_email, None), (flag_passport, None), (flag_undeclared, None)]
+    return IncrementalValidator(rules, tracer=_Tracer())
+
+
+def test_first_validation_runs_every_rule(validator, calls):
+    assert validator.validate(_Client())
+    assert calls == ["flag_invalid", "flag_email", "flag_passport", "flag_undeclared"]
+
+
+def test_unchanged_client_runs_no_declared_rule(validator, calls):
+    client = _Client()
+    validator.validate(client)
+    calls.clear()
+    assert validator.validate(client)
+    assert calls == []
+
+
+def test_edit_reruns_only_the_rules_reading_the_field(validator, calls):
+    client = _Client()
+    validator.validate(client)
+    calls.clear()
+
+    client.passport.number = "XY1234567"
+    assert not validator.validate(client)
+    assert calls == ["flag_passport"]
+
+    calls.clear()
+    client.account_form.city = "Basel"
+    assert not validator.validate(client)
+    # Nothing reads the city except the undeclared flag, which the rejection does not reach
+    assert calls == []
+
+
+def test_undeclared_rules_rerun_on_any_change(validator, calls):
+    client = _Client()
+    validator.validate(client)
+    calls.clear()
+    client.account_form.city = "Basel"
+    assert validator.validate(client)
+    assert calls == ["flag_undeclared"]
+
+
+def test_revalidate_refreshes_derived_validity(validator, calls):
+    client = _Client()
+    validator.validate(client)
+    calls.clear()
+
+    client.account_form.email = "not an address"
+    assert not validator.revalidate(client, ["account_form.email"])
+    # is_valid changed with the email, so the validity flag runs again and rejects first
+    assert calls == ["flag_invalid"]
+    assert validator.decide(client) == (False, "flag_invalid")
+
+
+def test_decide_reports_the_cached_verdicts(validator):
+    client = _Client()
+    verdicts = {}
+    assert validator.decide(client, verdicts) == (True, None)
+    assert verdicts == {"flag_invalid": False, "flag_email": False, "flag_passport": False, "flag_undeclared": False}
+
+
+def test_changed_fields():
+    old = {"account_form": {"email": "a", "parsed_date": 1}, "employment": [{"employer": "x"}]}
+    new = {"account_form": {"email": "b", "parsed_date": 2}, "employment": [{"employer": "y"}]}
+    assert changed_fields(old, new) == {"account_form.email", "employment.0.employer"}
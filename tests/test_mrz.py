@@ -0,0 +1,58 @@
+import pytest
+
+from data_parsing.mrz import decode_td3, passes_check_digits, repair_ocr_digits
+
+# Specimen MRZ of ICAO Doc 9303
+LINE1 = "P<UTOERIKSSON<<ANNA<MARIA<<<<<<<<<<<<<<<<<<<"
+LINE2 = "L898902C36UTO7408122F1204159ZE184226B<<<<<10"
+
+
+def test_decode_fields():
+    mrz = decode_td3(LINE1, LINE2)
+    assert mrz.document_type == "P"
+    assert mrz.issuing_country == "UTO"
+    assert mrz.surname == "ERIKSSON"
+    assert mrz.given_names == "ANNA MARIA"
+    assert mrz.document_number == "L898902C3"
+    assert mrz.nationality == "UTO"
+    assert mrz.birth_date == "740812"
+    assert mrz.sex == "F"
+    assert mrz.expiry_date == "120415"
+    assert mrz.optional_data == "ZE184226B<<<<<"
+    assert mrz.is_valid()
+
+
+def test_wrong_check_digit_is_reported():
+    line2 = LINE2[:19] + "3" + LINE2[20:]
+    assert decode_td3(LINE1, line2).failed_checks() == ["birth_date", "composite"]
+
+
+@pytest.mark.parametrize("line1, line2", [(LINE1[:-1], LINE2), (LINE1, LINE2 + "<"), ("I" + LINE1[1:], LINE2)])
+def test_invalid_layout_raises(line1, line2):
+    with pytest.raises(ValueError):
+        decode_td3(line1, line2)
+
+
+def test_ocr_confusions_fail_strict_decoding():
+    # O read for 0 in the birth date
+    misread = LINE2[:15] + "O" + LINE2[16:]
+    assert not decode_td3(LINE1, misread).is_valid()
+    assert not passes_check_digits([LINE1, misread])
+
+
+def test_ocr_fixes_repair_digit_fields():
+    misread = LINE2[:15] + "O" + LINE2[16:]
+    mrz = decode_td3(LINE1, misread, ocr_fixes=True)
+    assert mrz.birth_date == "740812"
+    assert mrz.line2 == LINE2
+    assert passes_check_digits([LINE1, misread], ocr_fixes=True)
+
+
+def test_ocr_fixes_keep_letters_of_valid_fields():
+    # The document number legitimately contains letters that look like digits
+    assert repair_ocr_digits(LINE2) == LINE2
+
+
+def test_ocr_fixes_do_not_force_a_wrong_check_digit():
+    line2 = LINE2[:19] + "3" + LINE2[20:]
+    assert not passes_check_digits([LINE1, line2], ocr_fixes=True)
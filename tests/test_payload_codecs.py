@@ -0,0 +1,71 @@
+import io
+import json
+
+import pytest
+
+import storage
+from payload_codecs import ZstdCodec, decode_payload, decode_stream, get_codec, sniff_encoding, train_zstd_dictionary
+
+
+def _codecs():
+    codecs = ["identity", "gzip"]
+    try:
+        get_codec("zstd")
+    except ImportError:
+        pass
+    else:
+        codecs.append("zstd")
+    return codecs
+
+
+PAYLOAD = json.dumps({"client_id": "abc", "client_data": {"description": "x" * 5000}}).encode("utf-8")
+
+
+@pytest.mark.parametrize("codec", _codecs())
+def test_round_trip(codec):
+    compressed = get_codec(codec).compress(PAYLOAD)
+    assert get_codec(codec).decompress(compressed) == PAYLOAD
+    assert decode_payload(compressed, get_codec(codec).content_encoding) == PAYLOAD
+
+
+@pytest.mark.parametrize("codec", _codecs())
+def test_encoding_is_sniffed_without_metadata(codec):
+    compressed = get_codec(codec).compress(PAYLOAD)
+    assert sniff_encoding(compressed) == get_codec(codec).content_encoding
+    assert decode_payload(compressed) == PAYLOAD
+
+
+@pytest.mark.parametrize("codec", _codecs())
+def test_stream_round_trip(codec):
+    compressed = get_codec(codec).compress(PAYLOAD)
+    with decode_stream(io.BufferedReader(io.BytesIO(compressed))) as decoded:
+        assert decoded.read() == PAYLOAD
+
+
+def test_unknown_codec():
+    with pytest.raises(ValueError):
+        get_codec("brotli")
+
+
+def test_zstd_dictionary():
+    pytest.importorskip("zstandard")
+    samples = [json.dumps({"client_id": i, "name": f"Client {i}", "city": "Zurich"}).encode() for i in range(500)]
+    dictionary = train_zstd_dictionary(samples, dict_size=4096)
+    codec = ZstdCodec(dictionary=dictionary)
+    compressed = codec.compress(samples[0])
+    assert codec.decompress(compressed) == samples[0]
+    with pytest.raises(ValueError):
+        ZstdCodec().decompress(compressed)
+
+
+@pytest.mark.parametrize("codec", _codecs())
+def test_store_dict_records_the_encoding(memory_storage, codec):
+    data = {"client_id": "abc", "values": list(range(100))}
+    assert storage.store_dict(data, "results/abc.json", codec=codec)
+    assert memory_storage.encodings["results/abc.json"] == get_codec(codec).content_encoding
+    assert storage.read_dict("results/abc.json") == data
+
+
+def test_read_dict_without_recorded_encoding(memory_storage):
+    memory_storage.put("legacy.json", get_codec("gzip").compress(b'{"old": true}'))
+    assert storage.read_dict("legacy.json") == {"old": True}
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from rule_ablation import VerdictMatrix
+
+RULES = ["flag_a", "flag_b", "flag_c"]
+
+
+@pytest.fixture
+def matrix() -> VerdictMatrix:
+    verdicts = np.array(
+        [
+            [False, False, False],  # valid, accepted
+            [True, False, False],  # invalid, rejected by flag_a
+            [False, True, True],  # invalid, rejected by flag_b
+            [False, False, True],  # valid, wrongly rejected by flag_c
+            [False, False, False],  # invalid, wrongly accepted
+        ]
+    )
+    labels = np.array([True, False, False, True, False])
+    clients = [f"client/{i}" for i in range(len(labels))]
+    return VerdictMatrix(verdicts, np.zeros_like(verdicts), labels, clients, RULES, ["v"] * len(RULES))
+
+
+def test_all_rules(matrix):
+    metrics = matrix.evaluate()
+    assert (metrics.true_positive, metrics.false_positive) == (1, 1)
+    assert (metrics.true_negative, metrics.false_negative) == (2, 1)
+    assert metrics.false_positives == ["client/4"]
+    assert metrics.false_negatives == ["client/3"]
+    assert metrics.rules == {
+        "flag_a": {"rejected": 1, "false_negatives": 0},
+        "flag_b": {"rejected": 1, "false_negatives": 0},
+        "flag_c": {"rejected": 1, "false_negatives": 1},
+    }
+
+
+def test_rejection_goes_to_first_firing_rule(matrix):
+    metrics = matrix.evaluate(["flag_c", "flag_b"])
+    assert metrics.rules == {"flag_c": {"rejected": 2, "false_negatives": 1}}
+
+
+def test_subset_of_rules(matrix):
+    metrics = matrix.evaluate(["flag_a", "flag_b"])
+    assert metrics.false_negative == 0
+    assert metrics.accuracy == 0.8
+
+
+def test_no_rules_accepts_everyone(matrix):
+    metrics = matrix.evaluate([])
+    assert (metrics.true_positive, metrics.false_positive) == (2, 3)
+    assert metrics.rules == {}
+
+
+def test_unknown_rule(matrix):
+    with pytest.raises(ValueError):
+        matrix.evaluate(["flag_a", "flag_missing"])
+
+
+def test_save_and_load(matrix, tmp_path):
+    path = str(tmp_path / "verdicts.npz")
+    matrix.save(path)
+    loaded = VerdictMatrix.load(path)
+    assert loaded.rules == RULES
+    assert loaded.clients == matrix.clients
+    assert loaded.evaluate().to_dict() == matrix.evaluate().to_dict()
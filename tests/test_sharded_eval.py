@@ -0,0 +1,55 @@
+import pytest
+
+from evaluation_metrics import EvaluationMetrics
+from sharded_eval import merge_results
+
+
+def _result(shard: int, shards: int, predictions, clients=None) -> dict:
+    metrics = EvaluationMetrics()
+    for i, (prediction, label, rule) in enumerate(predictions):
+        metrics.update(prediction, label, f"{shard}/{i}", rule)
+    return {
+        "shard": shard,
+        "shards": shards,
+        "clients": len(predictions) if clients is None else clients,
+        "evaluated": metrics.total_samples,
+        "elapsed": 2.0,
+        "metrics": metrics.to_dict(),
+    }
+
+
+def test_merge_adds_up_shards():
+    results = [
+        _result(0, 2, [(True, True, None), (False, True, "flag_a")]),
+        _result(1, 2, [(False, False, "flag_a"), (True, False, None)]),
+    ]
+    report = merge_results(results)
+    metrics = EvaluationMetrics.from_dict(report["metrics"])
+    assert report["shards"] == 2
+    assert report["missing"] == []
+    assert report["incomplete"] == []
+    assert report["elapsed"] == 4.0
+    assert (metrics.true_positive, metrics.false_negative, metrics.true_negative, metrics.false_positive) == (1, 1, 1, 1)
+    assert metrics.false_negatives == ["0/1"]
+    assert metrics.false_positives == ["1/1"]
+    assert metrics.rules == {"flag_a": {"rejected": 2, "false_negatives": 1}}
+
+
+def test_missing_and_incomplete_shards():
+    results = [
+        _result(0, 3, [(True, True, None)]),
+        _result(2, 3, [(True, True, None)], clients=5),
+    ]
+    report = merge_results(results)
+    assert report["missing"] == [1]
+    assert report["incomplete"] == [2]
+
+
+def test_different_shard_counts():
+    with pytest.raises(ValueError):
+        merge_results([_result(0, 2, []), _result(0, 3, [])])
+
+
+def test_no_results():
+    with pytest.raises(ValueError):
+        merge_results([])
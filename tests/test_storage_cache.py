@@ -0,0 +1,128 @@
+import os
+import time
+
+import pytest
+
+import storage
+from storage_cache import ObjectCache
+
+
+@pytest.fixture
+def cached_storage(memory_storage, tmp_path, monkeypatch):
+    """In-memory backend treated as remote, read through a cache in a temporary directory."""
+    monkeypatch.setenv("STORAGE_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.delenv("STORAGE_CACHE_TTL", raising=False)
+    monkeypatch.delenv("STORAGE_CACHE_WRITES", raising=False)
+    storage.get_object_cache.cache_clear()
+    memory_storage.remote = True
+
+    gets = []
+    get = memory_storage.get
+
+    def counting_get(key, if_none_match=None):
+        gets.append((key, if_none_match))
+        return get(key, if_none_match)
+
+    memory_storage.get = counting_get
+    memory_storage.gets = gets
+    return memory_storage
+
+
+def test_put_and_get(tmp_path):
+    cache = ObjectCache(str(tmp_path))
+    assert cache.get("a") is None
+    cache.put("a", b"content", etag="e1", content_encoding="gzip")
+    data, meta = cache.get("a")
+    assert data == b"content"
+    assert (meta["etag"], meta["content_encoding"]) == ("e1", "gzip")
+    handle, _ = cache.open("a")
+    with handle:
+        assert handle.read() == b"content"
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    cache.delete("a")
+    assert cache.get("a") is None
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    cache = ObjectCache(str(tmp_path), max_bytes=1000)
+    for name in ("a", "b", "c"):
+        cache.put(name, b"x" * 300)
+        time.sleep(0.01)
+    # Reading a makes b the least recently used entry
+    assert cache.get("a") is not None
+    cache.put("d", b"x" * 300)
+
+    assert cache.get("b") is None
+    assert all(cache.get(name) is not None for name in ("a", "c", "d"))
+
+
+def test_objects_larger_than_the_cache_are_not_stored(tmp_path):
+    cache = ObjectCache(str(tmp_path), max_bytes=100)
+    cache.put("big", b"x" * 101)
+    assert cache.get("big") is None
+
+
+def test_read_revalidates_with_the_etag(cached_storage):
+    cached_storage.put("a.json", b"version 1")
+    assert storage.read_object("a.json") == b"version 1"
+    assert cached_storage.gets == [("a.json", None)]
+
+    # Unchanged: a conditional GET answered with NotModified, served from the cache
+    assert storage.read_object("a.json") == b"version 1"
+    etag = cached_storage.gets[1][1]
+    assert etag is not None
+
+    cached_storage.put("a.json", b"version 2")
+    assert storage.read_object("a.json") == b"version 2"
+    assert cached_storage.gets[2] == ("a.json", etag)
+    assert storage.get_object_cache().get("a.json")[0] == b"version 2"
+
+
+def test_fresh_entries_skip_the_request(cached_storage, monkeypatch):
+    monkeypatch.setenv("STORAGE_CACHE_TTL", "60")
+    cached_storage.put("a.json", b"content")
+    storage.read_object("a.json")
+    storage.read_object("a.json")
+    assert len(cached_storage.gets) == 1
+
+
+def test_offline_reads_only_the_cache(cached_storage, monkeypatch):
+    cached_storage.put("cached.json", b"content")
+    cached_storage.put("uncached.json", b"content")
+    storage.read_object("cached.json")
+
+    monkeypatch.setenv("STORAGE_OFFLINE", "1")
+    assert storage.read_object("cached.json") == b"content"
+    assert storage.read_object("uncached.json") is None
+    assert len(cached_storage.gets) == 1
+
+
+def test_uploads_invalidate_instead_of_filling_the_cache(cached_storage, monkeypatch):
+    monkeypatch.setenv("STORAGE_CACHE_TTL", "60")
+    cached_storage.put("a.json", b"old")
+    storage.read_object("a.json")
+
+    storage.store_object(b"new", "a.json")
+    assert storage.get_object_cache().get("a.json") is None
+    assert storage.read_object("a.json") == b"new"
+
+    monkeypatch.setenv("STORAGE_CACHE_WRITES", "1")
+    storage.store_object(b"written", "b.json")
+    assert storage.get_object_cache().get("b.json")[0] == b"written"
+
+
+def test_cache_directory_stays_within_budget(cached_storage, monkeypatch):
+    monkeypatch.setenv("STORAGE_CACHE_MAX_MB", str(2000 / (1024 * 1024)))
+    storage.get_object_cache.cache_clear()
+    for i in range(10):
+        cached_storage.put(f"{i}.bin", os.urandom(500))
+        storage.read_object(f"{i}.bin")
+    root = storage.get_object_cache().root
+    sizes = [
+        os.path.getsize(os.path.join(directory, name))
+        for directory, _, files in os.walk(root)
+        for name in files
+        if name.endswith(".data")
+    ]
+    assert 0 < sum(sizes) <= 2000
@@ -0,0 +1,109 @@
+import json
+
+import storage
+from transfer import Manifest, TransferEngine
+
+
+def _store(backend, objects: dict):
+    for key, data in objects.items():
+        backend.put(key, data)
+
+
+def _count_reads(monkeypatch) -> list:
+    reads = []
+    open_object = storage.open_object
+
+    def counting_open(key, *args, **kwargs):
+        reads.append(key)
+        return open_object(key, *args, **kwargs)
+
+    monkeypatch.setattr(storage, "open_object", counting_open)
+    return reads
+
+
+OBJECTS = {f"train/1/0/{i}/passport.png": f"passport {i}".encode() for i in range(5)}
+
+
+def test_download_keeps_the_key_structure(memory_storage, tmp_path):
+    _store(memory_storage, OBJECTS)
+    stats = TransferEngine(workers=4).download("train/", str(tmp_path))
+    assert (stats.transferred, stats.skipped, stats.failed) == (5, 0, 0)
+    assert (tmp_path / "1" / "0" / "3" / "passport.png").read_bytes() == b"passport 3"
+    assert stats.bytes == sum(len(data) for data in OBJECTS.values())
+
+
+def test_download_resumes_from_the_manifest(memory_storage, tmp_path, monkeypatch):
+    _store(memory_storage, OBJECTS)
+    manifest_path = str(tmp_path / ".manifest.json")
+    folder = str(tmp_path / "train")
+
+    # The first run fails on one object, as if interrupted
+    open_object = storage.open_object
+    broken = "train/1/0/2/passport.png"
+    monkeypatch.setattr(storage, "open_object", lambda key, *a: None if key == broken else open_object(key, *a))
+    stats = TransferEngine(manifest_path=manifest_path).download("train/", folder)
+    assert (stats.transferred, stats.failed) == (4, 1)
+    with open(manifest_path) as f:
+        assert broken not in json.load(f)
+
+    monkeypatch.setattr(storage, "open_object", open_object)
+    reads = _count_reads(monkeypatch)
+    stats = TransferEngine(manifest_path=manifest_path).download("train/", folder)
+    assert (stats.transferred, stats.skipped, stats.failed) == (1, 4, 0)
+    assert reads == [broken]
+
+
+def test_download_skips_files_matching_the_etag(memory_storage, tmp_path, monkeypatch):
+    _store(memory_storage, OBJECTS)
+    folder = tmp_path / "train"
+    TransferEngine().download("train/", str(folder))
+    # Same size, different content
+    (folder / "1" / "0" / "4" / "passport.png").write_bytes(b"passport X")
+
+    # A new manifest knows nothing, so the local files are compared by MD5
+    reads = _count_reads(monkeypatch)
+    stats = TransferEngine().download("train/", str(folder))
+    assert (stats.transferred, stats.skipped) == (1, 4)
+    assert reads == ["train/1/0/4/passport.png"]
+    assert (folder / "1" / "0" / "4" / "passport.png").read_bytes() == b"passport 4"
+
+
+def test_download_replaces_changed_objects(memory_storage, tmp_path):
+    _store(memory_storage, OBJECTS)
+    manifest_path = str(tmp_path / ".manifest.json")
+    TransferEngine(manifest_path=manifest_path).download("train/", str(tmp_path / "train"))
+
+    memory_storage.put("train/1/0/0/passport.png", b"new passport 0")
+    stats = TransferEngine(manifest_path=manifest_path).download("train/", str(tmp_path / "train"))
+    assert (stats.transferred, stats.skipped) == (1, 4)
+    assert (tmp_path / "train" / "1" / "0" / "0" / "passport.png").read_bytes() == b"new passport 0"
+
+
+def test_upload_skips_unchanged_and_hidden_files(memory_storage, tmp_path):
+    folder = tmp_path / "train"
+    (folder / "1" / "0" / "7").mkdir(parents=True)
+    (folder / "1" / "0" / "7" / "account.pdf").write_bytes(b"account")
+    (folder / "1" / "0" / "7" / "profile.docx").write_bytes(b"profile")
+    (folder / "1" / "0" / "7" / ".profile.docx.part").write_bytes(b"partial")
+
+    stats = TransferEngine().upload(str(folder), "train/")
+    assert (stats.transferred, stats.skipped) == (2, 0)
+    assert sorted(memory_storage.objects) == ["train/1/0/7/account.pdf", "train/1/0/7/profile.docx"]
+
+    (folder / "1" / "0" / "7" / "profile.docx").write_bytes(b"profile, corrected")
+    stats = TransferEngine().upload(str(folder), "train/")
+    assert (stats.transferred, stats.skipped) == (1, 1)
+    assert memory_storage.objects["train/1/0/7/profile.docx"] == b"profile, corrected"
+
+
+def test_manifest_round_trip(tmp_path):
+    local_path = tmp_path / "file.bin"
+    local_path.write_bytes(b"content")
+    manifest = Manifest(str(tmp_path / "manifest.json"))
+    manifest.record("key", str(local_path), "etag", 7)
+    manifest.save()
+
+    reloaded = Manifest(str(tmp_path / "manifest.json"))
+    assert reloaded.matches("key", str(local_path), "etag", 7)
+    assert not reloaded.matches("key", str(local_path), "other", 7)
+    assert not reloaded.matches("missing", str(local_path), "etag", 7)
@@ -0,0 +1,98 @@
+import threading
+import time
+
+import pytest
+
+from uploader import BackgroundUploader, LocalDirectoryStore
+
+
+def test_close_uploads_everything_submitted(tmp_path):
+    store = LocalDirectoryStore(tmp_path)
+    with BackgroundUploader(store, workers=3) as uploader:
+        for i in range(50):
+            uploader.submit(f"result {i}".encode(), f"results/{i}.txt")
+
+    assert sorted(int(path.stem) for path in (tmp_path / "results").iterdir()) == list(range(50))
+    assert (tmp_path / "results" / "7.txt").read_bytes() == b"result 7"
+    stats = uploader.stats()
+    assert (stats["submitted"], stats["uploaded"], stats["failed"], stats["pending"]) == (50, 50, 0, 0)
+
+
+def test_close_waits_for_slow_uploads(tmp_path):
+    store = LocalDirectoryStore(tmp_path)
+
+    def slow_store(data, object_name):
+        time.sleep(0.02)
+        return store(data, object_name)
+
+    uploader = BackgroundUploader(slow_store, workers=1)
+    for i in range(5):
+        uploader.submit(b"x", f"{i}.bin")
+    uploader.close()
+    assert len(list(tmp_path.iterdir())) == 5
+
+
+def test_flush_waits_for_pending_uploads(tmp_path):
+    uploader = BackgroundUploader(LocalDirectoryStore(tmp_path))
+    uploader.submit(lambda: b"encoded on the worker", "lazy.txt")
+    uploader.flush()
+    assert (tmp_path / "lazy.txt").read_bytes() == b"encoded on the worker"
+    uploader.close()
+
+
+def test_full_queue_blocks_submit(tmp_path):
+    store = LocalDirectoryStore(tmp_path)
+    release = threading.Event()
+
+    def blocked_store(data, object_name):
+        release.wait()
+        return store(data, object_name)
+
+    uploader = BackgroundUploader(blocked_store, max_queue=2, workers=1)
+    uploader.submit(b"0", "0")
+    # Let the worker take the first upload, then fill the queue
+    while uploader.stats()["pending"]:
+        time.sleep(0.001)
+    uploader.submit(b"1", "1")
+    uploader.submit(b"2", "2")
+
+    submitter = threading.Thread(target=uploader.submit, args=(b"3", "3"))
+    submitter.start()
+    submitter.join(0.1)
+    assert submitter.is_alive()
+
+    release.set()
+    submitter.join()
+    uploader.close()
+    stats = uploader.stats()
+    assert stats["uploaded"] == 4
+    assert stats["blocked_submits"] == 1
+    assert stats["blocked_seconds"] >= 0.1
+    assert stats["max_queue_depth"] == 2
+
+
+def test_failed_uploads_are_counted(tmp_path):
+    store = LocalDirectoryStore(tmp_path)
+
+    def flaky_store(data, object_name):
+        if object_name == "refused":
+            return False
+        if object_name == "broken":
+            raise OSError("disk full")
+        return store(data, object_name)
+
+    with BackgroundUploader(flaky_store, workers=1) as uploader:
+        for object_name in ("ok", "refused", "broken"):
+            uploader.submit(b"x", object_name)
+
+    stats = uploader.stats()
+    assert (stats["uploaded"], stats["failed"]) == (1, 2)
+    assert uploader.failed_objects == ["refused", "broken"]
+    assert stats["bytes_uploaded"] == 1
+
+
+def test_submit_after_close_raises(tmp_path):
+    uploader = BackgroundUploader(LocalDirectoryStore(tmp_path))
+    uploader.close()
+    with pytest.raises(RuntimeError):
+        uploader.submit(b"x", "late")